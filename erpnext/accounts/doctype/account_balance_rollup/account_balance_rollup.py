@@ -0,0 +1,209 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Round, Sum
+from frappe.utils import cint, cstr, flt, getdate, now
+
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
+
+ROLLUP_AMOUNT_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+
+class AccountBalanceRollup(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link
+		account_currency: DF.Link | None
+		company: DF.Link
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		finance_book: DF.Link | None
+		posting_date: DF.Date
+		project: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Balance Rollup", ["company", "account", "posting_date"])
+
+
+def is_account_balance_rollup_enabled() -> bool:
+	return bool(
+		cint(frappe.db.get_single_value("Accounts Settings", "maintain_account_balance_rollup", cache=True))
+	)
+
+
+def get_rollup_key_fields():
+	return [
+		"company",
+		"account",
+		"cost_center",
+		"project",
+		"finance_book",
+		"posting_date",
+		*get_accounting_dimensions(),
+	]
+
+
+def get_rollup_key(entry, key_fields):
+	return tuple(
+		cstr(getdate(entry.get(fieldname))) if fieldname == "posting_date" else cstr(entry.get(fieldname))
+		for fieldname in key_fields
+	)
+
+
+def get_rollup_name(key):
+	return hashlib.sha1("\x1f".join(key).encode()).hexdigest()
+
+
+def update_account_balance_rollup(gl_entries, sign=1):
+	"""Add (sign=1) or remove (sign=-1) the amounts of active `gl_entries` to their daily balances"""
+	from erpnext.accounts.utils import get_currency_precision
+
+	precision = get_currency_precision()
+	key_fields = get_rollup_key_fields()
+
+	balances = {}
+	for entry in gl_entries:
+		if cint(entry.get("is_cancelled")):
+			continue
+
+		key = get_rollup_key(entry, key_fields)
+		if key not in balances:
+			balances[key] = {
+				**{fieldname: value or None for fieldname, value in zip(key_fields, key, strict=True)},
+				"account_currency": entry.get("account_currency"),
+				**{fieldname: 0.0 for fieldname in ROLLUP_AMOUNT_FIELDS},
+			}
+
+		for fieldname in ROLLUP_AMOUNT_FIELDS:
+			# rounded per entry, the same way get_balance_on sums up the GL Entries
+			balances[key][fieldname] += sign * flt(entry.get(fieldname), precision)
+
+	for key, balance in balances.items():
+		add_to_daily_balance(get_rollup_name(key), balance)
+
+
+def add_to_daily_balance(name, balance):
+	if not frappe.db.exists("Account Balance Rollup", name):
+		doc = frappe.new_doc("Account Balance Rollup")
+		doc.update(balance)
+		doc.name = name
+		try:
+			doc.db_insert()
+			return
+		except frappe.DuplicateEntryError:
+			# inserted by a concurrent posting since the check
+			pass
+
+	rollup = frappe.qb.DocType("Account Balance Rollup")
+	query = frappe.qb.update(rollup).where(rollup.name == name)
+	for fieldname in ROLLUP_AMOUNT_FIELDS:
+		query = query.set(rollup[fieldname], rollup[fieldname] + balance[fieldname])
+	query.run()
+
+
+def remove_from_account_balance_rollup(voucher_type, voucher_no, conditions=None):
+	"""Remove the active GL Entries of the voucher, about to be cancelled, changed or deleted,
+	from the balances"""
+	if not is_account_balance_rollup_enabled():
+		return
+
+	update_account_balance_rollup(get_active_gl_entries(voucher_type, voucher_no, conditions), sign=-1)
+
+
+def add_to_account_balance_rollup(voucher_type, voucher_no, conditions=None):
+	"""Add the active GL Entries of the voucher, after they are changed in the database, to the balances"""
+	if not is_account_balance_rollup_enabled():
+		return
+
+	update_account_balance_rollup(get_active_gl_entries(voucher_type, voucher_no, conditions))
+
+
+def get_active_gl_entries(voucher_type, voucher_no, conditions=None):
+	gle = frappe.qb.DocType("GL Entry")
+	query = (
+		frappe.qb.from_(gle)
+		.select(*get_rollup_key_fields(), gle.account_currency, gle.is_cancelled, *ROLLUP_AMOUNT_FIELDS)
+		.where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no) & (gle.is_cancelled == 0))
+	)
+	if conditions:
+		query = query.where(conditions)
+
+	return query.run(as_dict=True)
+
+
+def rebuild_account_balance_rollup(company=None):
+	"""Rebuild the daily balances of all the accounts from the General Ledger"""
+	from erpnext.accounts.utils import get_currency_precision
+
+	precision = get_currency_precision()
+	key_fields = get_rollup_key_fields()
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+		*key_fields,
+		"account_currency",
+		*ROLLUP_AMOUNT_FIELDS,
+	]
+
+	gle = frappe.qb.DocType("GL Entry")
+	timestamp = now()
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+	for company in companies:
+		frappe.db.delete("Account Balance Rollup", {"company": company})
+
+		for account in frappe.get_all("Account", filters={"company": company, "is_group": 0}, pluck="name"):
+			balances = (
+				frappe.qb.from_(gle)
+				.select(
+					*key_fields,
+					gle.account_currency,
+					*[
+						Sum(Round(gle[fieldname], precision)).as_(fieldname)
+						for fieldname in ROLLUP_AMOUNT_FIELDS
+					],
+				)
+				.where((gle.company == company) & (gle.account == account) & (gle.is_cancelled == 0))
+				.groupby(*key_fields, gle.account_currency)
+			).run(as_dict=True)
+
+			values = []
+			for balance in balances:
+				key = get_rollup_key(balance, key_fields)
+				values.append(
+					(
+						get_rollup_name(key),
+						timestamp,
+						timestamp,
+						"Administrator",
+						"Administrator",
+						*[value or None for value in key],
+						balance.account_currency,
+						*[flt(balance[fieldname]) for fieldname in ROLLUP_AMOUNT_FIELDS],
+					)
+				)
+
+			if values:
+				frappe.db.bulk_insert("Account Balance Rollup", fields=fields, values=values)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
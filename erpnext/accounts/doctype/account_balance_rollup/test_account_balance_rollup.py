@@ -0,0 +1,107 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, today
+
+from erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup import (
+	rebuild_account_balance_rollup,
+)
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import (
+	setup_provisional_accounting,
+	toggle_provisional_accounting_setting,
+)
+from erpnext.accounts.utils import get_balance_on
+from erpnext.stock.doctype.purchase_receipt.purchase_receipt import make_purchase_invoice
+from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
+
+
+class TestAccountBalanceRollup(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_daily_balances(self, account):
+		balances = frappe.get_all(
+			"Account Balance Rollup",
+			filters={"account": account, "company": "_Test Company"},
+			fields=["posting_date", "cost_center", "debit", "credit"],
+			order_by="posting_date, cost_center",
+		)
+		# balances of the cancelled entries are left at zero
+		return [d for d in balances if d.debit or d.credit]
+
+	def get_ledger_balance(self, account, date=None, cost_center=None):
+		filters = {"account": account, "posting_date": ("<=", date or today()), "is_cancelled": 0}
+		if cost_center:
+			filters["cost_center"] = cost_center
+
+		gl_entries = frappe.get_all("GL Entry", filters=filters, fields=["debit", "credit"])
+		return sum(d.debit - d.credit for d in gl_entries)
+
+	@change_settings("Accounts Settings", {"maintain_account_balance_rollup": 1})
+	def test_daily_balances_follow_the_ledger(self):
+		account = "_Test Bank - _TC"
+		day_1, day_2 = add_days(today(), -5), add_days(today(), -2)
+
+		make_journal_entry(account, "Sales - _TC", 100, posting_date=day_1, submit=True)
+		make_journal_entry(account, "Sales - _TC", 50, posting_date=day_1, submit=True)
+		jv = make_journal_entry(account, "Sales - _TC", 30, posting_date=day_2, submit=True)
+		make_journal_entry(
+			"Sales - _TC",
+			account,
+			20,
+			cost_center="_Test Cost Center 2 - _TC",
+			posting_date=day_2,
+			submit=True,
+		)
+
+		for date in (add_days(day_1, -1), day_1, day_2, today()):
+			self.assertEqual(
+				get_balance_on(account, date, company="_Test Company"), self.get_ledger_balance(account, date)
+			)
+
+		self.assertEqual(
+			get_balance_on(
+				"Sales - _TC", today(), company="_Test Company", cost_center="_Test Cost Center - _TC"
+			),
+			self.get_ledger_balance("Sales - _TC", today(), cost_center="_Test Cost Center - _TC"),
+		)
+
+		# cancelled entries are removed from the daily balances
+		balances = self.get_daily_balances(account)
+		jv.cancel()
+		self.assertEqual(
+			get_balance_on(account, today(), company="_Test Company"), self.get_ledger_balance(account)
+		)
+		self.assertEqual(
+			sum(d.debit - d.credit for d in balances) - 30,
+			sum(d.debit - d.credit for d in self.get_daily_balances(account)),
+		)
+
+		# rebuilding from the ledger gives the same balances
+		balances = self.get_daily_balances(account)
+		rebuild_account_balance_rollup("_Test Company")
+		self.assertEqual(self.get_daily_balances(account), balances)
+
+	@change_settings("Accounts Settings", {"maintain_account_balance_rollup": 1})
+	def test_cancelled_provisional_entries(self):
+		setup_provisional_accounting()
+		account = "Provision Account - _TC"
+
+		pr = make_purchase_receipt(item_code="_Test Non Stock Item", posting_date=add_days(today(), -2))
+		pi = make_purchase_invoice(pr.name)
+		pi.items[0].expense_account = "Cost of Goods Sold - _TC"
+		pi.submit()
+		self.assertEqual(
+			get_balance_on(account, today(), company="_Test Company"), self.get_ledger_balance(account)
+		)
+
+		# the reversal of the provisional entries of the receipt is cancelled along with the invoice
+		pi.cancel()
+		self.assertEqual(
+			get_balance_on(account, today(), company="_Test Company"), self.get_ledger_balance(account)
+		)
+
+		toggle_provisional_accounting_setting()
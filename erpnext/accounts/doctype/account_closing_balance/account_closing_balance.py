@@ -3,12 +3,14 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import cint, cstr
+from frappe.utils import cint, cstr, now
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
 
+CLOSING_BALANCE_AMOUNT_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
 
 class AccountClosingBalance(Document):
 	# begin: auto-generated types
@@ -144,3 +146,119 @@ def get_previous_closing_entries(company, closing_date, accounting_dimensions):
 		entries = query.run(as_dict=1)
 
 	return entries
+
+
+def get_closing_balances(
+	company,
+	closing_date,
+	from_date,
+	period_closing_voucher,
+	previous_closing_voucher,
+	accounts,
+	include_opening_entries=False,
+):
+	"""Closing balances of `accounts` per dimension, summed up by the database from the balances
+	of the previous closing and the GL Entries posted from `from_date` till `closing_date`.
+
+	GL Entries of `period_closing_voucher` are booked as period closing voucher entries."""
+	key_fields = get_closing_balance_key_fields()
+	key_columns = ", ".join(f"coalesce(`{field}`, '') as `{field}`" for field in key_fields)
+	group_by = ", ".join(f"`{field}`" for field in key_fields)
+	amount_columns = ", ".join(CLOSING_BALANCE_AMOUNT_FIELDS)
+
+	if include_opening_entries:
+		date_condition = "(posting_date between %(from_date)s and %(closing_date)s or is_opening = 'Yes')"
+	else:
+		date_condition = "posting_date between %(from_date)s and %(closing_date)s and is_opening = 'No'"
+
+	previous_closing_balances = ""
+	if previous_closing_voucher:
+		previous_closing_balances = f"""
+			select {key_columns}, is_period_closing_voucher_entry, {amount_columns}
+			from `tabAccount Closing Balance`
+			where period_closing_voucher = %(previous_closing_voucher)s and account in %(accounts)s
+			union all"""
+
+	return frappe.db.sql(
+		f"""
+		select
+			{group_by}, is_period_closing_voucher_entry,
+			{", ".join(f"sum({field}) as {field}" for field in CLOSING_BALANCE_AMOUNT_FIELDS)}
+		from (
+			{previous_closing_balances}
+			select
+				{key_columns},
+				case when voucher_type = 'Period Closing Voucher' then 1 else 0 end
+					as is_period_closing_voucher_entry,
+				{amount_columns}
+			from `tabGL Entry`
+			where company = %(company)s and is_cancelled = 0 and account in %(accounts)s
+				and (voucher_type != 'Period Closing Voucher' or voucher_no = %(period_closing_voucher)s)
+				and {date_condition}
+		) balances
+		group by {group_by}, is_period_closing_voucher_entry
+		""",
+		{
+			"company": company,
+			"closing_date": closing_date,
+			"from_date": from_date,
+			"period_closing_voucher": period_closing_voucher,
+			"previous_closing_voucher": previous_closing_voucher,
+			"accounts": accounts,
+		},
+		as_dict=1,
+	)
+
+
+def get_closing_balance_key_fields():
+	return [
+		"account",
+		"account_currency",
+		"cost_center",
+		"project",
+		"finance_book",
+		*get_accounting_dimensions(),
+	]
+
+
+def insert_closing_balances(closing_balances, period_closing_voucher, company, closing_date):
+	if not closing_balances:
+		return
+
+	fields = [
+		*get_closing_balance_key_fields(),
+		"is_period_closing_voucher_entry",
+		*CLOSING_BALANCE_AMOUNT_FIELDS,
+	]
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Account Closing Balance",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"docstatus",
+			"company",
+			"closing_date",
+			"period_closing_voucher",
+			*fields,
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				1,
+				company,
+				closing_date,
+				period_closing_voucher,
+				*[row[field] for field in fields],
+			)
+			for row in closing_balances
+		],
+	)
@@ -33,6 +33,8 @@ class AccountsSettings(Document):
 		book_deferred_entries_based_on: DF.Literal["Days", "Months"]
 		book_deferred_entries_via_journal_entry: DF.Check
 		book_tax_discount_loss: DF.Check
+		cache_pricing_rules: DF.Check
+		calculate_taxes_in_bulk: DF.Check
 		calculate_depr_using_total_days: DF.Check
 		check_supplier_invoice_uniqueness: DF.Check
 		create_pr_in_draft_status: DF.Check
@@ -46,6 +48,9 @@ class AccountsSettings(Document):
 		frozen_accounts_modifier: DF.Link | None
 		general_ledger_remarks_length: DF.Int
 		ignore_account_closing_balance: DF.Check
+		maintain_account_balance_rollup: DF.Check
+		maintain_payment_ledger_outstanding: DF.Check
+		maintain_payment_ledger_snapshots: DF.Check
 		make_payment_via_journal_entry: DF.Check
 		merge_similar_account_heads: DF.Check
 		over_billing_allowance: DF.Currency
@@ -87,6 +92,22 @@ class AccountsSettings(Document):
 		if old_doc.acc_frozen_upto != self.acc_frozen_upto:
 			self.validate_pending_reposts()
 
+		if self.maintain_account_balance_rollup and not old_doc.maintain_account_balance_rollup:
+			# balances are not maintained while disabled, rebuild them from the ledger
+			self.rebuild_account_balance_rollup()
+
+		if self.maintain_payment_ledger_outstanding and not old_doc.maintain_payment_ledger_outstanding:
+			# outstanding is not maintained while disabled, rebuild it from the ledger
+			self.rebuild_payment_ledger_outstanding()
+
+		if self.maintain_payment_ledger_snapshots and not old_doc.maintain_payment_ledger_snapshots:
+			self.make_payment_ledger_snapshots()
+
+		if old_doc.cache_pricing_rules != self.cache_pricing_rules:
+			from erpnext.accounts.doctype.pricing_rule.utils import clear_pricing_rule_index
+
+			clear_pricing_rule_index()
+
 		if clear_cache:
 			frappe.clear_cache()
 
@@ -111,6 +132,39 @@ class AccountsSettings(Document):
 				validate_fields_for_doctype=False,
 			)
 
+	def rebuild_account_balance_rollup(self):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup.rebuild_account_balance_rollup",
+			queue="long",
+			timeout=7200,
+			now=frappe.flags.in_test,
+			enqueue_after_commit=True,
+		)
+		frappe.msgprint(
+			_("Daily account balances will be rebuilt from the General Ledger in the background.")
+		)
+
+	def rebuild_payment_ledger_outstanding(self):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding.rebuild_payment_ledger_outstanding",
+			queue="long",
+			timeout=7200,
+			now=frappe.flags.in_test,
+			enqueue_after_commit=True,
+		)
+		frappe.msgprint(
+			_("Outstanding of the vouchers will be rebuilt from the Payment Ledger in the background.")
+		)
+
+	def make_payment_ledger_snapshots(self):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.payment_ledger_snapshot.payment_ledger_snapshot.make_daily_payment_ledger_snapshots",
+			queue="long",
+			timeout=7200,
+			now=frappe.flags.in_test,
+			enqueue_after_commit=True,
+		)
+
 	def validate_pending_reposts(self):
 		if self.acc_frozen_upto:
 			check_pending_reposting(self.acc_frozen_upto)
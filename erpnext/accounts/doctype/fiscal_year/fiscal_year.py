@@ -67,11 +67,15 @@ class FiscalYear(Document):
 			)
 
 	def on_update(self):
+		from erpnext.accounts.utils import clear_fiscal_years_cache
+
 		check_duplicate_fiscal_year(self)
-		frappe.cache().delete_value("fiscal_years")
+		clear_fiscal_years_cache()
 
 	def on_trash(self):
-		frappe.cache().delete_value("fiscal_years")
+		from erpnext.accounts.utils import clear_fiscal_years_cache
+
+		clear_fiscal_years_cache()
 
 	def validate_overlap(self):
 		existing_fiscal_years = frappe.db.sql(
@@ -5,7 +5,9 @@
 import unittest
 
 import frappe
-from frappe.utils import now_datetime
+from frappe.utils import getdate, now_datetime
+
+from erpnext.accounts.utils import FiscalYearError, get_fiscal_year, get_fiscal_years_for_dates
 
 test_ignore = ["Company"]
 
@@ -26,6 +28,34 @@ class TestFiscalYear(unittest.TestCase):
 
 		self.assertRaises(frappe.exceptions.InvalidDates, fy.insert)
 
+	def test_fiscal_years_for_dates(self):
+		fiscal_years = get_fiscal_years_for_dates(
+			["2013-05-01", "2014-02-01", getdate("2013-05-01")], company="_Test Company"
+		)
+
+		self.assertEqual(len(fiscal_years), 2)
+		for date in ("2013-05-01", "2014-02-01"):
+			self.assertEqual(fiscal_years[getdate(date)], get_fiscal_year(date, company="_Test Company"))
+
+		self.assertEqual(
+			get_fiscal_years_for_dates(["1900-01-01"], boolean=True), {getdate("1900-01-01"): False}
+		)
+		self.assertRaises(FiscalYearError, get_fiscal_years_for_dates, ["1900-01-01"], verbose=0)
+
+	def test_fiscal_year_cache_invalidation(self):
+		fy = frappe.get_doc("Fiscal Year", "_Test Fiscal Year 2013")
+		self.assertEqual(get_fiscal_year("2013-05-01")[0], fy.name)
+
+		try:
+			fy.disabled = 1
+			fy.save()
+			self.assertFalse(get_fiscal_year("2013-05-01", boolean=True))
+		finally:
+			fy.disabled = 0
+			fy.save()
+
+		self.assertEqual(get_fiscal_year("2013-05-01")[0], fy.name)
+
 
 def test_record_generator():
 	test_records = [
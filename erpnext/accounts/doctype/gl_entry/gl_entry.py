@@ -7,14 +7,14 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.model.meta import get_field_precision
 from frappe.model.naming import set_name_from_naming_options
-from frappe.utils import flt, fmt_money
+from frappe.utils import flt, fmt_money, getdate
 
 import erpnext
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_checks_for_pl_and_bs_accounts,
 )
 from erpnext.accounts.party import validate_party_frozen_disabled, validate_party_gle_currency
-from erpnext.accounts.utils import get_account_currency, get_fiscal_year
+from erpnext.accounts.utils import get_account_currency, get_fiscal_year, get_fiscal_years_for_dates
 from erpnext.exceptions import InvalidAccountCurrency
 
 exclude_from_linked_with = True
@@ -92,32 +92,31 @@ class GLEntry(Document):
 			validate_balance_type(self.account, adv_adj)
 			validate_frozen_account(self.account, adv_adj)
 
-			if (
-				self.voucher_type == "Journal Entry"
-				and frappe.get_cached_value("Journal Entry", self.voucher_no, "voucher_type")
-				== "Exchange Gain Or Loss"
-			):
-				return
-
-			if frappe.get_cached_value("Account", self.account, "account_type") not in [
-				"Receivable",
-				"Payable",
-			]:
-				# Update outstanding amt on against voucher
-				if (
-					self.against_voucher_type
-					in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
-					and self.against_voucher
-					and self.flags.update_outstanding == "Yes"
-					and not frappe.flags.is_reverse_depr_entry
-				):
-					update_outstanding_amt(
-						self.account,
-						self.party_type,
-						self.party,
-						self.against_voucher_type,
-						self.against_voucher,
-					)
+			if self.updates_outstanding():
+				update_outstanding_amt(
+					self.account,
+					self.party_type,
+					self.party,
+					self.against_voucher_type,
+					self.against_voucher,
+				)
+
+	def updates_outstanding(self):
+		"""Whether posting the entry changes the outstanding amount of its against voucher"""
+		if (
+			self.voucher_type == "Journal Entry"
+			and frappe.get_cached_value("Journal Entry", self.voucher_no, "voucher_type")
+			== "Exchange Gain Or Loss"
+		):
+			return False
+
+		return bool(
+			frappe.get_cached_value("Account", self.account, "account_type") not in ["Receivable", "Payable"]
+			and self.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+			and self.against_voucher
+			and self.flags.update_outstanding == "Yes"
+			and not frappe.flags.is_reverse_depr_entry
+		)
 
 	def check_mandatory(self):
 		mandatory = ["account", "voucher_type", "voucher_no", "company"]
@@ -217,15 +216,17 @@ class GLEntry(Document):
 				)
 			)
 
-	def validate_account_details(self, adv_adj):
+	def validate_account_details(self, adv_adj, account_details=None):
 		"""Account must be ledger, active and not freezed"""
 
-		ret = frappe.db.sql(
-			"""select is_group, docstatus, company
-			from tabAccount where name=%s""",
-			self.account,
-			as_dict=1,
-		)[0]
+		ret = account_details
+		if not ret:
+			ret = frappe.db.sql(
+				"""select is_group, docstatus, company
+				from tabAccount where name=%s""",
+				self.account,
+				as_dict=1,
+			)[0]
 
 		if ret.is_group == 1:
 			frappe.throw(
@@ -297,6 +298,75 @@ class GLEntry(Document):
 		frappe.throw(msg)
 
 
+def validate_gl_entries(gl_entries, adv_adj=False, from_repost=False):
+	"""Run the validations of `GLEntry` for all the entries of a voucher before inserting them in bulk,
+	doing the lookups shared by the entries once instead of once per entry"""
+	posting_dates = {}
+	for gle in gl_entries:
+		if not gle.fiscal_year:
+			posting_dates.setdefault(gle.company, set()).add(getdate(gle.posting_date))
+
+	fiscal_years = {
+		company: get_fiscal_years_for_dates(dates, company=company)
+		for company, dates in posting_dates.items()
+	}
+	for gle in gl_entries:
+		if not gle.fiscal_year:
+			gle.fiscal_year = fiscal_years[gle.company][getdate(gle.posting_date)][0]
+
+		gle.pl_must_have_cost_center()
+
+	if from_repost or gl_entries[0].voucher_type == "Period Closing Voucher":
+		return
+
+	accounts = {gle.account for gle in gl_entries}
+	account_details = {
+		d.name: d
+		for d in frappe.get_all(
+			"Account",
+			filters={"name": ("in", list(accounts))},
+			fields=["name", "is_group", "docstatus", "company"],
+		)
+	}
+
+	# the party and currency checks give the same result for the entries sharing their inputs
+	validated_parties = set()
+	validated_currencies = {}
+	for gle in gl_entries:
+		gle.check_mandatory()
+		gle.validate_cost_center()
+		gle.check_pl_account()
+
+		if (gle.party_type, gle.party) not in validated_parties:
+			gle.validate_party()
+			validated_parties.add((gle.party_type, gle.party))
+
+		currency_key = (gle.company, gle.account, gle.account_currency, gle.party_type, gle.party)
+		if currency_key not in validated_currencies:
+			gle.validate_currency()
+			validated_currencies[currency_key] = gle.account_currency
+		else:
+			gle.account_currency = validated_currencies[currency_key]
+
+		gle.validate_account_details(adv_adj, account_details.get(gle.account))
+		gle.validate_dimensions_for_pl_and_bs()
+
+	for account in accounts:
+		validate_frozen_account(account, adv_adj)
+
+
+def update_outstanding_of_against_vouchers(gl_entries):
+	"""Update the outstanding amounts changed by the bulk inserted `gl_entries`, once per against voucher"""
+	against_vouchers = {
+		(gle.account, gle.party_type, gle.party, gle.against_voucher_type, gle.against_voucher): None
+		for gle in gl_entries
+		if gle.updates_outstanding()
+	}
+
+	for args in against_vouchers:
+		update_outstanding_amt(*args)
+
+
 def validate_balance_type(account, adv_adj=False):
 	if not adv_adj and account:
 		balance_must_be = frappe.get_cached_value("Account", account, "balance_must_be")
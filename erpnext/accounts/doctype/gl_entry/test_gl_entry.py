@@ -3,12 +3,24 @@
 
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.model.naming import parse_naming_series
 
 from erpnext.accounts.doctype.gl_entry.gl_entry import rename_gle_sle_docs
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.general_ledger import (
+	GL_BULK_INSERT_THRESHOLD,
+	merge_similar_entries,
+	run_doc_hooks_for_all_doctypes,
+)
+
+hooked_events = []
+
+
+def record_hooked_event(doc, method):
+	hooked_events.append((doc.account, method))
 
 
 class TestGLEntry(unittest.TestCase):
@@ -79,3 +91,87 @@ class TestGLEntry(unittest.TestCase):
 			"SELECT current from tabSeries where name = %s", naming_series
 		)[0][0]
 		self.assertEqual(old_naming_series_current_value + 2, new_naming_series_current_value)
+
+	def test_bulk_insert_entries(self):
+		rows = GL_BULK_INSERT_THRESHOLD + 4
+		je = make_journal_entry(
+			"_Test Account Cost for Goods Sold - _TC", "_Test Bank - _TC", 100 * rows, save=False
+		)
+		je.accounts[0].debit_in_account_currency = 100
+		for _i in range(rows - 1):
+			je.append(
+				"accounts",
+				{
+					"account": "_Test Account Cost for Goods Sold - _TC",
+					"cost_center": "_Test Cost Center - _TC",
+					"debit_in_account_currency": 100,
+				},
+			)
+		je.submit()
+
+		gl_entries = frappe.get_all(
+			"GL Entry",
+			fields=["docstatus", "fiscal_year", "account_currency", "to_rename", "debit", "credit"],
+			filters={"voucher_type": "Journal Entry", "voucher_no": je.name, "is_cancelled": 0},
+		)
+		self.assertEqual(len(gl_entries), rows + 1)
+		self.assertTrue(all(d.docstatus == 1 and d.fiscal_year and d.account_currency for d in gl_entries))
+		self.assertTrue(all(d.to_rename == 1 for d in gl_entries))
+		self.assertEqual(sum(d.debit for d in gl_entries), 100 * rows)
+		self.assertEqual(sum(d.credit for d in gl_entries), 100 * rows)
+
+		je.cancel()
+		self.assertFalse(
+			frappe.db.exists(
+				"GL Entry", {"voucher_type": "Journal Entry", "voucher_no": je.name, "is_cancelled": 0}
+			)
+		)
+
+	def test_doc_hooks_of_bulk_inserted_entries(self):
+		gl_entries = [
+			frappe.get_doc({"doctype": "GL Entry", "account": account})
+			for account in ("_Test Bank - _TC", "Sales - _TC")
+		]
+		hooks = {"*": {"on_submit": ["erpnext.accounts.doctype.gl_entry.test_gl_entry.record_hooked_event"]}}
+
+		hooked_events.clear()
+		with patch.object(frappe, "get_doc_hooks", return_value=hooks):
+			run_doc_hooks_for_all_doctypes(gl_entries, ("on_update", "on_submit"))
+
+		# the hooks run for every entry
+		self.assertEqual(hooked_events, [("_Test Bank - _TC", "on_submit"), ("Sales - _TC", "on_submit")])
+
+	def test_merge_similar_entries(self):
+		def gle(account, debit=0, credit=0, voucher_detail_no=None):
+			return frappe._dict(
+				company="_Test Company",
+				account=account,
+				cost_center="_Test Cost Center - _TC",
+				voucher_type="Sales Invoice",
+				voucher_no="_Test Sales Invoice",
+				voucher_detail_no=voucher_detail_no,
+				debit=debit,
+				credit=credit,
+				debit_in_account_currency=debit,
+				credit_in_account_currency=credit,
+			)
+
+		gl_map = [
+			gle("_Test Bank - _TC", credit=350),
+			gle("Sales - _TC", debit=100),
+			gle("_Test Write Off - _TC"),
+			gle("Sales - _TC", debit=200),
+			gle("Sales - _TC", debit=50, voucher_detail_no="row-2"),
+		]
+		merged = merge_similar_entries(gl_map)
+
+		# entries are added up to the first entry of their head, zero entries are dropped
+		self.assertEqual(
+			[(d.account, d.voucher_detail_no, d.debit, d.credit) for d in merged],
+			[
+				("_Test Bank - _TC", None, 0, 350),
+				("Sales - _TC", None, 300, 0),
+				("Sales - _TC", "row-2", 50, 0),
+			],
+		)
+		self.assertEqual(merged[1].debit_in_account_currency, 300)
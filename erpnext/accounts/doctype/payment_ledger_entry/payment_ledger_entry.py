@@ -16,6 +16,9 @@ from erpnext.accounts.doctype.gl_entry.gl_entry import (
 	validate_balance_type,
 	validate_frozen_account,
 )
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	refresh_payment_ledger_outstanding,
+)
 from erpnext.accounts.utils import update_voucher_outstanding
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
@@ -168,6 +171,15 @@ class PaymentLedgerEntry(Document):
 				self.validate_allowed_dimensions()
 				validate_balance_type(self.account, adv_adj)
 
+		# outstanding of the entries posted together by `create_payment_ledger_entry`
+		# is updated once, after all of them
+		if not self.flags.skip_outstanding_refresh:
+			refresh_payment_ledger_outstanding(
+				[(self.voucher_type, self.voucher_no), (self.against_voucher_type, self.against_voucher_no)]
+			)
+			self.update_against_voucher_outstanding()
+
+	def update_against_voucher_outstanding(self):
 		# update outstanding amount
 		if (
 			self.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
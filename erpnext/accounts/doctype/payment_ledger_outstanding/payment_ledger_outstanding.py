@@ -0,0 +1,256 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import qb
+from frappe.model.document import Document
+from frappe.query_builder import Criterion
+from frappe.query_builder.functions import Max, Min, Sum
+from frappe.utils import cint, create_batch, flt, now
+
+OUTSTANDING_BATCH_SIZE = 1000
+
+OUTSTANDING_FIELDS = (
+	"company",
+	"account_type",
+	"account",
+	"voucher_type",
+	"voucher_no",
+	"party_type",
+	"party",
+	"posting_date",
+	"due_date",
+	"account_currency",
+	"cost_center",
+	"invoice_amount",
+	"invoice_amount_in_account_currency",
+	"outstanding",
+	"outstanding_in_account_currency",
+)
+
+
+class PaymentLedgerOutstanding(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		account_type: DF.Literal["Receivable", "Payable"]
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		due_date: DF.Date | None
+		invoice_amount: DF.Currency
+		invoice_amount_in_account_currency: DF.Currency
+		outstanding: DF.Currency
+		outstanding_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		posting_date: DF.Date | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Payment Ledger Outstanding", ["voucher_no", "voucher_type"])
+	frappe.db.add_index("Payment Ledger Outstanding", ["party", "party_type", "account"])
+
+
+def is_payment_ledger_outstanding_enabled() -> bool:
+	return bool(
+		cint(
+			frappe.db.get_single_value("Accounts Settings", "maintain_payment_ledger_outstanding", cache=True)
+		)
+	)
+
+
+def get_linked_vouchers(voucher_type, voucher_no):
+	"""Returns the voucher and the vouchers its Payment Ledger Entries are against,
+	their outstanding changes when the entries of the voucher are deleted"""
+	if not is_payment_ledger_outstanding_enabled():
+		return []
+
+	ple = qb.DocType("Payment Ledger Entry")
+	against_vouchers = (
+		qb.from_(ple)
+		.select(ple.against_voucher_type, ple.against_voucher_no)
+		.distinct()
+		.where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no))
+	).run()
+
+	return [(voucher_type, voucher_no), *against_vouchers]
+
+
+def refresh_payment_ledger_outstanding(vouchers):
+	"""Recompute the amount and outstanding of `vouchers`, a list of (voucher_type, voucher_no),
+	from their Payment Ledger Entries"""
+	if not is_payment_ledger_outstanding_enabled():
+		return
+
+	vouchers = list(dict.fromkeys((v[0], v[1]) for v in vouchers if v[0] and v[1]))
+	for batch in create_batch(vouchers, OUTSTANDING_BATCH_SIZE):
+		cached = qb.DocType("Payment Ledger Outstanding")
+		qb.from_(cached).delete().where(get_voucher_condition(cached, batch)).run()
+		insert_outstandings(get_outstandings_from_ledger(batch))
+
+
+def get_voucher_condition(table, vouchers, voucher_type_field="voucher_type", voucher_no_field="voucher_no"):
+	return Criterion.any(
+		(table[voucher_type_field] == voucher_type) & (table[voucher_no_field] == voucher_no)
+		for voucher_type, voucher_no in vouchers
+	)
+
+
+def get_outstandings_from_ledger(vouchers=None, company=None):
+	"""Aggregate the Payment Ledger into one row per voucher, account and party,
+	the same way `QueryPaymentLedger` combines voucher amounts and outstandings"""
+	ple = qb.DocType("Payment Ledger Entry")
+
+	amount_conditions = [ple.delinked == 0]
+	outstanding_conditions = [ple.delinked == 0]
+	if vouchers:
+		amount_conditions.append(get_voucher_condition(ple, vouchers))
+		outstanding_conditions.append(
+			get_voucher_condition(ple, vouchers, "against_voucher_type", "against_voucher_no")
+		)
+	if company:
+		amount_conditions.append(ple.company == company)
+		outstanding_conditions.append(ple.company == company)
+
+	voucher_amounts = (
+		qb.from_(ple)
+		.select(
+			ple.company,
+			ple.account_type,
+			ple.account,
+			ple.voucher_type,
+			ple.voucher_no,
+			ple.party_type,
+			ple.party,
+			Min(ple.posting_date).as_("posting_date"),
+			Min(ple.due_date).as_("due_date"),
+			Max(ple.account_currency).as_("account_currency"),
+			Max(ple.cost_center).as_("cost_center"),
+			Sum(ple.amount).as_("invoice_amount"),
+			Sum(ple.amount_in_account_currency).as_("invoice_amount_in_account_currency"),
+		)
+		.where(Criterion.all(amount_conditions))
+		.groupby(ple.voucher_type, ple.voucher_no, ple.account, ple.party_type, ple.party)
+	).run(as_dict=True)
+
+	voucher_outstandings = (
+		qb.from_(ple)
+		.select(
+			ple.account,
+			ple.against_voucher_type,
+			ple.against_voucher_no,
+			ple.party_type,
+			ple.party,
+			Sum(ple.amount).as_("outstanding"),
+			Sum(ple.amount_in_account_currency).as_("outstanding_in_account_currency"),
+		)
+		.where(Criterion.all(outstanding_conditions))
+		.groupby(ple.against_voucher_type, ple.against_voucher_no, ple.account, ple.party_type, ple.party)
+	).run(as_dict=True)
+
+	outstandings = {
+		(d.against_voucher_type, d.against_voucher_no, d.account, d.party_type, d.party): d
+		for d in voucher_outstandings
+	}
+	for row in voucher_amounts:
+		outstanding = outstandings.get(get_outstanding_key(row)) or {}
+		row.outstanding = flt(outstanding.get("outstanding"))
+		row.outstanding_in_account_currency = flt(outstanding.get("outstanding_in_account_currency"))
+
+	return voucher_amounts
+
+
+def get_outstanding_key(row):
+	return (row.voucher_type, row.voucher_no, row.account, row.party_type, row.party)
+
+
+def insert_outstandings(rows):
+	if not rows:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			user,
+			user,
+			*[row[f] for f in OUTSTANDING_FIELDS],
+		)
+		for row in rows
+	]
+	frappe.db.bulk_insert(
+		"Payment Ledger Outstanding",
+		fields=["name", "creation", "modified", "owner", "modified_by", *OUTSTANDING_FIELDS],
+		values=values,
+	)
+
+
+def rebuild_payment_ledger_outstanding(company=None):
+	"""Rebuild the outstanding of all the vouchers from the Payment Ledger"""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+	for company in companies:
+		frappe.db.delete("Payment Ledger Outstanding", {"company": company})
+		insert_outstandings(get_outstandings_from_ledger(company=company))
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def check_payment_ledger_outstanding(company=None, repair=False):
+	"""Compare the stored outstanding of the vouchers with the Payment Ledger.
+
+	Returns the (voucher_type, voucher_no) of the vouchers that differ, these are
+	recomputed from the ledger if `repair` is set."""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+	amount_fields = (
+		"invoice_amount",
+		"invoice_amount_in_account_currency",
+		"outstanding",
+		"outstanding_in_account_currency",
+	)
+
+	precision = frappe.get_precision("Payment Ledger Outstanding", "outstanding") or 2
+
+	mismatched_vouchers = []
+	for company in companies:
+		expected = {get_outstanding_key(row): row for row in get_outstandings_from_ledger(company=company)}
+		stored = {
+			get_outstanding_key(row): row
+			for row in frappe.get_all(
+				"Payment Ledger Outstanding",
+				filters={"company": company},
+				fields=["voucher_type", "voucher_no", "account", "party_type", "party", *amount_fields],
+			)
+		}
+
+		for key in expected.keys() | stored.keys():
+			expected_row, stored_row = expected.get(key), stored.get(key)
+			if (
+				not expected_row
+				or not stored_row
+				or any(
+					flt(expected_row[f], precision) != flt(stored_row[f], precision) for f in amount_fields
+				)
+			):
+				mismatched_vouchers.append(key[:2])
+
+	mismatched_vouchers = list(dict.fromkeys(mismatched_vouchers))
+	if repair and mismatched_vouchers:
+		refresh_payment_ledger_outstanding(mismatched_vouchers)
+
+	return mismatched_vouchers
@@ -0,0 +1,59 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	check_payment_ledger_outstanding,
+)
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.utils import get_outstanding_invoices
+
+
+class TestPaymentLedgerOutstanding(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_outstanding(self, voucher_no):
+		return frappe.db.get_value(
+			"Payment Ledger Outstanding",
+			{"voucher_type": "Sales Invoice", "voucher_no": voucher_no},
+			["invoice_amount_in_account_currency", "outstanding_in_account_currency"],
+		)
+
+	@change_settings("Accounts Settings", {"maintain_payment_ledger_outstanding": 1})
+	def test_outstanding_follows_the_payment_ledger(self):
+		si = create_sales_invoice(qty=1, rate=300)
+		self.assertEqual(self.get_outstanding(si.name), (300, 300))
+
+		pe = get_payment_entry("Sales Invoice", si.name)
+		pe.paid_amount = pe.received_amount = pe.references[0].allocated_amount = 100
+		pe.submit()
+		self.assertEqual(self.get_outstanding(si.name), (300, 200))
+		self.assertEqual(frappe.db.get_value("Sales Invoice", si.name, "outstanding_amount"), 200)
+
+		invoices = get_outstanding_invoices(
+			"Customer",
+			si.customer,
+			[si.debit_to],
+			vouchers=[frappe._dict(voucher_type="Sales Invoice", voucher_no=si.name)],
+		)
+		self.assertEqual([(d.voucher_no, d.outstanding_amount) for d in invoices], [(si.name, 200)])
+
+		pe.cancel()
+		self.assertEqual(self.get_outstanding(si.name), (300, 300))
+		self.assertEqual(check_payment_ledger_outstanding(si.company), [])
+
+		# drifted outstanding is reported and repaired from the ledger
+		frappe.db.set_value(
+			"Payment Ledger Outstanding",
+			{"voucher_type": "Sales Invoice", "voucher_no": si.name},
+			"outstanding_in_account_currency",
+			10,
+		)
+		self.assertEqual(
+			check_payment_ledger_outstanding(si.company, repair=True), [("Sales Invoice", si.name)]
+		)
+		self.assertEqual(self.get_outstanding(si.name), (300, 300))
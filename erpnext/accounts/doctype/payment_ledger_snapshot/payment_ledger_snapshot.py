@@ -0,0 +1,235 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import qb
+from frappe.model.document import Document
+from frappe.query_builder import Criterion
+from frappe.query_builder.functions import Max, Min, Sum
+from frappe.utils import add_days, cint, getdate, now, today
+from frappe.utils.background_jobs import is_job_enqueued
+
+SNAPSHOT_KEY_FIELDS = (
+	"account",
+	"voucher_type",
+	"voucher_no",
+	"against_voucher_type",
+	"against_voucher_no",
+	"party_type",
+	"party",
+)
+
+SNAPSHOT_FIELDS = (
+	*SNAPSHOT_KEY_FIELDS,
+	"posting_date",
+	"account_currency",
+	"cost_center",
+	"amount",
+	"amount_in_account_currency",
+)
+
+
+class PaymentLedgerSnapshot(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		account_type: DF.Literal["Receivable", "Payable"]
+		against_voucher_no: DF.DynamicLink | None
+		against_voucher_type: DF.Link | None
+		amount: DF.Currency
+		amount_in_account_currency: DF.Currency
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		posting_date: DF.Date | None
+		snapshot_date: DF.Date | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Payment Ledger Snapshot", ["company", "account_type", "snapshot_date"])
+
+
+def is_payment_ledger_snapshot_enabled() -> bool:
+	return bool(
+		cint(frappe.db.get_single_value("Accounts Settings", "maintain_payment_ledger_snapshots", cache=True))
+	)
+
+
+def get_ledger_balances_query(ple, conditions):
+	"""Payment Ledger Entries summed up per voucher, against voucher, account and party.
+
+	Entries with a positive amount are summed up apart from the rest, the Receivable/Payable
+	report books them as invoiced and the others as paid or credit note."""
+	return (
+		qb.from_(ple)
+		.select(
+			*[ple[fieldname] for fieldname in SNAPSHOT_KEY_FIELDS],
+			Min(ple.posting_date).as_("posting_date"),
+			Max(ple.account_currency).as_("account_currency"),
+			Max(ple.cost_center).as_("cost_center"),
+			Sum(ple.amount).as_("amount"),
+			Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+		)
+		.where(ple.delinked == 0)
+		.where(Criterion.all(conditions))
+		.groupby(*[ple[fieldname] for fieldname in SNAPSHOT_KEY_FIELDS], ple.amount > 0)
+	)
+
+
+def get_valid_snapshot_date(company, account_type, report_date):
+	"""Returns the date of the latest snapshot on or before `report_date`, if no Payment Ledger Entry
+	posted on or before that date has been added, delinked or unlinked since the snapshot was taken"""
+	if not is_payment_ledger_snapshot_enabled():
+		return
+
+	snapshot = qb.DocType("Payment Ledger Snapshot")
+	result = (
+		qb.from_(snapshot)
+		.select(snapshot.snapshot_date, Min(snapshot.creation))
+		.where(
+			(snapshot.company == company)
+			& (snapshot.account_type == account_type)
+			& (snapshot.snapshot_date <= report_date)
+		)
+		.groupby(snapshot.snapshot_date)
+		.orderby(snapshot.snapshot_date, order=frappe.qb.desc)
+		.limit(1)
+	).run()
+
+	if not result:
+		return
+
+	snapshot_date, taken_on = result[0]
+	ple = qb.DocType("Payment Ledger Entry")
+	changed = (
+		qb.from_(ple)
+		.select(ple.name)
+		.where(
+			(ple.modified >= taken_on)
+			& (ple.company == company)
+			& (ple.account_type == account_type)
+			& (ple.posting_date <= snapshot_date)
+		)
+		.limit(1)
+	).run()
+
+	if not changed:
+		return snapshot_date
+
+
+def make_payment_ledger_snapshot(company, account_type, snapshot_date=None):
+	"""Replace the snapshot of the company with the balances of the Payment Ledger as on `snapshot_date`,
+	the previous day by default"""
+	snapshot_date = getdate(snapshot_date or add_days(today(), -1))
+	# taken before reading the ledger, entries changed while reading invalidate the snapshot
+	timestamp = now()
+
+	ple = qb.DocType("Payment Ledger Entry")
+	balances = get_ledger_balances_query(
+		ple,
+		[
+			ple.company == company,
+			ple.account_type == account_type,
+			ple.posting_date <= snapshot_date,
+		],
+	).run(as_dict=True)
+
+	frappe.db.delete("Payment Ledger Snapshot", {"company": company, "account_type": account_type})
+
+	user = frappe.session.user
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			user,
+			user,
+			company,
+			account_type,
+			snapshot_date,
+			*[row[fieldname] for fieldname in SNAPSHOT_FIELDS],
+		)
+		for row in balances
+	]
+	if values:
+		frappe.db.bulk_insert(
+			"Payment Ledger Snapshot",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"company",
+				"account_type",
+				"snapshot_date",
+				*SNAPSHOT_FIELDS,
+			],
+			values=values,
+		)
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+
+def enqueue_payment_ledger_snapshot(company, account_type, snapshot_date=None):
+	job_id = f"payment_ledger_snapshot::{company}::{account_type}"
+	if not is_job_enqueued(job_id):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.payment_ledger_snapshot.payment_ledger_snapshot.make_payment_ledger_snapshot",
+			queue="long",
+			timeout=7200,
+			job_id=job_id,
+			now=frappe.flags.in_test,
+			company=company,
+			account_type=account_type,
+			snapshot_date=snapshot_date,
+		)
+
+
+def make_daily_payment_ledger_snapshots():
+	"""Snapshot the Payment Ledger as on the previous day, reports for later dates add up
+	the entries posted after it"""
+	if not is_payment_ledger_snapshot_enabled():
+		return
+
+	for company in frappe.get_all("Company", pluck="name"):
+		for account_type in ("Receivable", "Payable"):
+			make_payment_ledger_snapshot(company, account_type)
+
+
+def invalidate_payment_ledger_snapshots(voucher_type, voucher_no):
+	"""Drop the snapshots including the active Payment Ledger Entries of the voucher, about to be deleted"""
+	if not is_payment_ledger_snapshot_enabled():
+		return
+
+	ple = qb.DocType("Payment Ledger Entry")
+	entries = (
+		qb.from_(ple)
+		.select(ple.company, ple.account_type, Min(ple.posting_date).as_("posting_date"))
+		.where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no) & (ple.delinked == 0))
+		.groupby(ple.company, ple.account_type)
+	).run(as_dict=True)
+
+	for entry in entries:
+		frappe.db.delete(
+			"Payment Ledger Snapshot",
+			{
+				"company": entry.company,
+				"account_type": entry.account_type,
+				"snapshot_date": (">=", entry.posting_date),
+			},
+		)
@@ -0,0 +1,60 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, getdate, today
+
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.payment_ledger_snapshot.payment_ledger_snapshot import (
+	get_valid_snapshot_date,
+	make_payment_ledger_snapshot,
+)
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import execute
+
+
+class TestPaymentLedgerSnapshot(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_receivables(self, customer):
+		filters = {
+			"company": "_Test Company",
+			"report_date": today(),
+			"party_type": "Customer",
+			"party": [customer],
+			"range1": 30,
+			"range2": 60,
+			"range3": 90,
+			"range4": 120,
+		}
+		return sorted(
+			(row.voucher_type, row.voucher_no, row.invoiced, row.paid, row.credit_note, row.outstanding)
+			for row in execute(filters)[1]
+		)
+
+	@change_settings("Accounts Settings", {"maintain_payment_ledger_snapshots": 1})
+	def test_receivables_from_snapshot_and_later_entries(self):
+		si = create_sales_invoice(qty=1, rate=300, posting_date=add_days(today(), -5))
+		make_payment_ledger_snapshot(si.company, "Receivable")
+
+		pe = get_payment_entry("Sales Invoice", si.name)
+		pe.paid_amount = pe.received_amount = pe.references[0].allocated_amount = 100
+		pe.submit()
+
+		# entries posted after the snapshot date keep it valid
+		self.assertEqual(
+			get_valid_snapshot_date(si.company, "Receivable", today()), getdate(add_days(today(), -1))
+		)
+		receivables = self.get_receivables(si.customer)
+		self.assertIn(("Sales Invoice", si.name, 300, 100, 0, 200), receivables)
+
+		# same as the report from the ledger
+		frappe.db.delete("Payment Ledger Snapshot")
+		self.assertEqual(self.get_receivables(si.customer), receivables)
+
+		# backdated entries invalidate the snapshot
+		make_payment_ledger_snapshot(si.company, "Receivable")
+		create_sales_invoice(qty=1, rate=50, posting_date=add_days(today(), -3))
+		self.assertIsNone(get_valid_snapshot_date(si.company, "Receivable", today()))
@@ -425,42 +425,33 @@ class PaymentReconciliation(Document):
 		)
 
 		entries = []
-		for pay in args.get("payments"):
-			pay.update({"unreconciled_amount": pay.get("amount")})
-			for inv in args.get("invoices"):
-				if pay.get("amount") >= inv.get("outstanding_amount"):
-					res = self.get_allocated_entry(pay, inv, inv["outstanding_amount"])
-					pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
-					inv["outstanding_amount"] = 0
-				else:
-					res = self.get_allocated_entry(pay, inv, pay["amount"])
-					inv["outstanding_amount"] = flt(inv.get("outstanding_amount")) - flt(pay.get("amount"))
-					pay["amount"] = 0
-
-				inv["exchange_rate"] = invoice_exchange_map.get(inv.get("invoice_number"))
-				if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
-					pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
-
-				res.difference_amount = self.get_difference_amount(pay, inv, res["allocated_amount"])
-				res.difference_account = default_exchange_gain_loss_account
-				res.exchange_rate = inv.get("exchange_rate")
-				res.update({"gain_loss_posting_date": pay.get("posting_date")})
-
-				if pay.get("amount") == 0:
-					entries.append(res)
-					break
-				elif inv.get("outstanding_amount") == 0:
-					entries.append(res)
-					continue
-
+		for pay, inv in get_allocation_pairs(args.get("payments"), args.get("invoices")):
+			if pay.get("amount") >= inv.get("outstanding_amount"):
+				res = self.get_allocated_entry(pay, inv, inv["outstanding_amount"])
+				pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
+				inv["outstanding_amount"] = 0
 			else:
-				break
+				res = self.get_allocated_entry(pay, inv, pay["amount"])
+				inv["outstanding_amount"] = flt(inv.get("outstanding_amount")) - flt(pay.get("amount"))
+				pay["amount"] = 0
+
+			if not res["allocated_amount"]:
+				continue
+
+			inv["exchange_rate"] = invoice_exchange_map.get(inv.get("invoice_number"))
+			if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
+				pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
+
+			res.difference_amount = self.get_difference_amount(pay, inv, res["allocated_amount"])
+			res.difference_account = default_exchange_gain_loss_account
+			res.exchange_rate = inv.get("exchange_rate")
+			res.update({"gain_loss_posting_date": pay.get("posting_date")})
+			entries.append(res)
 
 		self.set("allocation", [])
 		for entry in entries:
-			if entry["allocated_amount"] != 0:
-				row = self.append("allocation", {})
-				row.update(entry)
+			row = self.append("allocation", {})
+			row.update(entry)
 
 	def update_dimension_values_in_allocated_entries(self, res):
 		for x in self.dimensions:
@@ -735,6 +726,25 @@ class PaymentReconciliation(Document):
 		return conditions
 
 
+def get_allocation_pairs(payments, invoices):
+	"""Pairs of payment and invoice to allocate, in a single pass over both lists in their order.
+
+	The caller allocates the smaller of the payment `amount` and the invoice `outstanding_amount`
+	and reduces both by it, before the next pair is taken. A payment is paired with the following
+	invoices until its amount is allocated, the pairing stops when the invoices run out."""
+	invoices = iter(invoices)
+	inv = next(invoices, None)
+	for pay in payments:
+		pay.update({"unreconciled_amount": pay.get("amount")})
+		while inv is not None:
+			yield pay, inv
+			if pay.get("amount") == 0:
+				break
+			inv = next(invoices, None)
+		else:
+			return
+
+
 def reconcile_dr_cr_note(dr_cr_notes, company, active_dimensions=None):
 	for inv in dr_cr_notes:
 		voucher_type = "Credit Note" if inv.voucher_type == "Sales Invoice" else "Debit Note"
@@ -478,6 +478,43 @@ class TestPaymentReconciliation(FrappeTestCase):
 		self.assertEqual(len(pr.get("payments")), 0)
 		self.assertEqual(pr.get("invoices")[0].get("outstanding_amount"), 165)
 
+	def test_allocation_of_multiple_payments_to_multiple_invoices(self):
+		invoices = [self.create_sales_invoice(qty=1, rate=rate) for rate in (100, 50, 80)]
+		payments = [self.create_payment_entry(amount=amount).save().submit() for amount in (120, 90, 40)]
+
+		pr = self.create_payment_reconciliation()
+		pr.get_unreconciled_entries()
+
+		# allocate in the order of creation
+		invoice_rows = {x.invoice_number: x.as_dict() for x in pr.get("invoices")}
+		payment_rows = {x.reference_name: x.as_dict() for x in pr.get("payments")}
+		pr.allocate_entries(
+			frappe._dict(
+				{
+					"invoices": [invoice_rows[x.name] for x in invoices],
+					"payments": [payment_rows[x.name] for x in payments],
+				}
+			)
+		)
+
+		self.assertEqual(
+			[(row.reference_name, row.invoice_number, row.allocated_amount) for row in pr.allocation],
+			[
+				(payments[0].name, invoices[0].name, 100),
+				(payments[0].name, invoices[1].name, 20),
+				(payments[1].name, invoices[1].name, 30),
+				(payments[1].name, invoices[2].name, 60),
+				(payments[2].name, invoices[2].name, 20),
+			],
+		)
+
+		pr.reconcile()
+		for si in invoices:
+			self.assertEqual(frappe.db.get_value("Sales Invoice", si.name, "outstanding_amount"), 0)
+
+		self.assertEqual(pr.get("invoices"), [])
+		self.assertEqual([(x.reference_name, x.amount) for x in pr.get("payments")], [(payments[2].name, 20)])
+
 	def test_payment_against_journal(self):
 		transaction_date = nowdate()
 
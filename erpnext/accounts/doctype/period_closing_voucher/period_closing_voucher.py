@@ -5,7 +5,8 @@
 import frappe
 from frappe import _
 from frappe.query_builder.functions import Sum
-from frappe.utils import add_days, flt
+from frappe.utils import add_days, create_batch, flt
+from frappe.utils.background_jobs import is_job_enqueued
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
@@ -13,6 +14,8 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 from erpnext.accounts.utils import get_account_currency, get_fiscal_year, validate_fiscal_year
 from erpnext.controllers.accounts_controller import AccountsController
 
+CLOSING_BALANCE_BATCH_SIZE = 500
+
 
 class PeriodClosingVoucher(AccountsController):
 	# begin: auto-generated types
@@ -41,14 +44,33 @@ class PeriodClosingVoucher(AccountsController):
 
 	def on_submit(self):
 		self.db_set("gle_processing_status", "In Progress")
-		get_opening_entries = False
+		self.enqueue_closing()
 
-		if not frappe.db.exists(
-			"Period Closing Voucher", {"company": self.company, "docstatus": 1, "name": ("!=", self.name)}
-		):
-			get_opening_entries = True
+	@frappe.whitelist()
+	def resume_closing(self):
+		if self.docstatus != 1 or self.gle_processing_status != "Failed":
+			return
+
+		self.db_set({"gle_processing_status": "In Progress", "error_message": None})
+		self.enqueue_closing()
+
+	def enqueue_closing(self):
+		job_id = f"period_closing_voucher::{self.name}"
+		if not is_job_enqueued(job_id):
+			frappe.enqueue(
+				process_period_closing_voucher,
+				voucher_name=self.name,
+				queue="long",
+				timeout=7200,
+				job_id=job_id,
+				now=frappe.flags.in_test,
+				enqueue_after_commit=True,
+			)
 
-		self.make_gl_entries(get_opening_entries=get_opening_entries)
+		frappe.msgprint(
+			_("The GL Entries will be processed in the background, it can take a few minutes."),
+			alert=True,
+		)
 
 	def on_cancel(self):
 		self.validate_future_closing_vouchers()
@@ -161,43 +183,22 @@ class PeriodClosingVoucher(AccountsController):
 		):
 			frappe.throw(_("Previous Year is not closed, please close it first"))
 
-	def make_gl_entries(self, get_opening_entries=False):
-		gl_entries = self.get_gl_entries()
-		closing_entries = self.get_grouped_gl_entries(get_opening_entries=get_opening_entries)
-		if len(gl_entries + closing_entries) > 3000:
-			frappe.enqueue(
-				process_gl_entries,
-				gl_entries=gl_entries,
-				voucher_name=self.name,
-				timeout=3000,
-			)
-
-			frappe.enqueue(
-				process_closing_entries,
-				gl_entries=gl_entries,
-				closing_entries=closing_entries,
-				voucher_name=self.name,
-				company=self.company,
-				closing_date=self.posting_date,
-				timeout=3000,
-			)
-
-			frappe.msgprint(
-				_("The GL Entries will be processed in the background, it can take a few minutes."),
-				alert=True,
-			)
-		else:
-			process_gl_entries(gl_entries, self.name)
-			process_closing_entries(gl_entries, closing_entries, self.name, self.company, self.posting_date)
+	def get_previous_closing_voucher(self):
+		return frappe.db.get_value(
+			"Period Closing Voucher",
+			{"docstatus": 1, "company": self.company, "posting_date": ("<", self.posting_date)},
+			["name", "posting_date"],
+			order_by="posting_date desc",
+			as_dict=1,
+		)
 
-	def get_grouped_gl_entries(self, get_opening_entries=False):
-		closing_entries = []
-		for acc in self.get_balances_based_on_dimensions(
-			group_by_account=True, for_aggregation=True, get_opening_entries=get_opening_entries
-		):
-			closing_entries.append(self.get_closing_entries(acc))
+	def get_closing_from_date(self):
+		"""Entries posted after the previous closing are closed, from the start of the year
+		for the first closing of the company"""
+		if previous_closing_voucher := self.get_previous_closing_voucher():
+			return add_days(previous_closing_voucher.posting_date, 1)
 
-		return closing_entries
+		return self.year_start_date
 
 	def get_gl_entries(self):
 		gl_entries = []
@@ -270,29 +271,6 @@ class PeriodClosingVoucher(AccountsController):
 		self.update_default_dimensions(gl_entry, acc)
 		return gl_entry
 
-	def get_closing_entries(self, acc):
-		closing_entry = self.get_gl_dict(
-			{
-				"company": self.company,
-				"closing_date": self.posting_date,
-				"period_closing_voucher": self.name,
-				"account": acc.account,
-				"cost_center": acc.cost_center,
-				"finance_book": acc.finance_book,
-				"account_currency": acc.account_currency,
-				"debit_in_account_currency": flt(acc.debit_in_account_currency),
-				"debit": flt(acc.debit),
-				"credit_in_account_currency": flt(acc.credit_in_account_currency),
-				"credit": flt(acc.credit),
-			},
-			item=acc,
-		)
-
-		for dimension in self.accounting_dimensions:
-			closing_entry.update({dimension: acc.get(dimension)})
-
-		return closing_entry
-
 	def update_default_dimensions(self, gl_entry, acc):
 		if not self.accounting_dimensions:
 			self.accounting_dimensions = get_accounting_dimensions()
@@ -300,10 +278,8 @@ class PeriodClosingVoucher(AccountsController):
 		for dimension in self.accounting_dimensions:
 			gl_entry.update({dimension: acc.get(dimension)})
 
-	def get_balances_based_on_dimensions(
-		self, group_by_account=False, report_type=None, for_aggregation=False, get_opening_entries=False
-	):
-		"""Get balance for dimension-wise pl accounts"""
+	def get_balances_based_on_dimensions(self, group_by_account=False, report_type=None):
+		"""Get balance for dimension-wise pl accounts, since the previous closing"""
 
 		qb_dimension_fields = ["cost_center", "finance_book", "project"]
 
@@ -325,22 +301,14 @@ class PeriodClosingVoucher(AccountsController):
 		accounts = frappe.get_all("Account", filters=account_filters, pluck="name")
 
 		gl_entry = frappe.qb.DocType("GL Entry")
-		query = frappe.qb.from_(gl_entry).select(gl_entry.account, gl_entry.account_currency)
-
-		if not for_aggregation:
-			query = query.select(
-				(Sum(gl_entry.debit_in_account_currency) - Sum(gl_entry.credit_in_account_currency)).as_(
-					"bal_in_account_currency"
-				),
-				(Sum(gl_entry.debit) - Sum(gl_entry.credit)).as_("bal_in_company_currency"),
-			)
-		else:
-			query = query.select(
-				(Sum(gl_entry.debit_in_account_currency)).as_("debit_in_account_currency"),
-				(Sum(gl_entry.credit_in_account_currency)).as_("credit_in_account_currency"),
-				(Sum(gl_entry.debit)).as_("debit"),
-				(Sum(gl_entry.credit)).as_("credit"),
-			)
+		query = frappe.qb.from_(gl_entry).select(
+			gl_entry.account,
+			gl_entry.account_currency,
+			(Sum(gl_entry.debit_in_account_currency) - Sum(gl_entry.credit_in_account_currency)).as_(
+				"bal_in_account_currency"
+			),
+			(Sum(gl_entry.debit) - Sum(gl_entry.credit)).as_("bal_in_company_currency"),
+		)
 
 		for dimension in qb_dimension_fields:
 			query = query.select(gl_entry[dimension])
@@ -349,54 +317,95 @@ class PeriodClosingVoucher(AccountsController):
 			(gl_entry.company == self.company)
 			& (gl_entry.is_cancelled == 0)
 			& (gl_entry.account.isin(accounts))
+			& (gl_entry.posting_date.between(self.get_closing_from_date(), self.posting_date))
+			& (gl_entry.is_opening == "No")
 		)
 
-		if get_opening_entries:
-			query = query.where(
-				gl_entry.posting_date.between(self.get("year_start_date"), self.posting_date)
-				| gl_entry.is_opening
-				== "Yes"
+		for dimension in qb_dimension_fields:
+			query = query.groupby(gl_entry[dimension])
+
+		return query.run(as_dict=1)
+
+	def make_closing_balances(self):
+		"""Make Account Closing Balances in batches of accounts, committed one by one. Accounts
+		closed by an earlier run of the job are skipped."""
+		from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+			get_closing_balances,
+			insert_closing_balances,
+		)
+
+		previous_closing_voucher = self.get_previous_closing_voucher()
+		from_date = self.get_closing_from_date()
+
+		closed_accounts = set(
+			frappe.get_all(
+				"Account Closing Balance",
+				filters={"period_closing_voucher": self.name},
+				pluck="account",
+				distinct=True,
 			)
-		else:
-			query = query.where(
-				gl_entry.posting_date.between(self.get("year_start_date"), self.posting_date)
-				& gl_entry.is_opening
-				== "No"
+		)
+		accounts = [
+			account
+			for account in frappe.get_all(
+				"Account", filters={"company": self.company, "is_group": 0}, pluck="name", order_by="name"
+			)
+			if account not in closed_accounts
+		]
+
+		for idx, batch in enumerate(create_batch(accounts, CLOSING_BALANCE_BATCH_SIZE), start=1):
+			closing_balances = get_closing_balances(
+				self.company,
+				self.posting_date,
+				from_date,
+				self.name,
+				previous_closing_voucher and previous_closing_voucher.name,
+				batch,
+				include_opening_entries=not previous_closing_voucher,
 			)
+			insert_closing_balances(closing_balances, self.name, self.company, self.posting_date)
 
-		if for_aggregation:
-			query = query.where(gl_entry.voucher_type != "Period Closing Voucher")
+			if not frappe.flags.in_test:
+				frappe.db.commit()
 
-		for dimension in qb_dimension_fields:
-			query = query.groupby(gl_entry[dimension])
+			self.publish_closing_progress(
+				min(idx * CLOSING_BALANCE_BATCH_SIZE, len(accounts)), len(accounts), _("Closing Accounts")
+			)
+
+	def publish_closing_progress(self, count, total, description):
+		frappe.publish_progress(
+			count * 100 / (total or 1),
+			title=_("Processing Period Closing Voucher..."),
+			doctype=self.doctype,
+			docname=self.name,
+			description=description,
+		)
 
-		return query.run(as_dict=1)
 
+def process_period_closing_voucher(voucher_name):
+	"""Post the GL Entries and make the Account Closing Balances of a Period Closing Voucher.
 
-def process_gl_entries(gl_entries, voucher_name):
+	Steps completed by an earlier run are skipped, so a failed closing resumes where it stopped."""
 	from erpnext.accounts.general_ledger import make_gl_entries
 
+	pcv = frappe.get_doc("Period Closing Voucher", voucher_name)
 	try:
-		if gl_entries:
-			make_gl_entries(gl_entries, merge_entries=False)
-		frappe.db.set_value("Period Closing Voucher", voucher_name, "gle_processing_status", "Completed")
-	except Exception as e:
-		frappe.db.rollback()
-		frappe.log_error(e)
-		frappe.db.set_value("Period Closing Voucher", voucher_name, "gle_processing_status", "Failed")
-
+		if not frappe.db.exists(
+			"GL Entry", {"voucher_type": pcv.doctype, "voucher_no": pcv.name, "is_cancelled": 0}
+		):
+			if gl_entries := pcv.get_gl_entries():
+				make_gl_entries(gl_entries, merge_entries=False)
 
-def process_closing_entries(gl_entries, closing_entries, voucher_name, company, closing_date):
-	from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
-		make_closing_entries,
-	)
+			if not frappe.flags.in_test:
+				frappe.db.commit()
 
-	try:
-		if gl_entries + closing_entries:
-			make_closing_entries(gl_entries + closing_entries, voucher_name, company, closing_date)
-	except Exception as e:
+		pcv.publish_closing_progress(0, 1, _("Closing Accounts"))
+		pcv.make_closing_balances()
+		pcv.db_set("gle_processing_status", "Completed")
+	except Exception:
 		frappe.db.rollback()
-		frappe.log_error(e)
+		pcv.log_error("Period Closing Voucher failed")
+		pcv.db_set({"gle_processing_status": "Failed", "error_message": frappe.get_traceback()})
 
 
 def make_reverse_gl_entries(voucher_type, voucher_no):
@@ -317,6 +317,63 @@ class TestPeriodClosingVoucher(unittest.TestCase):
 		repost_doc.posting_date = today()
 		repost_doc.save()
 
+	def test_resume_failed_closing(self):
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabAccount Closing Balance` where company='Test PCV Company'")
+
+		company = create_company()
+		cost_center = create_cost_center("Test Cost Center 1")
+
+		jv = make_journal_entry(
+			posting_date="2021-03-15",
+			amount=400,
+			account1="Cash - TPC",
+			account2="Sales - TPC",
+			cost_center=cost_center,
+			save=False,
+		)
+		jv.company = company
+		jv.save()
+		jv.submit()
+
+		pcv = self.make_period_closing_voucher(posting_date="2021-03-31")
+
+		def get_closing_balances():
+			return frappe.get_all(
+				"Account Closing Balance",
+				filters={"period_closing_voucher": pcv.name},
+				fields=["account", "cost_center", "is_period_closing_voucher_entry", "debit", "credit"],
+				order_by="account, cost_center, is_period_closing_voucher_entry",
+			)
+
+		closing_balances = get_closing_balances()
+		self.assertIn(
+			{
+				"account": "Sales - TPC",
+				"cost_center": cost_center,
+				"is_period_closing_voucher_entry": 0,
+				"debit": 0,
+				"credit": 400,
+			},
+			closing_balances,
+		)
+
+		# closing failed after posting the GL Entries and closing some of the accounts
+		frappe.db.delete(
+			"Account Closing Balance", {"period_closing_voucher": pcv.name, "account": "Sales - TPC"}
+		)
+		pcv.db_set("gle_processing_status", "Failed")
+		gl_entries_count = frappe.db.count("GL Entry", {"voucher_no": pcv.name})
+
+		pcv.reload()
+		pcv.resume_closing()
+		pcv.reload()
+
+		self.assertEqual(pcv.gle_processing_status, "Completed")
+		self.assertEqual(get_closing_balances(), closing_balances)
+		self.assertEqual(frappe.db.count("GL Entry", {"voucher_no": pcv.name}), gl_entries_count)
+
 	def make_period_closing_voucher(self, posting_date=None, submit=True):
 		surplus_account = create_account()
 		cost_center = create_cost_center("Test Cost Center 1")
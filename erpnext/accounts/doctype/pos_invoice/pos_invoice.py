@@ -732,6 +732,100 @@ def get_stock_availability(item_code, warehouse):
 			return 0, is_stock_item
 
 
+def get_items_stock_availability(item_codes, warehouse):
+	"""Same as `get_stock_availability` for all of `item_codes`, with a query per table.
+
+	Returns {item_code: (available qty, is stock item)}"""
+	if not item_codes:
+		return {}
+
+	is_stock_item = dict(
+		frappe.get_all(
+			"Item", filters={"name": ("in", item_codes)}, fields=["name", "is_stock_item"], as_list=1
+		)
+	)
+	non_stock_items = [d for d in item_codes if not is_stock_item.get(d)]
+	bundles = (
+		frappe.get_all(
+			"Product Bundle", filters={"name": ("in", non_stock_items), "disabled": 0}, pluck="name"
+		)
+		if non_stock_items
+		else []
+	)
+
+	bundle_items = {}
+	if bundles:
+		for d in frappe.get_all(
+			"Product Bundle Item",
+			filters={"parent": ("in", bundles)},
+			fields=["parent", "item_code", "qty"],
+			order_by="idx",
+		):
+			bundle_items.setdefault(d.parent, []).append(d)
+
+	components = list({d.item_code for rows in bundle_items.values() for d in rows} - set(is_stock_item))
+	if components:
+		is_stock_item.update(
+			frappe.get_all(
+				"Item", filters={"name": ("in", components)}, fields=["name", "is_stock_item"], as_list=1
+			)
+		)
+
+	bin_qty, pos_reserved_qty = get_items_bin_and_pos_reserved_qty([*item_codes, *components], warehouse)
+
+	availability = {}
+	for item_code in item_codes:
+		if is_stock_item.get(item_code):
+			availability[item_code] = (bin_qty.get(item_code, 0) - pos_reserved_qty.get(item_code, 0), True)
+		elif item_code in bundles:
+			bundle_bin_qty = 1000000
+			for d in bundle_items.get(item_code, []):
+				available_qty = bin_qty.get(d.item_code, 0) - pos_reserved_qty.get(d.item_code, 0)
+				max_available_bundles = available_qty / d.qty
+				if bundle_bin_qty > max_available_bundles and is_stock_item.get(d.item_code):
+					bundle_bin_qty = max_available_bundles
+
+			availability[item_code] = (bundle_bin_qty - pos_reserved_qty.get(item_code, 0), True)
+		else:
+			availability[item_code] = (0, False)
+
+	return availability
+
+
+def get_items_bin_and_pos_reserved_qty(item_codes, warehouse):
+	"""Returns the Bin qty and the qty reserved by unconsolidated POS Invoices of the items in the warehouse"""
+	bin_qty = {
+		item_code: flt(actual_qty)
+		for item_code, actual_qty in frappe.get_all(
+			"Bin",
+			filters={"item_code": ("in", item_codes), "warehouse": warehouse},
+			fields=["item_code", "actual_qty"],
+			as_list=1,
+		)
+	}
+
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+	pos_reserved_qty = {
+		item_code: flt(stock_qty)
+		for item_code, stock_qty in (
+			frappe.qb.from_(p_inv)
+			.from_(p_item)
+			.select(p_item.item_code, Sum(p_item.stock_qty))
+			.where(
+				(p_inv.name == p_item.parent)
+				& (IfNull(p_inv.consolidated_invoice, "") == "")
+				& (p_item.docstatus == 1)
+				& (p_item.item_code.isin(item_codes))
+				& (p_item.warehouse == warehouse)
+			)
+			.groupby(p_item.item_code)
+		).run()
+	}
+
+	return bin_qty, pos_reserved_qty
+
+
 def get_bundle_availability(bundle_item_code, warehouse):
 	product_bundle = frappe.get_doc("Product Bundle", bundle_item_code)
 
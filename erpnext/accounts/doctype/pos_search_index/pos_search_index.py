@@ -0,0 +1,211 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, create_batch, cstr, now
+from frappe.utils.background_jobs import is_job_enqueued
+
+INDEX_BATCH_SIZE = 1000
+
+REBUILD_JOB_ID = "rebuild_pos_search_index"
+
+# length of the Data field the tokens are stored in
+TOKEN_LENGTH = 140
+
+SEARCH_FIELD_WEIGHTS = {"item_code": 100, "barcode": 90, "item_name": 50}
+CUSTOM_SEARCH_FIELD_WEIGHT = 30
+
+
+class POSSearchIndex(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		fieldname: DF.Data | None
+		item_code: DF.Link | None
+		token: DF.Data | None
+		weight: DF.Int
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("POS Search Index", ["token", "item_code"])
+
+
+def is_pos_search_index_enabled() -> bool:
+	return bool(cint(frappe.db.get_single_value("POS Settings", "use_search_index", cache=True)))
+
+
+def can_search_from_index() -> bool:
+	"""Searches read the index once it is enabled and no rebuild of it is running, until then
+	they scan the Item table"""
+	return is_pos_search_index_enabled() and not is_job_enqueued(REBUILD_JOB_ID)
+
+
+def get_words(value):
+	return [word for word in re.split(r"[^\w]+", cstr(value).lower()) if word]
+
+
+def get_tokens(value):
+	"""The whole value and each of its words in lower case, searched by prefix"""
+	value = cstr(value).strip().lower()
+	if not value:
+		return set()
+
+	tokens = {value[:TOKEN_LENGTH]}
+	tokens.update(word[:TOKEN_LENGTH] for word in get_words(value))
+	return tokens
+
+
+def get_search_fields():
+	return [
+		d.fieldname
+		for d in frappe.get_all("POS Search Fields", fields=["fieldname"])
+		if d.fieldname and d.fieldname not in SEARCH_FIELD_WEIGHTS
+	]
+
+
+def get_index_rows(item_codes, search_fields):
+	"""Returns the (item_code, token, fieldname, weight) of the items, with the highest weight
+	per item and token"""
+	rows = {}
+
+	def add(item_code, fieldname, value):
+		weight = SEARCH_FIELD_WEIGHTS.get(fieldname, CUSTOM_SEARCH_FIELD_WEIGHT)
+		for token in get_tokens(value):
+			if (item_code, token) not in rows or rows[(item_code, token)][3] < weight:
+				rows[(item_code, token)] = (item_code, token, fieldname, weight)
+
+	for item in frappe.get_all(
+		"Item", filters={"name": ("in", item_codes)}, fields=["name", "item_name", *search_fields]
+	):
+		add(item.name, "item_code", item.name)
+		add(item.name, "item_name", item.item_name)
+		for fieldname in search_fields:
+			add(item.name, fieldname, item.get(fieldname))
+
+	for d in frappe.get_all(
+		"Item Barcode", filters={"parent": ("in", item_codes)}, fields=["parent", "barcode"]
+	):
+		add(d.parent, "barcode", d.barcode)
+
+	return list(rows.values())
+
+
+def index_items(item_codes, search_fields=None):
+	"""Replace the index entries of the items"""
+	if not item_codes:
+		return
+
+	if search_fields is None:
+		search_fields = get_search_fields()
+
+	frappe.db.delete("POS Search Index", {"item_code": ("in", item_codes)})
+
+	timestamp = now()
+	user = frappe.session.user
+	values = [
+		(frappe.generate_hash(length=10), timestamp, timestamp, user, user, *row)
+		for row in get_index_rows(item_codes, search_fields)
+	]
+	if values:
+		frappe.db.bulk_insert(
+			"POS Search Index",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"item_code",
+				"token",
+				"fieldname",
+				"weight",
+			],
+			values=values,
+		)
+
+
+def rebuild_pos_search_index():
+	"""Index all the items, in batches, replacing the entries of each batch of items in place.
+	Searches scan the Item table while this runs, see `can_search_from_index`."""
+	search_fields = get_search_fields()
+	for item_codes in create_batch(frappe.get_all("Item", pluck="name", order_by="name"), INDEX_BATCH_SIZE):
+		index_items(item_codes, search_fields)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	# entries of the items deleted while the index was disabled
+	frappe.db.sql(
+		"""delete from `tabPOS Search Index`
+		where not exists (select name from `tabItem` item where item.name = `tabPOS Search Index`.item_code)"""
+	)
+
+
+def enqueue_rebuild_pos_search_index():
+	if not is_job_enqueued(REBUILD_JOB_ID):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.pos_search_index.pos_search_index.rebuild_pos_search_index",
+			queue="long",
+			timeout=7200,
+			job_id=REBUILD_JOB_ID,
+			now=frappe.flags.in_test,
+			enqueue_after_commit=True,
+		)
+
+
+def update_item_search_index(doc, method=None):
+	if is_pos_search_index_enabled():
+		index_items([doc.name])
+
+
+def delete_item_search_index(doc, method=None):
+	if is_pos_search_index_enabled():
+		frappe.db.delete("POS Search Index", {"item_code": doc.name})
+
+
+def rename_item_search_index(doc, method=None, old=None, new=None, merge=False):
+	if is_pos_search_index_enabled():
+		frappe.db.delete("POS Search Index", {"item_code": ("in", [old, new])})
+		index_items([new])
+
+
+def get_search_terms(search_term):
+	"""The distinct words of the search term, split the same way as the indexed values"""
+	return list(dict.fromkeys(get_words(search_term)))
+
+
+def get_search_index_query(search_term):
+	"""SQL query of the item codes with a token starting with each of the words in `search_term`,
+	with the score of the matches. Tokens equal to a word score twice their weight."""
+	subqueries = []
+	for term_no, term in enumerate(get_search_terms(search_term)):
+		term = term[:TOKEN_LENGTH]
+		like = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+		subqueries.append(
+			f"""
+			select idx.item_code, {term_no} as term_no,
+				max(case when idx.token = {frappe.db.escape(term)} then 2 * idx.weight else idx.weight end) as score
+			from `tabPOS Search Index` idx
+			where idx.token like {frappe.db.escape(like)}
+			group by idx.item_code"""
+		)
+
+	if not subqueries:
+		return
+
+	return f"""
+		select matches.item_code, sum(matches.score) as score
+		from ({" union all ".join(subqueries)}) matches
+		group by matches.item_code
+		having count(*) = {len(subqueries)}"""
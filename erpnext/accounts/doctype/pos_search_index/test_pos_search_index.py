@@ -0,0 +1,81 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
+from erpnext.accounts.doctype.pos_search_index.pos_search_index import (
+	get_search_terms,
+	rebuild_pos_search_index,
+)
+from erpnext.selling.page.point_of_sale.point_of_sale import get_items
+from erpnext.stock.doctype.item.test_item import make_item
+
+
+class TestPOSSearchIndex(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def search(self, pos_profile, search_term):
+		result = get_items(
+			start=0,
+			page_length=500,
+			price_list=None,
+			item_group="All Item Groups",
+			pos_profile=pos_profile,
+			search_term=search_term,
+		)
+		# leave out the other items of the test site
+		return [
+			d["item_code"] for d in result.get("items", []) if d["item_code"].startswith("_Test POS Index")
+		]
+
+	@change_settings("POS Settings", {"use_search_index": 1})
+	def test_search_items_from_index(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Search Index")
+		shirt = make_item("_Test POS Index Shirt", {"item_name": "Red Cotton Shirt", "is_stock_item": 0})
+		make_item("_Test POS Index Scarf", {"item_name": "Red Silk Scarf", "is_stock_item": 0})
+
+		self.assertTrue(frappe.db.exists("POS Search Index", {"item_code": shirt.name, "token": "cotton"}))
+
+		# every word is matched by prefix
+		self.assertEqual(self.search(pos_profile.name, "red cot"), [shirt.name])
+		self.assertEqual(
+			self.search(pos_profile.name, "RED"), ["_Test POS Index Scarf", "_Test POS Index Shirt"]
+		)
+
+		# matches on the item code rank above matches on the name
+		make_item("_Test POS Index Silk", {"item_name": "Blue Tie", "is_stock_item": 0})
+		self.assertEqual(self.search(pos_profile.name, "silk")[0], "_Test POS Index Silk")
+
+		# the index follows changes to the items
+		shirt.item_name = "Green Cotton Shirt"
+		shirt.append("barcodes", {"barcode": "8901234567891"})
+		shirt.save()
+		self.assertEqual(self.search(pos_profile.name, "red"), ["_Test POS Index Scarf"])
+		self.assertEqual(self.search(pos_profile.name, "89012345"), [shirt.name])
+
+		# search terms are split into words like the indexed values
+		self.assertEqual(get_search_terms("Green-Cotton  green"), ["green", "cotton"])
+		self.assertEqual(self.search(pos_profile.name, "green-cot"), [shirt.name])
+
+		shirt.delete()
+		self.assertFalse(frappe.db.exists("POS Search Index", {"item_code": shirt.name}))
+
+	@change_settings("POS Settings", {"use_search_index": 1})
+	def test_rebuild_search_index(self):
+		shirt = make_item("_Test POS Index Shirt", {"item_name": "Red Cotton Shirt", "is_stock_item": 0})
+		frappe.db.delete("POS Search Index", {"item_code": shirt.name})
+		frappe.db.bulk_insert(
+			"POS Search Index",
+			fields=["name", "item_code", "token", "fieldname", "weight"],
+			values=[
+				(frappe.generate_hash(length=10), "_Test POS Index Deleted Item", "deleted", "item_code", 100)
+			],
+		)
+
+		rebuild_pos_search_index()
+
+		self.assertTrue(frappe.db.exists("POS Search Index", {"item_code": shirt.name, "token": "cotton"}))
+		self.assertFalse(frappe.db.exists("POS Search Index", {"item_code": "_Test POS Index Deleted Item"}))
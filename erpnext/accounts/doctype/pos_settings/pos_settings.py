@@ -4,6 +4,8 @@
 
 from frappe.model.document import Document
 
+from erpnext.accounts.doctype.pos_search_index.pos_search_index import enqueue_rebuild_pos_search_index
+
 
 class POSSettings(Document):
 	# begin: auto-generated types
@@ -19,7 +21,21 @@ class POSSettings(Document):
 
 		invoice_fields: DF.Table[POSField]
 		pos_search_fields: DF.Table[POSSearchFields]
+		use_search_index: DF.Check
 	# end: auto-generated types
 
 	def validate(self):
 		pass
+
+	def on_update(self):
+		old_doc = self.get_doc_before_save()
+		if not self.use_search_index:
+			return
+
+		search_fields = [d.fieldname for d in self.pos_search_fields]
+		if (
+			not old_doc
+			or not old_doc.use_search_index
+			or search_fields != [d.fieldname for d in old_doc.pos_search_fields]
+		):
+			enqueue_rebuild_pos_search_index()
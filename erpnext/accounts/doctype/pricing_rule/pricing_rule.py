@@ -144,6 +144,16 @@ class PricingRule(Document):
 		if not self.margin_type:
 			self.margin_rate_or_amount = 0.0
 
+	def on_update(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import invalidate_pricing_rule_index
+
+		invalidate_pricing_rule_index()
+
+	def on_trash(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import invalidate_pricing_rule_index
+
+		invalidate_pricing_rule_index()
+
 	def validate_duplicate_apply_on(self):
 		if self.apply_on != "Transaction":
 			apply_on_table = apply_on_dict.get(self.apply_on)
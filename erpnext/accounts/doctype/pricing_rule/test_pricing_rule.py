@@ -5,7 +5,9 @@
 import unittest
 
 import frappe
+from frappe.tests.utils import change_settings
 
+from erpnext.accounts.doctype.pricing_rule.utils import clear_pricing_rule_index
 from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import make_purchase_invoice
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
@@ -1239,6 +1241,111 @@ class TestPricingRule(unittest.TestCase):
 		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule 1")
 		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule 2")
 
+	def test_pricing_rule_index(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import get_pricing_rules
+
+		make_pricing_rule(
+			title="_Test Pricing Rule Item Code",
+			selling=1,
+			discount_percentage=10,
+			priority=2,
+			apply_multiple_pricing_rules=1,
+		)
+		item_group_rule = make_pricing_rule(
+			title="_Test Pricing Rule Item Group",
+			apply_on="Item Group",
+			item_group="All Item Groups",
+			selling=1,
+			discount_percentage=20,
+			priority=1,
+			apply_multiple_pricing_rules=1,
+		)
+		make_pricing_rule(title="_Test Pricing Rule Buying", buying=1, discount_percentage=30)
+
+		args = frappe._dict(
+			{
+				"item_code": "_Test Item",
+				"item_group": "_Test Item Group",
+				"company": "_Test Company",
+				"transaction_type": "selling",
+				"doctype": "Sales Order",
+				"transaction_date": frappe.utils.nowdate(),
+				"qty": 1,
+				"stock_qty": 1,
+				"conversion_factor": 1,
+			}
+		)
+
+		def get_rules():
+			return [(d.name, d.discount_percentage) for d in get_pricing_rules(args.copy()) or []]
+
+		rules = get_rules()
+		self.assertEqual(len(rules), 2)
+
+		with change_settings("Accounts Settings", {"cache_pricing_rules": 1}):
+			self.assertEqual(get_rules(), rules)
+
+			# saving a rule drops the index
+			item_group_rule.discount_percentage = 25
+			item_group_rule.save()
+			self.assertIn((item_group_rule.name, 25), get_rules())
+
+			item_group_rule.delete()
+			self.assertNotIn(item_group_rule.name, [d[0] for d in get_rules()])
+
+	def test_pricing_rule_index_for_items(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import (
+			build_pricing_rule_index,
+			get_pricing_rules,
+			use_pricing_rule_index,
+		)
+
+		item_rule = make_pricing_rule(
+			title="_Test Pricing Rule Item Code", selling=1, discount_percentage=10, priority=2
+		)
+		item_group_rule = make_pricing_rule(
+			title="_Test Pricing Rule Item Group",
+			apply_on="Item Group",
+			item_group="All Item Groups",
+			selling=1,
+			discount_percentage=20,
+			priority=1,
+		)
+		other_item_rule = make_pricing_rule(
+			title="_Test Pricing Rule Other Item", item_code="_Test Item 2", selling=1, discount_percentage=5
+		)
+
+		args = frappe._dict(
+			{
+				"item_code": "_Test Item",
+				"item_group": "_Test Item Group",
+				"company": "_Test Company",
+				"transaction_type": "selling",
+				"doctype": "Sales Order",
+				"transaction_date": frappe.utils.nowdate(),
+				"qty": 1,
+				"stock_qty": 1,
+				"conversion_factor": 1,
+			}
+		)
+		rules = [d.name for d in get_pricing_rules(args.copy()) or []]
+
+		# only the rules which can apply on the items are indexed
+		index = build_pricing_rule_index(["_Test Item"])
+		self.assertIn(item_rule.name, index["rules"])
+		self.assertIn(item_group_rule.name, index["rules"])
+		self.assertNotIn(other_item_rule.name, index["rules"])
+
+		frappe.local.pricing_rule_index = index
+		try:
+			self.assertTrue(use_pricing_rule_index(args))
+			self.assertEqual([d.name for d in get_pricing_rules(args.copy()) or []], rules)
+
+			# other items are looked up from the database
+			self.assertFalse(use_pricing_rule_index(frappe._dict(args, item_code="_Test Item 2")))
+		finally:
+			frappe.local.pricing_rule_index = None
+
 	def test_pricing_rules_with_and_without_apply_multiple(self):
 		item = make_item("PR Item 99")
 
@@ -1452,6 +1559,8 @@ def delete_existing_pricing_rules():
 	]:
 		frappe.db.sql(f"delete from `tab{doctype}`")
 
+	clear_pricing_rule_index()
+
 
 def make_item_price(item, price_list_name, item_price):
 	frappe.get_doc(
@@ -10,7 +10,7 @@ import math
 
 import frappe
 from frappe import _, bold
-from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
+from frappe.utils import cint, cstr, flt, fmt_money, get_link_to_form, getdate, today
 
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
@@ -23,12 +23,28 @@ class MultiplePricingRuleConflict(frappe.ValidationError):
 
 apply_on_table = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
+selling_doctypes = [
+	"Quotation",
+	"Quotation Item",
+	"Sales Order",
+	"Sales Order Item",
+	"Delivery Note",
+	"Delivery Note Item",
+	"Sales Invoice",
+	"Sales Invoice Item",
+	"POS Invoice",
+	"POS Invoice Item",
+]
+
 
 def get_pricing_rules(args, doc=None):
 	pricing_rules = []
 	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	if use_pricing_rule_index(args):
+		if not get_pricing_rule_index()["transaction_types"].get(args.transaction_type):
+			return
+	elif not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
 		return
 
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
@@ -84,10 +100,14 @@ def sorted_by_priority(pricing_rules, args, doc=None):
 def filter_pricing_rule_based_on_condition(pricing_rules, doc=None):
 	filtered_pricing_rules = []
 	if doc:
+		doc_dict = None
 		for pricing_rule in pricing_rules:
 			if pricing_rule.condition:
 				try:
-					if frappe.safe_eval(pricing_rule.condition, None, doc.as_dict()):
+					if doc_dict is None:
+						doc_dict = doc.as_dict()
+
+					if frappe.safe_eval(pricing_rule.condition, None, doc_dict):
 						filtered_pricing_rules.append(pricing_rule)
 				except Exception:
 					pass
@@ -105,6 +125,9 @@ def _get_pricing_rules(apply_on, args, values):
 	if not args.get(apply_on_field):
 		return []
 
+	if use_pricing_rule_index(args):
+		return _get_pricing_rules_from_index(apply_on, args)
+
 	child_doc = f"`tabPricing Rule {apply_on}`"
 
 	conditions = item_variant_condition = item_conditions = ""
@@ -181,6 +204,253 @@ def apply_multiple_pricing_rules(pricing_rules):
 	return True
 
 
+def is_pricing_rule_cache_enabled():
+	return cint(frappe.db.get_single_value("Accounts Settings", "cache_pricing_rules", cache=True))
+
+
+def use_pricing_rule_index(args=None):
+	"""Pricing rules are looked up from the index if cached, or built for a batch of items
+	by `erpnext.stock.get_item_details.prefetch_item_details` if `args` is one of those items"""
+	if is_pricing_rule_cache_enabled():
+		return True
+
+	index = getattr(frappe.local, "pricing_rule_index", None)
+	if not index:
+		return False
+
+	scope = index.get("scope")
+	if scope is None:
+		return True
+
+	return bool(
+		args
+		and args.get("item_code") in scope.item_code
+		and all(not args.get(field) or args.get(field) in scope[field] for field in ("item_group", "brand"))
+	)
+
+
+def get_pricing_rule_index():
+	"""Enabled Pricing Rules indexed by the item codes, item groups and brands they apply on.
+
+	The index is cached in redis and kept in memory for the rest of the request."""
+	index = getattr(frappe.local, "pricing_rule_index", None)
+	if index is None:
+		index = frappe.cache().get_value("pricing_rule_index", generator=build_pricing_rule_index)
+		frappe.local.pricing_rule_index = index
+
+	return index
+
+
+def build_pricing_rule_index(item_codes=None):
+	"""Index of all the enabled Pricing Rules, or with `item_codes` of only the ones which can apply
+	on those items, their variants, item groups and brands"""
+	scope = None
+	if item_codes is None:
+		rules = {
+			rule.name: rule
+			for rule in frappe.db.sql("select * from `tabPricing Rule` where disable = 0", as_dict=1)
+		}
+	else:
+		scope = get_pricing_rule_index_scope(item_codes)
+		rule_names = get_pricing_rules_in_scope(scope)
+		rules = (
+			{
+				rule.name: rule
+				for rule in frappe.db.sql(
+					"select * from `tabPricing Rule` where disable = 0 and name in %(rule_names)s",
+					{"rule_names": rule_names},
+					as_dict=1,
+				)
+			}
+			if rule_names
+			else {}
+		)
+
+	index = {
+		"scope": scope,
+		"rules": rules,
+		"transaction_types": {
+			transaction_type: any(cint(rule.get(transaction_type)) for rule in rules.values())
+			for transaction_type in ("selling", "buying")
+		},
+		# apply on field -> rule -> [(row name, value, uom)]
+		"rows": {},
+		# apply on field -> value -> [(rule, row name, uom)]
+		"rules_by_value": {},
+		# apply on field -> value of the other item / item group / brand -> [rule]
+		"rules_by_other": {},
+	}
+
+	for apply_on in apply_on_table:
+		field = frappe.scrub(apply_on)
+		rows, rules_by_value, rules_by_other = {}, {}, {}
+
+		rows_query = f"select name, parent, {field}, uom from `tabPricing Rule {apply_on}`"
+		if scope is not None:
+			rows_query += " where parent in %(rule_names)s"
+
+		for row in (
+			frappe.db.sql(rows_query, {"rule_names": list(rules)}, as_dict=1)
+			if rules or scope is None
+			else []
+		):
+			if row.parent not in rules:
+				continue
+
+			rows.setdefault(row.parent, []).append((row.name, row[field], row.uom))
+			rules_by_value.setdefault(row[field], []).append((row.parent, row.name, row.uom))
+
+		for rule in rules.values():
+			if rule.apply_rule_on_other is not None and rule.get(f"other_{field}"):
+				rules_by_other.setdefault(rule.get(f"other_{field}"), []).append(rule.name)
+
+		index["rows"][field] = rows
+		index["rules_by_value"][field] = rules_by_value
+		index["rules_by_other"][field] = rules_by_other
+
+	return index
+
+
+def get_pricing_rule_index_scope(item_codes):
+	"""The item codes, item groups and brands the pricing rules of `item_codes` can be matched on"""
+	scope = frappe._dict(item_code=set(), item_group=set(), brand=set())
+	for item in frappe.get_all(
+		"Item",
+		filters={"name": ("in", list(item_codes))},
+		fields=["name", "variant_of", "item_group", "brand"],
+	):
+		scope.item_code.add(item.name)
+		if item.variant_of:
+			scope.item_code.add(item.variant_of)
+		if item.item_group:
+			scope.item_group.update(_get_tree_ancestors("Item Group", item.item_group))
+		if item.brand:
+			scope.brand.add(item.brand)
+
+	return scope
+
+
+def get_pricing_rules_in_scope(scope):
+	"""Names of the pricing rules applied on, or with other items in, the values of the scope"""
+	pricing_rule = frappe.qb.DocType("Pricing Rule")
+	rule_names = set()
+	for apply_on in apply_on_table:
+		field = frappe.scrub(apply_on)
+		values = list(scope[field])
+		if not values:
+			continue
+
+		child = frappe.qb.DocType(f"Pricing Rule {apply_on}")
+		rule_names.update(
+			frappe.qb.from_(child).select(child.parent).where(child[field].isin(values)).run(pluck=True)
+		)
+		rule_names.update(
+			frappe.qb.from_(pricing_rule)
+			.select(pricing_rule.name)
+			.where(pricing_rule[f"other_{field}"].isin(values))
+			.run(pluck=True)
+		)
+
+	return list(rule_names)
+
+
+def clear_pricing_rule_index():
+	frappe.cache().delete_value("pricing_rule_index")
+	frappe.local.pricing_rule_index = None
+
+
+def invalidate_pricing_rule_index():
+	"""Clear the index now and once the transaction ends, so that an index built by another
+	request before the changes were committed is not kept"""
+	clear_pricing_rule_index()
+	frappe.db.after_commit.add(clear_pricing_rule_index)
+	frappe.db.after_rollback.add(clear_pricing_rule_index)
+
+
+def _get_pricing_rules_from_index(apply_on, args):
+	"""Same rules as `_get_pricing_rules` returns, matched against the pricing rule index"""
+	apply_on_field = frappe.scrub(apply_on)
+	value = args.get(apply_on_field)
+	index = get_pricing_rule_index()
+	rules_by_value = index["rules_by_value"][apply_on_field]
+	uom = args.get("uom")
+
+	def uom_matches(row_uom):
+		return not uom or apply_on_field == "brand" or cstr(row_uom) in (uom, "")
+
+	matches = {}
+	if apply_on_field == "item_group":
+		values = _get_tree_ancestors("Item Group", value)
+	else:
+		values = [value]
+
+	for match_value in values:
+		for rule, row_name, row_uom in rules_by_value.get(match_value, []):
+			if uom_matches(row_uom):
+				matches[row_name] = (rule, match_value, row_uom)
+
+	if apply_on_field == "item_code":
+		if "variant_of" not in args:
+			args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+
+		for rule, row_name, row_uom in rules_by_value.get(args.variant_of, []) if args.variant_of else []:
+			matches[row_name] = (rule, args.variant_of, row_uom)
+
+	for rule in index["rules_by_other"][apply_on_field].get(value, []):
+		for row_name, row_value, row_uom in index["rows"][apply_on_field].get(rule, []):
+			matches[row_name] = (rule, row_value, row_uom)
+
+	if not args.price_list:
+		args.price_list = None
+
+	pricing_rules = []
+	for rule_name, row_value, row_uom in matches.values():
+		rule = index["rules"][rule_name]
+		if is_pricing_rule_applicable(rule, args):
+			pricing_rule = frappe._dict(rule)
+			pricing_rule[apply_on_field] = row_value
+			pricing_rule.uom = row_uom
+			pricing_rules.append(pricing_rule)
+
+	pricing_rules.sort(key=lambda rule: (cstr(rule.priority), rule.name), reverse=True)
+	return pricing_rules
+
+
+def is_pricing_rule_applicable(rule, args):
+	"""Checks the conditions of `get_other_conditions`, the warehouse and the price list on a cached rule"""
+	if not cint(rule.get(args.transaction_type)):
+		return False
+
+	if cstr(rule.for_price_list) not in (args.price_list, ""):
+		return False
+
+	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
+		if cstr(rule.get(field)) not in ((args.get(field), "") if args.get(field) else ("",)):
+			return False
+
+	for parenttype in ["Warehouse", "Customer Group", "Territory", "Supplier Group"]:
+		field = frappe.scrub(parenttype)
+		if args.get(field) and cstr(rule.get(field)) not in [
+			*_get_tree_ancestors(parenttype, args.get(field)),
+			"",
+		]:
+			return False
+
+	if args.get("transaction_date"):
+		transaction_date = getdate(args.get("transaction_date"))
+		if not (
+			getdate(rule.valid_from or "2000-01-01")
+			<= transaction_date
+			<= getdate(rule.valid_upto or "2500-12-31")
+		):
+			return False
+
+	if args.get("doctype") in selling_doctypes:
+		return bool(cint(rule.selling))
+
+	return bool(cint(rule.buying))
+
+
 def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 	field = frappe.scrub(parenttype)
 	condition = ""
@@ -191,10 +461,30 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 		if key in frappe.flags.tree_conditions:
 			return frappe.flags.tree_conditions[key]
 
+		parent_groups = _get_tree_ancestors(parenttype, args.get(field))
+
+		if parent_groups:
+			if allow_blank:
+				parent_groups.append("")
+			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
+				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
+			)
+
+			frappe.flags.tree_conditions[key] = condition
+	return condition
+
+
+def _get_tree_ancestors(parenttype, name):
+	"""`name` and its ancestors in the tree of `parenttype`, with the root of group trees"""
+	if not frappe.flags.tree_ancestors:
+		frappe.flags.tree_ancestors = {}
+
+	key = (parenttype, name)
+	if key not in frappe.flags.tree_ancestors:
 		try:
-			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
+			lft, rgt = frappe.db.get_value(parenttype, name, ["lft", "rgt"])
 		except TypeError:
-			frappe.throw(_("Invalid {0}").format(args.get(field)))
+			frappe.throw(_("Invalid {0}").format(name))
 
 		parent_groups = frappe.db.sql_list(
 			"""select name from `tab{}`
@@ -215,15 +505,9 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 			if root_name and root_name[0][0]:
 				parent_groups.append(root_name[0][0])
 
-		if parent_groups:
-			if allow_blank:
-				parent_groups.append("")
-			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
-				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
-			)
+		frappe.flags.tree_ancestors[key] = parent_groups
 
-			frappe.flags.tree_conditions[key] = condition
-	return condition
+	return list(frappe.flags.tree_ancestors[key])
 
 
 def get_other_conditions(conditions, values, args):
@@ -244,18 +528,7 @@ def get_other_conditions(conditions, values, args):
 			and ifnull(`tabPricing Rule`.valid_upto, '2500-12-31')"""
 		values["transaction_date"] = args.get("transaction_date")
 
-	if args.get("doctype") in [
-		"Quotation",
-		"Quotation Item",
-		"Sales Order",
-		"Sales Order Item",
-		"Delivery Note",
-		"Delivery Note Item",
-		"Sales Invoice",
-		"Sales Invoice Item",
-		"POS Invoice",
-		"POS Invoice Item",
-	]:
+	if args.get("doctype") in selling_doctypes:
 		conditions += """ and ifnull(`tabPricing Rule`.selling, 0) = 1"""
 	else:
 		conditions += """ and ifnull(`tabPricing Rule`.buying, 0) = 1"""
@@ -9,6 +9,9 @@ from frappe.model.document import Document
 from frappe.utils import get_link_to_form
 from frappe.utils.scheduler import is_scheduler_inactive
 
+# allocations reconciled in one job, allocations of a payment are never split across jobs
+RECONCILE_BATCH_SIZE = 100
+
 
 class ProcessPaymentReconciliation(Document):
 	# begin: auto-generated types
@@ -303,23 +306,25 @@ def reconcile_based_on_filters(doc: None | str = None) -> None:
 
 def get_next_allocation(log: str) -> list:
 	if log:
-		allocations = []
-		next = frappe.db.get_all(
+		allocations = frappe.db.get_all(
 			"Process Payment Reconciliation Log Allocations",
 			filters={"parent": log, "reconciled": 0},
-			fields=["reference_type", "reference_name"],
+			fields=["*"],
 			order_by="idx",
-			limit=1,
+			limit=RECONCILE_BATCH_SIZE,
 		)
 
-		if next:
-			allocations = frappe.db.get_all(
+		if allocations:
+			# rest of the allocations of the last payment in the batch
+			last = allocations[-1]
+			allocations += frappe.db.get_all(
 				"Process Payment Reconciliation Log Allocations",
 				filters={
 					"parent": log,
 					"reconciled": 0,
-					"reference_type": next[0].reference_type,
-					"reference_name": next[0].reference_name,
+					"reference_type": last.reference_type,
+					"reference_name": last.reference_name,
+					"idx": (">", last.idx),
 				},
 				fields=["*"],
 				order_by="idx",
@@ -415,9 +420,15 @@ def reconcile(doc: None | str = None) -> None:
 
 					# If Payment Entry, update details only for newly linked references
 					# This is for performance
-					if allocations[0].reference_type == "Payment Entry":
-						references = [(x.invoice_type, x.invoice_number) for x in allocations]
-						pe = frappe.get_doc(allocations[0].reference_type, allocations[0].reference_name)
+					payment_references = {}
+					for x in allocations:
+						if x.reference_type == "Payment Entry":
+							payment_references.setdefault(x.reference_name, []).append(
+								(x.invoice_type, x.invoice_number)
+							)
+
+					for payment_entry, references in payment_references.items():
+						pe = frappe.get_doc("Payment Entry", payment_entry)
 						pe.flags.ignore_validate_update_after_submit = True
 						pe.set_missing_ref_details(update_ref_details_only_for=references)
 						pe.save()
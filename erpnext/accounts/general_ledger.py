@@ -11,6 +11,11 @@ from frappe.utils import cint, flt, formatdate, getdate, now
 from frappe.utils.dashboard import cache_source
 
 import erpnext
+from erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup import (
+	is_account_balance_rollup_enabled,
+	remove_from_account_balance_rollup,
+	update_account_balance_rollup,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
@@ -19,9 +24,26 @@ from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_f
 )
 from erpnext.accounts.doctype.accounting_period.accounting_period import ClosedAccountingPeriod
 from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
+from erpnext.accounts.doctype.gl_entry.gl_entry import (
+	update_outstanding_of_against_vouchers,
+	validate_balance_type,
+	validate_gl_entries,
+)
 from erpnext.accounts.utils import create_payment_ledger_entry
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
+# vouchers with at least these many GL Entries are inserted in bulk
+GL_BULK_INSERT_THRESHOLD = 20
+
+MERGED_AMOUNT_FIELDS = (
+	"debit",
+	"debit_in_account_currency",
+	"debit_in_transaction_currency",
+	"credit",
+	"credit_in_account_currency",
+	"credit_in_transaction_currency",
+)
+
 
 def make_gl_entries(
 	gl_map,
@@ -193,7 +215,8 @@ def distribute_gl_based_on_cost_center_allocation(gl_map, precision=None):
 
 		if cost_center and cost_center_allocation.get(cost_center):
 			for sub_cost_center, percentage in cost_center_allocation.get(cost_center, {}).items():
-				gle = copy.deepcopy(d)
+				# entries hold plain values, a shallow copy is enough
+				gle = d.copy()
 				gle.cost_center = sub_cost_center
 				for field in ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency"):
 					gle[field] = flt(flt(d.get(field)) * percentage / 100, precision)
@@ -227,32 +250,19 @@ def get_cost_center_allocation_data(company, posting_date):
 
 
 def merge_similar_entries(gl_map, precision=None):
-	merged_gl_map = []
 	accounting_dimensions = get_accounting_dimensions()
 	merge_properties = get_merge_properties(accounting_dimensions)
 
+	# entries with the same merge key are added up to the first of them
+	merged_entries = {}
 	for entry in gl_map:
 		entry.merge_key = get_merge_key(entry, merge_properties)
-		# if there is already an entry in this account then just add it
-		# to that entry
-		same_head = check_if_in_list(entry, merged_gl_map)
+		same_head = merged_entries.get(entry.merge_key)
 		if same_head:
-			same_head.debit = flt(same_head.debit) + flt(entry.debit)
-			same_head.debit_in_account_currency = flt(same_head.debit_in_account_currency) + flt(
-				entry.debit_in_account_currency
-			)
-			same_head.debit_in_transaction_currency = flt(same_head.debit_in_transaction_currency) + flt(
-				entry.debit_in_transaction_currency
-			)
-			same_head.credit = flt(same_head.credit) + flt(entry.credit)
-			same_head.credit_in_account_currency = flt(same_head.credit_in_account_currency) + flt(
-				entry.credit_in_account_currency
-			)
-			same_head.credit_in_transaction_currency = flt(same_head.credit_in_transaction_currency) + flt(
-				entry.credit_in_transaction_currency
-			)
+			for fieldname in MERGED_AMOUNT_FIELDS:
+				same_head[fieldname] = flt(same_head.get(fieldname)) + flt(entry.get(fieldname))
 		else:
-			merged_gl_map.append(entry)
+			merged_entries[entry.merge_key] = entry
 
 	company = gl_map[0].company if gl_map else erpnext.get_default_company()
 	company_currency = erpnext.get_company_currency(company)
@@ -261,17 +271,17 @@ def merge_similar_entries(gl_map, precision=None):
 		precision = get_field_precision(frappe.get_meta("GL Entry").get_field("debit"), company_currency)
 
 	# filter zero debit and credit entries
-	merged_gl_map = filter(
-		lambda x: flt(x.debit, precision) != 0
+	merged_gl_map = [
+		x
+		for x in merged_entries.values()
+		if flt(x.debit, precision) != 0
 		or flt(x.credit, precision) != 0
 		or (
 			x.voucher_type == "Journal Entry"
 			and frappe.get_cached_value("Journal Entry", x.voucher_no, "voucher_type")
 			== "Exchange Gain Or Loss"
-		),
-		merged_gl_map,
-	)
-	merged_gl_map = list(merged_gl_map)
+		)
+	]
 
 	return merged_gl_map
 
@@ -295,17 +305,7 @@ def get_merge_properties(dimensions=None):
 
 
 def get_merge_key(entry, merge_properties):
-	merge_key = []
-	for fieldname in merge_properties:
-		merge_key.append(entry.get(fieldname, ""))
-
-	return tuple(merge_key)
-
-
-def check_if_in_list(gle, gl_map):
-	for e in gl_map:
-		if e.merge_key == gle.merge_key:
-			return e
+	return tuple(entry.get(fieldname, "") for fieldname in merge_properties)
 
 
 def toggle_debit_credit_if_negative(gl_map):
@@ -384,7 +384,14 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 
 	for entry in gl_map:
 		validate_allowed_dimensions(entry, dimension_filter_map)
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+
+	if can_bulk_insert_entries(gl_map):
+		gl_entries = bulk_insert_entries(gl_map, adv_adj, update_outstanding, from_repost)
+	else:
+		gl_entries = [make_entry(entry, adv_adj, update_outstanding, from_repost) for entry in gl_map]
+
+	if is_account_balance_rollup_enabled():
+		update_account_balance_rollup(gl_entries)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
@@ -400,6 +407,78 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	if not from_repost and gle.voucher_type != "Period Closing Voucher":
 		validate_expense_against_budget(args)
 
+	return gle
+
+
+def can_bulk_insert_entries(gl_map):
+	# entries are submitted one by one if an app hooks into their document events
+	return len(gl_map) >= GL_BULK_INSERT_THRESHOLD and not frappe.get_doc_hooks().get("GL Entry")
+
+
+def bulk_insert_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
+	"""Insert the GL Entries of a voucher with multi-row inserts instead of submitting them one by one.
+
+	The validations of `GLEntry` run over all the entries at once and the outstanding amounts
+	of the against vouchers are updated once per voucher after the insert."""
+	gl_entries = []
+	for args in gl_map:
+		gle = frappe.new_doc("GL Entry")
+		gle.update(args)
+		gle.flags.from_repost = from_repost
+		gle.flags.adv_adj = adv_adj
+		gle.flags.update_outstanding = update_outstanding or "Yes"
+		gl_entries.append(gle)
+
+	run_doc_hooks_for_all_doctypes(
+		gl_entries, ("before_insert", "before_validate", "validate", "before_submit")
+	)
+	validate_gl_entries(gl_entries, adv_adj, from_repost)
+
+	timestamp = now()
+	for gle in gl_entries:
+		gle.autoname()
+		gle.update(
+			{
+				"docstatus": 1,
+				"owner": frappe.session.user,
+				"modified_by": frappe.session.user,
+				"creation": timestamp,
+				"modified": timestamp,
+			}
+		)
+
+	rows = [gle.get_valid_dict(convert_dates_to_str=True, ignore_nulls=False) for gle in gl_entries]
+	fields = list(rows[0])
+	frappe.db.bulk_insert("GL Entry", fields=fields, values=[[row.get(f) for f in fields] for row in rows])
+
+	if not from_repost and gl_entries[0].voucher_type != "Period Closing Voucher":
+		for account in {gle.account for gle in gl_entries}:
+			validate_balance_type(account, adv_adj)
+
+		update_outstanding_of_against_vouchers(gl_entries)
+
+		# budget is checked against the expense booked till now, once per budget dimensions
+		budget_keys = ["account", "cost_center", "project", *get_accounting_dimensions()]
+		for args in {get_merge_key(entry, budget_keys): entry for entry in gl_map}.values():
+			validate_expense_against_budget(args)
+
+	run_doc_hooks_for_all_doctypes(gl_entries, ("after_insert", "on_update", "on_submit", "on_change"))
+
+	return gl_entries
+
+
+def run_doc_hooks_for_all_doctypes(docs, events):
+	"""Run the document events hooked for all the doctypes for each of the bulk inserted entries,
+	in the order `Document.insert` runs them"""
+	hooks = frappe.get_doc_hooks().get("*", {})
+	handlers = [(event, frappe.get_attr(handler)) for event in events for handler in hooks.get(event, [])]
+	if not handlers:
+		return
+
+	for doc in docs:
+		for event, handler in handlers:
+			handler(doc, event)
+
 
 def validate_cwip_accounts(gl_map):
 	"""Validate that CWIP account are not used in Journal Entry"""
@@ -624,31 +703,35 @@ def make_reverse_gl_entries(
 			# Only cancel GL entries for unlinked reference using `voucher_detail_no`
 			gle = frappe.qb.DocType("GL Entry")
 			for x in gl_entries:
+				conditions = (
+					(gle.company == x.company)
+					& (gle.account == x.account)
+					& (gle.party_type == x.party_type)
+					& (gle.party == x.party)
+					& (gle.voucher_type == x.voucher_type)
+					& (gle.voucher_no == x.voucher_no)
+					& (gle.against_voucher_type == x.against_voucher_type)
+					& (gle.against_voucher == x.against_voucher)
+					& (gle.voucher_detail_no == x.voucher_detail_no)
+				)
 				query = (
 					frappe.qb.update(gle)
 					.set(gle.modified, now())
 					.set(gle.modified_by, frappe.session.user)
-					.where(
-						(gle.company == x.company)
-						& (gle.account == x.account)
-						& (gle.party_type == x.party_type)
-						& (gle.party == x.party)
-						& (gle.voucher_type == x.voucher_type)
-						& (gle.voucher_no == x.voucher_no)
-						& (gle.against_voucher_type == x.against_voucher_type)
-						& (gle.against_voucher == x.against_voucher)
-						& (gle.voucher_detail_no == x.voucher_detail_no)
-					)
+					.where(conditions)
 				)
 
 				if not immutable_ledger_enabled:
+					remove_from_account_balance_rollup(x.voucher_type, x.voucher_no, conditions)
 					query = query.set(gle.is_cancelled, True)
 
 				query.run()
 		else:
 			if not immutable_ledger_enabled:
+				remove_from_account_balance_rollup(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 				set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
+		reverse_entries = []
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
 			new_gle["name"] = None
@@ -671,7 +754,11 @@ def make_reverse_gl_entries(
 				new_gle["posting_date"] = frappe.form_dict.get("posting_date") or getdate()
 
 			if new_gle["debit"] or new_gle["credit"]:
-				make_entry(new_gle, adv_adj, "Yes")
+				reverse_entries.append(make_entry(new_gle, adv_adj, "Yes"))
+
+		# reversals posted by the immutable ledger are active entries
+		if immutable_ledger_enabled and is_account_balance_rollup_enabled():
+			update_account_balance_rollup(reverse_entries)
 
 
 def check_freezing_date(posting_date, adv_adj=False):
@@ -7,13 +7,20 @@ from collections import OrderedDict
 import frappe
 from frappe import _, qb, query_builder, scrub
 from frappe.query_builder import Criterion
-from frappe.query_builder.functions import Date, Substring, Sum
-from frappe.utils import cint, cstr, flt, getdate, nowdate
+from frappe.query_builder.functions import Date, Min, Substring, Sum
+from frappe.utils import add_days, cint, cstr, flt, getdate, nowdate
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.payment_ledger_snapshot.payment_ledger_snapshot import (
+	SNAPSHOT_FIELDS,
+	enqueue_payment_ledger_snapshot,
+	get_ledger_balances_query,
+	get_valid_snapshot_date,
+	is_payment_ledger_snapshot_enabled,
+)
 from erpnext.accounts.utils import get_currency_precision, get_party_types_from_account_type
 
 #  This report gives a summary of all Outstanding Invoices considering the following
@@ -29,7 +36,9 @@ from erpnext.accounts.utils import get_currency_precision, get_party_types_from_
 #  7. For overpayment against an invoice with payment terms, there will be an additional row
 #  8. Invoice details like Sales Persons, Delivery Notes are also fetched comma separated
 #  9. Report amounts are in party currency if in_party_currency is selected, otherwise company currency
-# 10. This report is based on Payment Ledger Entries
+# 10. This report is based on Payment Ledger Entries, summed up per voucher in the database,
+#     unless the remarks are shown
+# 11. If enabled, entries up to the date of the latest Payment Ledger Snapshot are read from the snapshot
 
 
 def execute(filters=None):
@@ -85,8 +94,8 @@ class ReceivablePayableReport:
 				self.skip_total_row = 1
 
 	def get_data(self):
-		self.get_ple_entries()
 		self.get_sales_invoices_or_customers_based_on_sales_person()
+		self.get_ple_entries()
 		self.voucher_balance = OrderedDict()
 		self.init_voucher_balance()  # invoiced, paid, credit_note, outstanding
 
@@ -751,10 +760,18 @@ class ReceivablePayableReport:
 		row["range" + str(index + 1)] = row.outstanding
 
 	def get_ple_entries(self):
-		# get all the GL entries filtered by the given filters
+		# get the Payment Ledger Entries filtered by the given filters, summed up per voucher and party
+		# unless the remarks of the individual entries are shown
+		# the sums are booked to the vouchers the same way as the individual entries
 
 		self.prepare_conditions()
 
+		snapshot_entries = []
+		snapshot_date = self.get_snapshot_date()
+		if snapshot_date:
+			snapshot_entries = self.get_snapshot_entries(snapshot_date)
+			self.qb_selection_filter.append(self.ple.posting_date.gt(snapshot_date))
+
 		if self.filters.show_future_payments:
 			self.qb_selection_filter.append(
 				self.ple.posting_date.lte(self.filters.report_date)
@@ -766,7 +783,28 @@ class ReceivablePayableReport:
 		else:
 			self.qb_selection_filter.append(self.ple.posting_date.lte(self.filters.report_date))
 
-		ple = qb.DocType("Payment Ledger Entry")
+		ple = self.ple
+		if self.filters.get("show_remarks"):
+			# the remarks are shown per entry, so the entries are not summed up
+			query = self.get_ple_entries_with_remarks_query()
+		else:
+			query = get_ledger_balances_query(ple, self.qb_selection_filter).where(
+				Criterion.any(self.or_filters)
+			)
+
+			if self.filters.get("group_by_party"):
+				query = query.orderby(ple.party, Min(ple.posting_date))
+			else:
+				query = query.orderby(Min(ple.posting_date), ple.party)
+
+		self.ple_entries = snapshot_entries + query.run(as_dict=True)
+
+		if snapshot_entries and self.filters.get("group_by_party"):
+			# later entries of a party are read after the snapshot of all the parties
+			self.ple_entries.sort(key=lambda x: (cstr(x.party), x.posting_date))
+
+	def get_ple_entries_with_remarks_query(self):
+		ple = self.ple
 		query = (
 			qb.from_(ple)
 			.select(
@@ -790,20 +828,61 @@ class ReceivablePayableReport:
 			.where(Criterion.any(self.or_filters))
 		)
 
-		if self.filters.get("show_remarks"):
-			if remarks_length := frappe.db.get_single_value(
-				"Accounts Settings", "receivable_payable_remarks_length"
-			):
-				query = query.select(Substring(ple.remarks, 1, remarks_length).as_("remarks"))
-			else:
-				query = query.select(ple.remarks)
+		if remarks_length := frappe.db.get_single_value(
+			"Accounts Settings", "receivable_payable_remarks_length"
+		):
+			query = query.select(Substring(ple.remarks, 1, remarks_length).as_("remarks"))
+		else:
+			query = query.select(ple.remarks)
 
 		if self.filters.get("group_by_party"):
-			query = query.orderby(self.ple.party, self.ple.posting_date)
+			query = query.orderby(ple.party, ple.posting_date)
 		else:
-			query = query.orderby(self.ple.posting_date, self.ple.party)
+			query = query.orderby(ple.posting_date, ple.party)
+
+		return query
+
+	def get_snapshot_date(self):
+		# the snapshot is summed up per voucher, account and party,
+		# filters on the other fields of the ledger need the individual entries
+		if (
+			self.filters.show_future_payments
+			or self.filters.get("show_remarks")
+			or self.filters.finance_book
+			or self.filters.cost_center
+			or any(self.filters.get(dimension) for dimension in get_accounting_dimensions())
+		):
+			return
+
+		snapshot_date = get_valid_snapshot_date(
+			self.filters.company, self.account_type, self.filters.report_date
+		)
+		if not snapshot_date and is_payment_ledger_snapshot_enabled():
+			previous_day = add_days(nowdate(), -1)
+			if self.filters.report_date >= getdate(previous_day):
+				# later runs only read the entries posted after the previous day
+				enqueue_payment_ledger_snapshot(self.filters.company, self.account_type, previous_day)
 
-		self.ple_entries = query.run(as_dict=True)
+		return snapshot_date
+
+	def get_snapshot_entries(self, snapshot_date):
+		snapshot = qb.DocType("Payment Ledger Snapshot")
+		query = (
+			qb.from_(snapshot)
+			.select(*[snapshot[fieldname] for fieldname in SNAPSHOT_FIELDS])
+			.where(
+				(snapshot.company == self.filters.company)
+				& (snapshot.account_type == self.account_type)
+				& (snapshot.snapshot_date == snapshot_date)
+			)
+			.where(
+				Criterion.all(
+					condition.replace_table(self.ple, snapshot) for condition in self.qb_selection_filter
+				)
+			)
+			.orderby(snapshot.posting_date, snapshot.party)
+		)
+		return query.run(as_dict=True)
 
 	def get_sales_invoices_or_customers_based_on_sales_person(self):
 		if self.filters.get("sales_person"):
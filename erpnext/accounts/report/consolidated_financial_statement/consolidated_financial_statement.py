@@ -7,6 +7,7 @@ from collections import defaultdict
 import frappe
 from frappe import _
 from frappe.query_builder import Criterion
+from frappe.query_builder.functions import Min, Sum
 from frappe.utils import flt, getdate
 
 import erpnext
@@ -26,6 +27,7 @@ from erpnext.accounts.report.cash_flow.cash_flow import get_report_summary as ge
 from erpnext.accounts.report.financial_statements import (
 	filter_out_zero_value_rows,
 	get_fiscal_year_data,
+	get_period_bucket,
 	sort_accounts,
 )
 from erpnext.accounts.report.profit_and_loss_statement.profit_and_loss_statement import (
@@ -353,6 +355,7 @@ def get_data(companies, root_type, balance_must_be, fiscal_year, filters=None, i
 			accounts,
 			ignore_closing_entries=False,
 			root_type=root_type,
+			group_by_period=[getdate(get_opening_date(filters, fiscal_year))],
 		)
 
 	calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year)
@@ -376,11 +379,16 @@ def get_company_currency(filters=None):
 	)
 
 
-def calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year):
-	start_date = (
+def get_opening_date(filters, fiscal_year):
+	"""Entries before this date are added to the opening balance"""
+	return (
 		fiscal_year.year_start_date if filters.filter_based_on == "Fiscal Year" else filters.period_start_date
 	)
 
+
+def calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year):
+	start_date = get_opening_date(filters, fiscal_year)
+
 	for entries in gl_entries_by_account.values():
 		for entry in entries:
 			if entry.account_number:
@@ -592,8 +600,12 @@ def set_gl_entries_by_account(
 	accounts,
 	ignore_closing_entries=False,
 	root_type=None,
+	group_by_period=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries], ... }
+
+	If `group_by_period` dates are passed, entries of an account posted between the same two
+	consecutive dates are summed up into one entry by the database"""
 
 	company_lft, company_rgt = frappe.get_cached_value("Company", filters.get("company"), ["lft", "rgt"])
 
@@ -614,24 +626,25 @@ def set_gl_entries_by_account(
 	for d in companies:
 		gle = frappe.qb.DocType("GL Entry")
 		account = frappe.qb.DocType("Account")
+		group_fields = [
+			gle.account,
+			gle.is_opening,
+			gle.company,
+			gle.fiscal_year,
+			gle.account_currency,
+			account.account_name,
+			account.account_number,
+		]
+		amount_fields = [
+			gle.debit,
+			gle.credit,
+			gle.debit_in_account_currency,
+			gle.credit_in_account_currency,
+		]
 		query = (
 			frappe.qb.from_(gle)
 			.inner_join(account)
 			.on(account.name == gle.account)
-			.select(
-				gle.posting_date,
-				gle.account,
-				gle.debit,
-				gle.credit,
-				gle.is_opening,
-				gle.company,
-				gle.fiscal_year,
-				gle.debit_in_account_currency,
-				gle.credit_in_account_currency,
-				gle.account_currency,
-				account.account_name,
-				account.account_number,
-			)
 			.where(
 				(gle.company == d.name)
 				& (gle.is_cancelled == 0)
@@ -639,9 +652,23 @@ def set_gl_entries_by_account(
 				& (account.lft >= root_lft)
 				& (account.rgt <= root_rgt)
 			)
-			.orderby(gle.account, gle.posting_date)
 		)
 
+		if group_by_period:
+			query = (
+				query.select(
+					Min(gle.posting_date).as_("posting_date"),
+					*group_fields,
+					*[Sum(field).as_(field.name) for field in amount_fields],
+				)
+				.groupby(*group_fields, get_period_bucket(gle.posting_date, group_by_period))
+				.orderby(gle.account)
+			)
+		else:
+			query = query.select(gle.posting_date, *group_fields, *amount_fields).orderby(
+				gle.account, gle.posting_date
+			)
+
 		if root_type:
 			query = query.where(account.root_type == root_type)
 		additional_conditions = get_additional_conditions(from_date, ignore_closing_entries, filters, d)
@@ -8,6 +8,8 @@ import re
 
 import frappe
 from frappe import _
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Min, Sum
 from frappe.utils import add_days, add_months, cint, cstr, flt, formatdate, get_first_day, getdate
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
@@ -187,6 +189,7 @@ def get_data(
 			gl_entries_by_account,
 			ignore_closing_entries=ignore_closing_entries,
 			root_type=root_type,
+			group_by_period=get_period_boundaries(period_list),
 		)
 
 	calculate_values(
@@ -249,6 +252,26 @@ def calculate_values(
 				d["opening_balance"] = d.get("opening_balance", 0.0) + flt(entry.debit) - flt(entry.credit)
 
 
+def get_period_boundaries(period_list):
+	"""Dates at which `calculate_values` starts counting an entry differently,
+	entries between two consecutive boundaries can be summed up before calculating values"""
+	boundaries = {getdate(period_list[0].year_start_date)}
+	for period in period_list:
+		boundaries.add(getdate(period.from_date))
+		boundaries.add(add_days(getdate(period.to_date), 1))
+
+	return sorted(boundaries)
+
+
+def get_period_bucket(date_field, boundaries):
+	"""Index of the interval between `boundaries` the date falls in"""
+	bucket = Case()
+	for idx, boundary in enumerate(boundaries):
+		bucket = bucket.when(date_field < boundary, idx)
+
+	return bucket.else_(len(boundaries))
+
+
 def accumulate_values_into_parents(accounts, accounts_by_name, period_list):
 	"""accumulate children's values in parent accounts"""
 	for d in reversed(accounts):
@@ -426,8 +449,12 @@ def set_gl_entries_by_account(
 	ignore_closing_entries=False,
 	ignore_opening_entries=False,
 	root_type=None,
+	group_by_period=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries], ... }
+
+	If `group_by_period` dates are passed, entries of an account posted between the same two
+	consecutive dates are summed up into one entry by the database"""
 	gl_entries = []
 
 	account_filters = {
@@ -476,6 +503,7 @@ def set_gl_entries_by_account(
 					filters,
 					ignore_closing_entries,
 					last_period_closing_voucher[0].name,
+					group_by_period=group_by_period,
 				)
 				from_date = add_days(last_period_closing_voucher[0].posting_date, 1)
 				ignore_opening_entries = True
@@ -488,6 +516,7 @@ def set_gl_entries_by_account(
 			filters,
 			ignore_closing_entries,
 			ignore_opening_entries=ignore_opening_entries,
+			group_by_period=group_by_period,
 		)
 
 		if filters and filters.get("presentation_currency"):
@@ -508,32 +537,48 @@ def get_accounting_entries(
 	ignore_closing_entries,
 	period_closing_voucher=None,
 	ignore_opening_entries=False,
+	group_by_period=None,
 ):
 	gl_entry = frappe.qb.DocType(doctype)
+	amount_fields = [
+		gl_entry.debit,
+		gl_entry.credit,
+		gl_entry.debit_in_account_currency,
+		gl_entry.credit_in_account_currency,
+	]
+	if group_by_period:
+		amount_fields = [Sum(field).as_(field.name) for field in amount_fields]
+
 	query = (
 		frappe.qb.from_(gl_entry)
-		.select(
-			gl_entry.account,
-			gl_entry.debit,
-			gl_entry.credit,
-			gl_entry.debit_in_account_currency,
-			gl_entry.credit_in_account_currency,
-			gl_entry.account_currency,
-		)
+		.select(gl_entry.account, *amount_fields, gl_entry.account_currency)
 		.where(gl_entry.company == filters.company)
 	)
 
 	if doctype == "GL Entry":
-		query = query.select(gl_entry.posting_date, gl_entry.is_opening, gl_entry.fiscal_year)
+		posting_date = gl_entry.posting_date
+		query = query.select(gl_entry.is_opening, gl_entry.fiscal_year)
 		query = query.where(gl_entry.is_cancelled == 0)
 		query = query.where(gl_entry.posting_date <= to_date)
 
 		if ignore_opening_entries:
 			query = query.where(gl_entry.is_opening == "No")
+
+		if group_by_period:
+			query = query.groupby(gl_entry.is_opening, gl_entry.fiscal_year)
 	else:
-		query = query.select(gl_entry.closing_date.as_("posting_date"))
+		posting_date = gl_entry.closing_date
 		query = query.where(gl_entry.period_closing_voucher == period_closing_voucher)
 
+	if group_by_period:
+		# any date of the interval compares the same as the entries summed up in it
+		query = query.select(Min(posting_date).as_("posting_date"))
+		query = query.groupby(
+			gl_entry.account, gl_entry.account_currency, get_period_bucket(posting_date, group_by_period)
+		)
+	else:
+		query = query.select(posting_date.as_("posting_date"))
+
 	query = apply_additional_conditions(doctype, query, from_date, ignore_closing_entries, filters)
 	query = query.where(gl_entry.account.isin(accounts))
 
@@ -215,6 +215,20 @@ frappe.query_reports["General Ledger"] = {
 			fieldtype: "Check",
 		},
 	],
+
+	onload: function (report) {
+		// the whole ledger, fetched and written page by page on the server
+		let method = "/api/method/erpnext.accounts.report.general_ledger.general_ledger.export_gl_entries";
+		["CSV", "Excel"].forEach((file_format) => {
+			report.page.add_inner_button(
+				__(file_format),
+				function () {
+					open_url_post(method, { filters: report.get_values(), file_format: file_format });
+				},
+				__("Export Full Ledger")
+			);
+		});
+	},
 };
 
 erpnext.utils.add_dimensions("General Ledger", 15);
@@ -3,12 +3,18 @@
 
 
 import copy
+import csv
+import io
+import tempfile
 from collections import OrderedDict
 
 import frappe
+import openpyxl
 from frappe import _, _dict
 from frappe.query_builder import Criterion
-from frappe.utils import cstr, getdate
+from frappe.utils import cint, cstr, flt, getdate
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
 
 from erpnext import get_company_currency, get_default_company
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
@@ -16,9 +22,11 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_dimension_with_children,
 )
 from erpnext.accounts.report.financial_statements import get_cost_centers_with_children
-from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
+from erpnext.accounts.report.utils import convert, convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_account_currency
 
+GL_PAGE_LENGTH = 500
+
 
 def execute(filters=None):
 	if not filters:
@@ -149,14 +157,6 @@ def get_result(filters, account_details):
 
 def get_gl_entries(filters, accounting_dimensions):
 	currency_map = get_currency(filters)
-	select_fields = """, debit, credit, debit_in_account_currency,
-		credit_in_account_currency """
-
-	if filters.get("show_remarks"):
-		if remarks_length := frappe.db.get_single_value("Accounts Settings", "general_ledger_remarks_length"):
-			select_fields += f",substr(remarks, 1, {remarks_length}) as 'remarks'"
-		else:
-			select_fields += """,remarks"""
 
 	order_by_statement = "order by posting_date, account, creation"
 
@@ -168,11 +168,43 @@ def get_gl_entries(filters, accounting_dimensions):
 	if filters.get("group_by") == "Group by Account":
 		order_by_statement = "order by account, posting_date, creation"
 
+	set_company_finance_book(filters)
+
+	gl_entries = frappe.db.sql(
+		f"""
+		select
+			{get_select_fields(filters, accounting_dimensions)}
+		from `tabGL Entry`
+		where company=%(company)s {get_conditions(filters)}
+		{order_by_statement}
+	""",
+		filters,
+		as_dict=1,
+	)
+
+	if filters.get("presentation_currency"):
+		return convert_to_presentation_currency(gl_entries, currency_map)
+	else:
+		return gl_entries
+
+
+def set_company_finance_book(filters):
 	if filters.get("include_default_book_entries"):
 		filters["company_fb"] = frappe.get_cached_value(
 			"Company", filters.get("company"), "default_finance_book"
 		)
 
+
+def get_select_fields(filters, accounting_dimensions):
+	select_fields = """, debit, credit, debit_in_account_currency,
+		credit_in_account_currency """
+
+	if filters.get("show_remarks"):
+		if remarks_length := frappe.db.get_single_value("Accounts Settings", "general_ledger_remarks_length"):
+			select_fields += f",substr(remarks, 1, {remarks_length}) as 'remarks'"
+		else:
+			select_fields += """,remarks"""
+
 	dimension_fields = ""
 	if accounting_dimensions:
 		dimension_fields = ", ".join(accounting_dimensions) + ","
@@ -183,38 +215,28 @@ def get_gl_entries(filters, accounting_dimensions):
 			"debit_in_transaction_currency, credit_in_transaction_currency, transaction_currency,"
 		)
 
-	gl_entries = frappe.db.sql(
-		f"""
-		select
-			name as gl_entry, posting_date, account, party_type, party,
+	return f"""name as gl_entry, posting_date, account, party_type, party,
 			voucher_type, voucher_subtype, voucher_no, {dimension_fields}
 			cost_center, project, {transaction_currency_fields}
 			against_voucher_type, against_voucher, account_currency,
-			against, is_opening, creation {select_fields}
-		from `tabGL Entry`
-		where company=%(company)s {get_conditions(filters)}
-		{order_by_statement}
-	""",
-		filters,
-		as_dict=1,
-	)
-
-	if filters.get("presentation_currency"):
-		return convert_to_presentation_currency(gl_entries, currency_map)
-	else:
-		return gl_entries
+			against, is_opening, creation {select_fields}"""
 
 
 def get_conditions(filters):
 	conditions = []
 
+	# the paginated General Ledger resolves the filters once for all its pages
+	resolved = filters.get("conditions_resolved")
+
 	if filters.get("account"):
-		filters.account = get_accounts_with_children(filters.account)
+		if not resolved:
+			filters.account = get_accounts_with_children(filters.account)
 		if filters.account:
 			conditions.append("account in %(account)s")
 
 	if filters.get("cost_center"):
-		filters.cost_center = get_cost_centers_with_children(filters.cost_center)
+		if not resolved:
+			filters.cost_center = get_cost_centers_with_children(filters.cost_center)
 		conditions.append("cost_center in %(cost_center)s")
 
 	if filters.get("voucher_no"):
@@ -223,7 +245,7 @@ def get_conditions(filters):
 	if filters.get("against_voucher_no"):
 		conditions.append("against_voucher=%(against_voucher_no)s")
 
-	if filters.get("ignore_err"):
+	if filters.get("ignore_err") and not resolved:
 		err_journals = frappe.db.get_all(
 			"Journal Entry",
 			filters={
@@ -236,7 +258,7 @@ def get_conditions(filters):
 		if err_journals:
 			filters.update({"voucher_no_not_in": [x[0] for x in err_journals]})
 
-	if filters.get("ignore_cr_dr_notes"):
+	if filters.get("ignore_cr_dr_notes") and not resolved:
 		system_generated_cr_dr_journals = frappe.db.get_all(
 			"Journal Entry",
 			filters={
@@ -313,9 +335,10 @@ def get_conditions(filters):
 			if not dimension.disabled and dimension.document_type != "Finance Book":
 				if filters.get(dimension.fieldname):
 					if frappe.get_cached_value("DocType", dimension.document_type, "is_tree"):
-						filters[dimension.fieldname] = get_dimension_with_children(
-							dimension.document_type, filters.get(dimension.fieldname)
-						)
+						if not resolved:
+							filters[dimension.fieldname] = get_dimension_with_children(
+								dimension.document_type, filters.get(dimension.fieldname)
+							)
 						conditions.append(f"{dimension.fieldname} in %({dimension.fieldname})s")
 					else:
 						conditions.append(f"{dimension.fieldname} in %({dimension.fieldname})s")
@@ -554,11 +577,13 @@ def get_result_as_list(data, filters):
 	return data
 
 
-def get_supplier_invoice_details():
+def get_supplier_invoice_details(invoices=None):
 	inv_details = {}
+	invoice_condition = "and name in %(invoices)s" if invoices else ""
 	for d in frappe.db.sql(
-		""" select name, bill_no from `tabPurchase Invoice`
-		where docstatus = 1 and bill_no is not null and bill_no != '' """,
+		f""" select name, bill_no from `tabPurchase Invoice`
+		where docstatus = 1 and bill_no is not null and bill_no != '' {invoice_condition}""",
+		{"invoices": invoices},
 		as_dict=1,
 	):
 		inv_details[d.name] = d.bill_no
@@ -691,3 +716,288 @@ def get_columns(filters):
 		columns.extend([{"label": _("Remarks"), "fieldname": "remarks", "width": 400}])
 
 	return columns
+
+
+def get_paginated_filters(filters):
+	"""Validate the filters of the paginated General Ledger, which lists the entries one by one as
+	"Group by Voucher (Consolidated)" does, and resolve the accounts, cost centers and dimensions
+	with their children once for all the pages"""
+	filters = frappe._dict(frappe.parse_json(filters))
+
+	if filters.get("group_by") not in (None, "", "Group by Voucher (Consolidated)"):
+		frappe.throw(
+			_("The paginated General Ledger can only be grouped by {0}").format(
+				frappe.bold(_("Group by Voucher (Consolidated)"))
+			)
+		)
+
+	if filters.get("show_net_values_in_party_account"):
+		frappe.throw(
+			_("{0} is not available in the paginated General Ledger").format(
+				frappe.bold(_("Show Net Values in Party Account"))
+			)
+		)
+
+	if filters.get("print_in_account_currency") and not filters.get("account"):
+		frappe.throw(_("Select an account to print in account currency"))
+
+	account_details = {}
+	for acc in frappe.db.sql("""select name, is_group from tabAccount""", as_dict=1):
+		account_details.setdefault(acc.name, acc)
+
+	if filters.get("party"):
+		filters.party = frappe.parse_json(filters.get("party"))
+
+	validate_filters(filters, account_details)
+	validate_party(filters)
+	filters = set_account_currency(filters)
+	set_company_finance_book(filters)
+
+	get_conditions(filters)
+	filters.conditions_resolved = 1
+
+	return filters
+
+
+def get_opening_condition(filters):
+	"""Entries booked as opening, the same way `get_accountwise_gle` splits them"""
+	if filters.get("show_opening_entries"):
+		return "posting_date < %(from_date)s"
+
+	return "(posting_date < %(from_date)s or ifnull(is_opening, 'No') = 'Yes')"
+
+
+def get_amount_fields(in_account_currency):
+	if in_account_currency:
+		return "debit_in_account_currency", "credit_in_account_currency"
+
+	return "debit", "credit"
+
+
+@frappe.whitelist()
+def get_gl_entries_page(filters, after=None, page_length=GL_PAGE_LENGTH):
+	"""Returns a page of the General Ledger and the cursor to pass as `after` for the next one.
+
+	Entries are fetched by keyset on (posting date, creation, name), the running balance is computed
+	by the database and carried over in the cursor. The first page starts with the opening, the last
+	one ends with the totals and the closing and has no cursor.
+
+	The filters are validated and resolved for the first page and carried over in the cursor, the
+	`filters` passed with the next pages are ignored."""
+	after = frappe._dict(frappe.parse_json(after) if after else {})
+	if after:
+		filters = frappe._dict(after.filters)
+	elif not (isinstance(filters, dict) and filters.get("conditions_resolved")):
+		filters = get_paginated_filters(filters)
+
+	page_length = cint(page_length) or GL_PAGE_LENGTH
+
+	accounting_dimensions = get_accounting_dimensions() if filters.get("include_dimensions") else []
+	conditions = get_conditions(filters)
+	opening_condition = get_opening_condition(filters)
+	data = []
+
+	if not after:
+		after = get_opening_cursor(filters, conditions, opening_condition)
+		after.filters = filters
+		data.append(get_total_row(_("Opening"), after.opening_debit, after.opening_credit, filters, after))
+
+	debit, credit = get_amount_fields(after.in_account_currency)
+	keyset_condition = ""
+	if after.get("name"):
+		keyset_condition = """and (posting_date > %(after_posting_date)s
+			or (posting_date = %(after_posting_date)s and (creation > %(after_creation)s
+			or (creation = %(after_creation)s and name > %(after_name)s))))"""
+
+	gl_entries = frappe.db.sql(
+		f"""
+		select
+			page.*,
+			sum(page.{debit} - page.{credit})
+				over (order by page.posting_date, page.creation, page.gl_entry) as balance
+		from (
+			select
+				{get_select_fields(filters, accounting_dimensions)}
+			from `tabGL Entry`
+			where company=%(company)s {conditions} and not {opening_condition} {keyset_condition}
+			order by posting_date, creation, name
+			limit %(page_length)s
+		) page
+		order by page.posting_date, page.creation, page.gl_entry
+	""",
+		{
+			**filters,
+			"after_posting_date": after.get("posting_date"),
+			"after_creation": after.get("creation"),
+			"after_name": after.get("name"),
+			"page_length": page_length + 1,
+		},
+		as_dict=1,
+	)
+
+	has_next_page = len(gl_entries) > page_length
+	gl_entries = gl_entries[:page_length]
+
+	to_presentation_currency = get_presentation_currency_converter(filters, after.in_account_currency)
+	against_vouchers = list({gle.against_voucher for gle in gl_entries if gle.against_voucher})
+	inv_details = get_supplier_invoice_details(against_vouchers) if against_vouchers else {}
+
+	opening_balance = after.balance
+	for gle in gl_entries:
+		after.debit += flt(gle[debit])
+		after.credit += flt(gle[credit])
+
+		gle.debit = to_presentation_currency(gle[debit])
+		gle.credit = to_presentation_currency(gle[credit])
+		gle.balance = to_presentation_currency(opening_balance + flt(gle.balance))
+		gle.voucher_subtype = _(gle.voucher_subtype)
+		gle.against_voucher_type = _(gle.against_voucher_type)
+		gle.remarks = _(gle.remarks)
+		gle.party_type = _(gle.party_type)
+		gle.account_currency = filters.account_currency
+		gle.bill_no = inv_details.get(gle.against_voucher, "")
+		data.append(gle)
+
+	if gl_entries:
+		last_gle = gl_entries[-1]
+		after.balance = after.opening_debit - after.opening_credit + after.debit - after.credit
+		after.update(
+			posting_date=str(last_gle.posting_date), creation=str(last_gle.creation), name=last_gle.gl_entry
+		)
+
+	if has_next_page:
+		return frappe._dict(result=data, after=after)
+
+	data.append(get_total_row(_("Total"), after.debit, after.credit, filters, after))
+	data.append(
+		get_total_row(
+			_("Closing (Opening + Total)"),
+			after.opening_debit + after.debit,
+			after.opening_credit + after.credit,
+			filters,
+			after,
+		)
+	)
+
+	return frappe._dict(result=data, after=None)
+
+
+def get_opening_cursor(filters, conditions, opening_condition):
+	in_account_currency = False
+	if filters.get("presentation_currency"):
+		account_currencies = frappe.db.sql_list(
+			f"""select distinct account_currency from `tabGL Entry`
+			where company=%(company)s {conditions} limit 2""",
+			filters,
+		)
+		in_account_currency = account_currencies == [filters.presentation_currency]
+
+	debit, credit = get_amount_fields(in_account_currency)
+	opening_debit, opening_credit = frappe.db.sql(
+		f"""select sum({debit}), sum({credit}) from `tabGL Entry`
+		where company=%(company)s {conditions} and {opening_condition}""",
+		filters,
+	)[0]
+
+	return frappe._dict(
+		in_account_currency=in_account_currency,
+		opening_debit=flt(opening_debit),
+		opening_credit=flt(opening_credit),
+		debit=0.0,
+		credit=0.0,
+		balance=flt(opening_debit) - flt(opening_credit),
+	)
+
+
+def get_presentation_currency_converter(filters, in_account_currency):
+	"""Amounts are read in account currency if it is the presentation currency of all the entries,
+	as in `convert_to_presentation_currency`, and converted from the company currency otherwise"""
+	if not filters.get("presentation_currency") or in_account_currency:
+		return flt
+
+	currency_map = get_currency(filters)
+
+	def to_presentation_currency(value):
+		return convert(
+			value,
+			currency_map["presentation_currency"],
+			currency_map["company_currency"],
+			currency_map["report_date"],
+		)
+
+	return to_presentation_currency
+
+
+def get_total_row(label, debit, credit, filters, cursor):
+	to_presentation_currency = get_presentation_currency_converter(filters, cursor.in_account_currency)
+	return _dict(
+		account=f"'{label}'",
+		debit=to_presentation_currency(debit),
+		credit=to_presentation_currency(credit),
+		balance=to_presentation_currency(debit - credit),
+		account_currency=filters.account_currency,
+		debit_in_transaction_currency=None,
+		credit_in_transaction_currency=None,
+	)
+
+
+def iter_gl_entries(filters, page_length=GL_PAGE_LENGTH):
+	"""Rows of the paginated General Ledger, fetched one page at a time"""
+	if not filters.get("conditions_resolved"):
+		filters = get_paginated_filters(filters)
+
+	after = None
+	while True:
+		page = get_gl_entries_page(filters, after, page_length)
+		yield from page.result
+
+		after = page.after
+		if not after:
+			break
+
+
+@frappe.whitelist()
+def export_gl_entries(filters, file_format="CSV"):
+	"""Export the paginated General Ledger as CSV or Excel.
+
+	Rows are written page by page to a temporary file which is then streamed back in chunks,
+	neither the entries nor the file are held in memory."""
+	filters = get_paginated_filters(filters)
+	columns = [column for column in get_columns(filters) if not column.get("hidden")]
+	header = [column["label"] for column in columns]
+	rows = ([row.get(column["fieldname"]) for column in columns] for row in iter_gl_entries(filters))
+
+	file = tempfile.TemporaryFile()
+	if file_format == "Excel":
+		write_xlsx(file, header, rows)
+		extension, mimetype = "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+	else:
+		write_csv(file, header, rows)
+		extension, mimetype = "csv", "text/csv"
+
+	file.seek(0)
+	return Response(
+		wrap_file(frappe.local.request.environ, file),
+		mimetype=mimetype,
+		headers={"Content-Disposition": f'attachment; filename="General Ledger.{extension}"'},
+		direct_passthrough=True,
+	)
+
+
+def write_csv(file, header, rows):
+	text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+	writer = csv.writer(text)
+	writer.writerow(header)
+	writer.writerows(rows)
+	text.flush()
+	text.detach()
+
+
+def write_xlsx(file, header, rows):
+	wb = openpyxl.Workbook(write_only=True)
+	ws = wb.create_sheet(_("General Ledger")[:31])
+	ws.append(header)
+	for row in rows:
+		ws.append(row)
+
+	wb.save(file)
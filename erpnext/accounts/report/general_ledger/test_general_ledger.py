@@ -4,10 +4,14 @@
 import frappe
 from frappe import qb
 from frappe.tests.utils import FrappeTestCase
-from frappe.utils import flt, today
+from frappe.utils import add_days, flt, today
 
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.general_ledger.general_ledger import execute
+from erpnext.accounts.report.general_ledger.general_ledger import (
+	execute,
+	get_gl_entries_page,
+	iter_gl_entries,
+)
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
 
 
@@ -332,3 +336,42 @@ class TestGeneralLedger(FrappeTestCase):
 		)
 		actual = set([x.voucher_no for x in data if x.voucher_no])
 		self.assertEqual(expected, actual)
+
+	def test_paginated_general_ledger(self):
+		opening_si = create_sales_invoice(qty=1, rate=40, posting_date=add_days(today(), -10))
+		invoices = [create_sales_invoice(qty=1, rate=rate, posting_date=today()) for rate in (100, 200, 300)]
+		create_sales_invoice(
+			qty=-1, rate=50, posting_date=today(), is_return=1, return_against=invoices[0].name
+		)
+
+		filters = frappe._dict(
+			{
+				"company": self.company,
+				"from_date": add_days(today(), -1),
+				"to_date": today(),
+				"account": [opening_si.debit_to],
+			}
+		)
+		rows = list(iter_gl_entries(filters, page_length=2))
+
+		opening, entries, total, closing = rows[0], rows[1:-2], rows[-2], rows[-1]
+		self.assertEqual((opening.debit, opening.credit, opening.balance), (40, 0, 40))
+		self.assertEqual([(x.debit, x.credit) for x in entries], [(100, 0), (200, 0), (300, 0), (0, 50)])
+		self.assertEqual([x.balance for x in entries], [140, 340, 640, 590])
+		self.assertEqual((total.debit, total.credit), (600, 50))
+		self.assertEqual((closing.debit, closing.credit, closing.balance), (640, 50, 590))
+
+		# same opening and closing as the report
+		_columns, data = execute(frappe._dict(filters, group_by="Group by Voucher (Consolidated)"))
+		self.assertEqual((data[0].debit, data[0].credit), (opening.debit, opening.credit))
+		self.assertEqual((data[-1].debit, data[-1].credit), (closing.debit, closing.credit))
+
+		# the filters are resolved with the first page and carried over in the cursor
+		page = get_gl_entries_page(filters, page_length=2)
+		self.assertEqual(page.after.filters.account, [opening_si.debit_to])
+		next_page = get_gl_entries_page(frappe._dict(filters, account=["_Test Bank - _TC"]), page.after, 2)
+		self.assertEqual([(x.debit, x.credit) for x in next_page.result[:2]], [(300, 0), (0, 50)])
+
+		self.assertRaises(
+			frappe.ValidationError, get_gl_entries_page, frappe._dict(filters, group_by="Group by Account")
+		)
@@ -6,7 +6,11 @@ from frappe.tests.utils import FrappeTestCase
 from frappe.utils import getdate, today
 
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.financial_statements import get_period_list
+from erpnext.accounts.report.financial_statements import (
+	get_period_boundaries,
+	get_period_list,
+	set_gl_entries_by_account,
+)
 from erpnext.accounts.report.profit_and_loss_statement.profit_and_loss_statement import execute
 from erpnext.accounts.test.accounts_mixin import AccountsTestMixin
 
@@ -90,3 +94,57 @@ class TestProfitAndLossStatement(AccountsTestMixin, FrappeTestCase):
 				with self.subTest(current_period_key=current_period_key):
 					self.assertEqual(acc[current_period_key], 150)
 					self.assertEqual(acc["total"], 150)
+
+	def test_entries_grouped_by_period(self):
+		self.create_sales_invoice(qty=1, rate=150)
+		self.create_sales_invoice(qty=2, rate=100)
+
+		filters = self.get_report_filters()
+		period_list = get_period_list(
+			filters.from_fiscal_year,
+			filters.to_fiscal_year,
+			filters.period_start_date,
+			filters.period_end_date,
+			filters.filter_based_on,
+			filters.periodicity,
+			company=filters.company,
+		)
+		lft, rgt = frappe.db.get_value(
+			"Account",
+			{
+				"company": self.company,
+				"root_type": "Income",
+				"is_group": 1,
+				"parent_account": ("is", "not set"),
+			},
+			["lft", "rgt"],
+		)
+
+		def get_entries(group_by_period=None):
+			gl_entries_by_account = {}
+			set_gl_entries_by_account(
+				self.company,
+				period_list[0].year_start_date,
+				period_list[-1].to_date,
+				lft,
+				rgt,
+				filters,
+				gl_entries_by_account,
+				root_type="Income",
+				group_by_period=group_by_period,
+			)
+			return gl_entries_by_account
+
+		entries = get_entries()
+		grouped_entries = get_entries(get_period_boundaries(period_list))
+		self.assertEqual(entries.keys(), grouped_entries.keys())
+
+		# both invoices are posted today, so they are summed into one row
+		for account, account_entries in entries.items():
+			self.assertEqual(len(account_entries), 2)
+			self.assertEqual(len(grouped_entries[account]), 1)
+			self.assertEqual(
+				grouped_entries[account][0].credit - grouped_entries[account][0].debit,
+				sum(entry.credit - entry.debit for entry in account_entries),
+			)
+			self.assertEqual(grouped_entries[account][0].posting_date, getdate())
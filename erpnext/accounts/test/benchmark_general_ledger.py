@@ -0,0 +1,138 @@
+"""Microbenchmark of merging large GL maps before posting.
+
+Times `merge_similar_entries` against the baseline merge, which looked up the head of every
+entry by a linear scan of the merged entries, and checks that both merge to the same GL map.
+
+Usage:
+        bench --site <site> execute erpnext.accounts.test.benchmark_general_ledger.run
+        bench --site <site> execute erpnext.accounts.test.benchmark_general_ledger.run --kwargs "{'entries': 50000}"
+"""
+
+import random
+import timeit
+
+import frappe
+from frappe.model.meta import get_field_precision
+from frappe.utils import flt, nowdate
+
+import erpnext
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
+from erpnext.accounts.general_ledger import (
+	get_merge_key,
+	get_merge_properties,
+	merge_similar_entries,
+)
+
+
+def baseline_merge_similar_entries(gl_map, precision=None):
+	"""`merge_similar_entries` as it was before merging by a dict of merge keys"""
+	merged_gl_map = []
+	merge_properties = get_merge_properties(get_accounting_dimensions())
+
+	for entry in gl_map:
+		entry.merge_key = get_merge_key(entry, merge_properties)
+		same_head = next((e for e in merged_gl_map if e.merge_key == entry.merge_key), None)
+		if same_head:
+			same_head.debit = flt(same_head.debit) + flt(entry.debit)
+			same_head.debit_in_account_currency = flt(same_head.debit_in_account_currency) + flt(
+				entry.debit_in_account_currency
+			)
+			same_head.debit_in_transaction_currency = flt(same_head.debit_in_transaction_currency) + flt(
+				entry.debit_in_transaction_currency
+			)
+			same_head.credit = flt(same_head.credit) + flt(entry.credit)
+			same_head.credit_in_account_currency = flt(same_head.credit_in_account_currency) + flt(
+				entry.credit_in_account_currency
+			)
+			same_head.credit_in_transaction_currency = flt(same_head.credit_in_transaction_currency) + flt(
+				entry.credit_in_transaction_currency
+			)
+		else:
+			merged_gl_map.append(entry)
+
+	company = gl_map[0].company if gl_map else erpnext.get_default_company()
+	if not precision:
+		precision = get_field_precision(
+			frappe.get_meta("GL Entry").get_field("debit"), erpnext.get_company_currency(company)
+		)
+
+	return [
+		x
+		for x in merged_gl_map
+		if flt(x.debit, precision) != 0
+		or flt(x.credit, precision) != 0
+		or (
+			x.voucher_type == "Journal Entry"
+			and frappe.get_cached_value("Journal Entry", x.voucher_no, "voucher_type")
+			== "Exchange Gain Or Loss"
+		)
+	]
+
+
+def make_gl_map(entries: int, heads: int, seed: int = 42) -> list[frappe._dict]:
+	"""Synthetic GL map of `entries` rows spread over `heads` distinct merge keys.
+
+	Every head gets a debit and a credit of the same amount first, so the heads which get
+	nothing more are merged to zero and dropped."""
+	rng = random.Random(seed)
+	company = erpnext.get_default_company()
+
+	heads_of_entries = [head for head in range(heads) for _ in range(2)]
+	heads_of_entries += [rng.randrange(heads) for _ in range(max(entries - len(heads_of_entries), 0))]
+
+	gl_map = []
+	for idx, head in enumerate(heads_of_entries):
+		amount = round(rng.uniform(1, 1000), 2)
+		is_debit = idx % 2 if idx < 2 * heads else head % 2
+		gl_map.append(
+			frappe._dict(
+				company=company,
+				posting_date=nowdate(),
+				account=f"Account {head % 50}",
+				cost_center=f"Cost Center {head % 7}",
+				voucher_type="Landed Cost Voucher",
+				voucher_no="LCV-BENCH",
+				voucher_detail_no=f"row-{head}",
+				debit=amount if is_debit else 0,
+				credit=0 if is_debit else amount,
+				debit_in_account_currency=amount if is_debit else 0,
+				credit_in_account_currency=0 if is_debit else amount,
+				debit_in_transaction_currency=amount if is_debit else 0,
+				credit_in_transaction_currency=0 if is_debit else amount,
+			)
+		)
+
+	# the first two entries of a head cancel out
+	for debit_entry, credit_entry in zip(gl_map[1 : 2 * heads : 2], gl_map[0 : 2 * heads : 2], strict=True):
+		for fieldname in ("", "_in_account_currency", "_in_transaction_currency"):
+			credit_entry["credit" + fieldname] = debit_entry["debit" + fieldname]
+
+	return gl_map
+
+
+def run(entries: int = 10_000, heads: int = 2_000, repeat: int = 3) -> dict[str, float]:
+	"""Time merging of an `entries` long GL map into at most `heads` entries."""
+	gl_map = make_gl_map(entries, heads)
+	results = {}
+	merged_gl_maps = {}
+
+	for merge in (baseline_merge_similar_entries, merge_similar_entries):
+		timings = timeit.repeat(
+			lambda merge=merge: merge([frappe._dict(entry) for entry in gl_map]),
+			number=1,
+			repeat=repeat,
+		)
+		results[merge.__name__] = min(timings)
+		merged_gl_maps[merge.__name__] = merge([frappe._dict(entry) for entry in gl_map])
+
+	assert merged_gl_maps["merge_similar_entries"] == merged_gl_maps["baseline_merge_similar_entries"], (
+		"merged GL map differs from the baseline"
+	)
+
+	for name, seconds in results.items():
+		print(
+			f"{name}: {seconds:.4f}s for merging {len(gl_map)} entries into "
+			f"{len(merged_gl_maps[name])} entries"
+		)
+
+	return results
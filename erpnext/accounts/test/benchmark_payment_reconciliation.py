@@ -0,0 +1,219 @@
+"""Benchmark of allocating and reconciling payments in Payment Reconciliation.
+
+Creates `invoices` Sales Invoices and `payments` unallocated Payment Entries for _Test Customer, then
+- times `PaymentReconciliation.allocate_entries`, which pairs them with `get_allocation_pairs`,
+  against the baseline allocation scanning the invoices from the start for every payment, and checks
+  that both allocate the same amounts
+- runs the Process Payment Reconciliation jobs one after the other, as the workers would, with
+  `RECONCILE_BATCH_SIZE` allocations per job and with the allocations of one payment per job as before
+
+Everything is rolled back at the end. Run on a site with the test records:
+        bench --site <site> execute erpnext.accounts.test.benchmark_payment_reconciliation.run
+        bench --site <site> execute erpnext.accounts.test.benchmark_payment_reconciliation.run --kwargs "{'invoices': 1000}"
+"""
+
+import random
+import time
+import timeit
+
+import frappe
+from frappe.utils import flt
+
+from erpnext.accounts.doctype.payment_entry.test_payment_entry import create_payment_entry
+from erpnext.accounts.doctype.process_payment_reconciliation import process_payment_reconciliation
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+
+COMPANY = "_Test Company"
+CUSTOMER = "_Test Customer"
+RECEIVABLE_ACCOUNT = "Debtors - _TC"
+BANK_ACCOUNT = "_Test Bank - _TC"
+
+
+def baseline_allocate_entries(pr, args):
+	"""`PaymentReconciliation.allocate_entries` as it was before `get_allocation_pairs`, the invoices
+	are scanned from the start for every payment"""
+	pr.validate_entries()
+
+	invoice_exchange_map = pr.get_invoice_exchange_map(args.get("invoices"), args.get("payments"))
+	default_exchange_gain_loss_account = frappe.get_cached_value(
+		"Company", pr.company, "exchange_gain_loss_account"
+	)
+
+	entries = []
+	for pay in args.get("payments"):
+		pay.update({"unreconciled_amount": pay.get("amount")})
+		for inv in args.get("invoices"):
+			if pay.get("amount") >= inv.get("outstanding_amount"):
+				res = pr.get_allocated_entry(pay, inv, inv["outstanding_amount"])
+				pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
+				inv["outstanding_amount"] = 0
+			else:
+				res = pr.get_allocated_entry(pay, inv, pay["amount"])
+				inv["outstanding_amount"] = flt(inv.get("outstanding_amount")) - flt(pay.get("amount"))
+				pay["amount"] = 0
+
+			inv["exchange_rate"] = invoice_exchange_map.get(inv.get("invoice_number"))
+			if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
+				pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
+
+			res.difference_amount = pr.get_difference_amount(pay, inv, res["allocated_amount"])
+			res.difference_account = default_exchange_gain_loss_account
+			res.exchange_rate = inv.get("exchange_rate")
+			res.update({"gain_loss_posting_date": pay.get("posting_date")})
+
+			if pay.get("amount") == 0:
+				entries.append(res)
+				break
+			elif inv.get("outstanding_amount") == 0:
+				entries.append(res)
+				continue
+
+		else:
+			break
+
+	pr.set("allocation", [])
+	for entry in entries:
+		if entry["allocated_amount"] != 0:
+			row = pr.append("allocation", {})
+			row.update(entry)
+
+
+def make_entries(invoices: int, payments: int, seed: int = 42):
+	"""Invoices and unallocated payments of about the same total"""
+	rng = random.Random(seed)
+	amounts = [round(rng.uniform(1, 1000), 2) for _ in range(invoices)]
+
+	for amount in amounts:
+		create_sales_invoice(
+			company=COMPANY, customer=CUSTOMER, debit_to=RECEIVABLE_ACCOUNT, qty=1, rate=amount
+		)
+
+	for _ in range(payments):
+		create_payment_entry(
+			company=COMPANY,
+			payment_type="Receive",
+			party_type="Customer",
+			party=CUSTOMER,
+			paid_from=RECEIVABLE_ACCOUNT,
+			paid_to=BANK_ACCOUNT,
+			paid_amount=round(sum(amounts) / payments, 2),
+			save=1,
+			submit=1,
+		)
+
+
+def time_allocation(limit: int, repeat: int) -> dict[str, float]:
+	pr = frappe.get_doc("Payment Reconciliation")
+	pr.update(
+		{
+			"company": COMPANY,
+			"party_type": "Customer",
+			"party": CUSTOMER,
+			"receivable_payable_account": RECEIVABLE_ACCOUNT,
+			"invoice_limit": limit,
+			"payment_limit": limit,
+		}
+	)
+	pr.get_unreconciled_entries()
+	invoices = [x.as_dict() for x in pr.invoices]
+	payments = [x.as_dict() for x in pr.payments]
+
+	def allocate(allocate_entries):
+		allocate_entries(
+			frappe._dict(
+				{
+					"invoices": [frappe._dict(x) for x in invoices],
+					"payments": [frappe._dict(x) for x in payments],
+				}
+			)
+		)
+		return [(x.reference_name, x.invoice_number, flt(x.allocated_amount)) for x in pr.allocation]
+
+	results = {}
+	allocations = {}
+	for name, allocate_entries in (
+		("baseline allocation", lambda args: baseline_allocate_entries(pr, args)),
+		("allocate_entries", pr.allocate_entries),
+	):
+		allocations[name] = allocate(allocate_entries)
+		results[name] = min(
+			timeit.repeat(
+				lambda allocate_entries=allocate_entries: allocate(allocate_entries), number=1, repeat=repeat
+			)
+		)
+		print(
+			f"{name}: {results[name]:.4f}s for {len(allocations[name])} allocations, "
+			f"{len(allocations[name]) / results[name]:.0f} allocations/s"
+		)
+
+	assert allocations["allocate_entries"] == allocations["baseline allocation"], "allocations differ"
+
+	return results
+
+
+def run_reconcile_jobs(batch_size: int) -> tuple[int, int]:
+	"""Allocate and reconcile through Process Payment Reconciliation, running its jobs one after the
+	other as the workers would. Returns the number of allocations and of reconcile jobs."""
+	ppr = frappe.get_doc(
+		{
+			"doctype": "Process Payment Reconciliation",
+			"company": COMPANY,
+			"party_type": "Customer",
+			"party": CUSTOMER,
+			"receivable_payable_account": RECEIVABLE_ACCOUNT,
+		}
+	).insert()
+	ppr.submit()
+
+	log = frappe.new_doc("Process Payment Reconciliation Log")
+	log.process_pr = ppr.name
+	log.status = "Running"
+	log.save()
+
+	default_batch_size = process_payment_reconciliation.RECONCILE_BATCH_SIZE
+	process_payment_reconciliation.RECONCILE_BATCH_SIZE = batch_size
+	try:
+		process_payment_reconciliation.fetch_and_allocate(ppr.name)
+
+		jobs = 0
+		while not frappe.db.get_value("Process Payment Reconciliation Log", log.name, "reconciled"):
+			process_payment_reconciliation.reconcile(ppr.name)
+			jobs += 1
+
+			status = frappe.db.get_value("Process Payment Reconciliation Log", log.name, "status")
+			if status in ("Failed", "Partially Reconciled"):
+				frappe.throw(frappe.db.get_value("Process Payment Reconciliation Log", log.name, "error_log"))
+	finally:
+		process_payment_reconciliation.RECONCILE_BATCH_SIZE = default_batch_size
+
+	return frappe.db.get_value("Process Payment Reconciliation Log", log.name, "total_allocations"), jobs
+
+
+def time_reconciliation() -> dict[str, float]:
+	results = {}
+	for name, batch_size in (
+		# the allocations of a single payment were reconciled in every job
+		("baseline jobs", 1),
+		("batched jobs", process_payment_reconciliation.RECONCILE_BATCH_SIZE),
+	):
+		frappe.db.savepoint("benchmark_reconciliation")
+		start = time.perf_counter()
+		allocations, jobs = run_reconcile_jobs(batch_size)
+		results[name] = time.perf_counter() - start
+		frappe.db.rollback(save_point="benchmark_reconciliation")
+
+		print(
+			f"{name}: {results[name]:.4f}s for {allocations} allocations in {jobs} jobs, "
+			f"{flt(allocations) / results[name]:.0f} allocations/s"
+		)
+
+	return results
+
+
+def run(invoices: int = 200, payments: int = 100, repeat: int = 3) -> dict[str, float]:
+	"""Time allocation and reconciliation of `payments` payments to `invoices` invoices."""
+	try:
+		make_entries(invoices, payments)
+		return {**time_allocation(invoices + payments, repeat), **time_reconciliation()}
+	finally:
+		frappe.db.rollback()
@@ -2,6 +2,8 @@
 # License: GNU General Public License v3. See license.txt
 
 
+from bisect import bisect_right
+from itertools import accumulate
 from json import loads
 from typing import TYPE_CHECKING, Optional
 
@@ -10,7 +12,7 @@ import frappe.defaults
 from frappe import _, qb, throw
 from frappe.model.meta import get_field_precision
 from frappe.query_builder import AliasedQuery, Criterion, Table
-from frappe.query_builder.functions import Count, Round, Sum
+from frappe.query_builder.functions import Count, Min, Round, Sum
 from frappe.query_builder.utils import DocType
 from frappe.utils import (
 	add_days,
@@ -33,6 +35,14 @@ import erpnext
 # imported to enable erpnext.accounts.utils.get_account_currency
 from erpnext.accounts.doctype.account.account import get_account_currency
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_dimensions
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	get_linked_vouchers,
+	is_payment_ledger_outstanding_enabled,
+	refresh_payment_ledger_outstanding,
+)
+from erpnext.accounts.doctype.payment_ledger_snapshot.payment_ledger_snapshot import (
+	invalidate_payment_ledger_snapshots,
+)
 from erpnext.stock import get_warehouse_account_map
 from erpnext.stock.utils import get_stock_value_on
 
@@ -76,6 +86,127 @@ def get_fiscal_years(
 	as_dict=False,
 	boolean=False,
 ):
+	fiscal_year_index = get_fiscal_year_index(company)
+
+	if not transaction_date and not fiscal_year:
+		return fiscal_year_index.get_fiscal_years()
+
+	fy = fiscal_year_index.find(transaction_date, fiscal_year)
+	if fy:
+		if as_dict:
+			return (frappe._dict(fy),)
+		else:
+			return ((fy.name, fy.year_start_date, fy.year_end_date),)
+
+	if boolean:
+		return False
+
+	raise_fiscal_year_error(transaction_date, label, verbose, company)
+
+
+def get_fiscal_years_for_dates(dates, company=None, label="Date", verbose=1, as_dict=False, boolean=False):
+	"""Returns the fiscal year of each of `dates` as a dict keyed by date, resolving all of them
+	with a single lookup of the fiscal years of the company.
+
+	Dates not in any active fiscal year are mapped to False if `boolean` is set."""
+	fiscal_year_index = get_fiscal_year_index(company)
+
+	fiscal_years = {}
+	for date in dates:
+		date = getdate(date)
+		if date in fiscal_years:
+			continue
+
+		fy = fiscal_year_index.find(date)
+		if fy:
+			fiscal_years[date] = (
+				frappe._dict(fy) if as_dict else (fy.name, fy.year_start_date, fy.year_end_date)
+			)
+		elif boolean:
+			fiscal_years[date] = False
+		else:
+			raise_fiscal_year_error(date, label, verbose, company)
+
+	return fiscal_years
+
+
+def raise_fiscal_year_error(transaction_date, label, verbose, company):
+	error_msg = _("""{0} {1} is not in any active Fiscal Year""").format(label, formatdate(transaction_date))
+	if company:
+		error_msg = _("""{0} for {1}""").format(error_msg, frappe.bold(company))
+
+	if verbose == 1:
+		frappe.msgprint(error_msg)
+
+	raise FiscalYearError(error_msg)
+
+
+class FiscalYearIndex:
+	"""Active fiscal years of a company sorted by start date, the fiscal year of a date is found
+	by bisecting the start dates"""
+
+	def __init__(self, fiscal_years):
+		self.fiscal_years = sorted(fiscal_years, key=lambda fy: getdate(fy.year_start_date))
+		self.start_dates = [getdate(fy.year_start_date) for fy in self.fiscal_years]
+		self.end_dates = [getdate(fy.year_end_date) for fy in self.fiscal_years]
+		# latest end date of the fiscal years up to each one, fiscal years of different companies can overlap
+		self.max_end_dates = list(accumulate(self.end_dates, max))
+		self.by_name = {fy.name: idx for idx, fy in enumerate(self.fiscal_years)}
+
+	def get_fiscal_years(self):
+		"""All fiscal years, latest first"""
+		return [frappe._dict(fy) for fy in reversed(self.fiscal_years)]
+
+	def find(self, date=None, fiscal_year=None):
+		"""Latest starting fiscal year which is either named `fiscal_year` or includes `date`"""
+		candidates = []
+		if fiscal_year and fiscal_year in self.by_name:
+			candidates.append(self.by_name[fiscal_year])
+
+		if date:
+			date = getdate(date)
+			idx = bisect_right(self.start_dates, date) - 1
+			while idx >= 0 and self.max_end_dates[idx] >= date:
+				if self.end_dates[idx] >= date:
+					candidates.append(idx)
+					break
+				idx -= 1
+
+		if candidates:
+			return self.fiscal_years[max(candidates)]
+
+
+# process-local, per site and company, reloaded when the version in redis changes
+_fiscal_year_indexes = {}
+
+
+def get_fiscal_year_index(company=None) -> FiscalYearIndex:
+	version = get_fiscal_years_version()
+	key = (frappe.local.site, company)
+
+	cached = _fiscal_year_indexes.get(key)
+	if not cached or cached[0] != version:
+		cached = (version, FiscalYearIndex(get_active_fiscal_years(company)))
+		_fiscal_year_indexes[key] = cached
+
+	return cached[1]
+
+
+def get_fiscal_years_version():
+	"""Version of the fiscal years, read from redis once per request or job"""
+	version = getattr(frappe.local, "fiscal_years_version", None)
+	if not version:
+		version = frappe.cache().get_value("fiscal_years_version")
+		if not version:
+			version = frappe.generate_hash(length=10)
+			frappe.cache().set_value("fiscal_years_version", version)
+
+		frappe.local.fiscal_years_version = version
+
+	return version
+
+
+def get_active_fiscal_years(company=None):
 	fiscal_years = frappe.cache().hget("fiscal_years", company) or []
 
 	if not fiscal_years:
@@ -86,9 +217,6 @@ def get_fiscal_years(
 			frappe.qb.from_(FY).select(FY.name, FY.year_start_date, FY.year_end_date).where(FY.disabled == 0)
 		)
 
-		if fiscal_year:
-			query = query.where(FY.name == fiscal_year)
-
 		if company:
 			FYC = DocType("Fiscal Year Company")
 			query = query.where(
@@ -106,41 +234,15 @@ def get_fiscal_years(
 
 		frappe.cache().hset("fiscal_years", company, fiscal_years)
 
-	if not transaction_date and not fiscal_year:
-		return fiscal_years
-
-	if transaction_date:
-		transaction_date = getdate(transaction_date)
-
-	for fy in fiscal_years:
-		matched = False
-		if fiscal_year and fy.name == fiscal_year:
-			matched = True
+	return fiscal_years
 
-		if (
-			transaction_date
-			and getdate(fy.year_start_date) <= transaction_date
-			and getdate(fy.year_end_date) >= transaction_date
-		):
-			matched = True
 
-		if matched:
-			if as_dict:
-				return (fy,)
-			else:
-				return ((fy.name, fy.year_start_date, fy.year_end_date),)
-
-	error_msg = _("""{0} {1} is not in any active Fiscal Year""").format(label, formatdate(transaction_date))
-	if company:
-		error_msg = _("""{0} for {1}""").format(error_msg, frappe.bold(company))
-
-	if boolean:
-		return False
-
-	if verbose == 1:
-		frappe.msgprint(error_msg)
-
-	raise FiscalYearError(error_msg)
+def clear_fiscal_years_cache():
+	"""Invalidate the fiscal years cached in redis and the indexes of all processes"""
+	frappe.cache().delete_value("fiscal_years")
+	frappe.cache().set_value("fiscal_years_version", frappe.generate_hash(length=10))
+	frappe.local.fiscal_years_version = None
+	_fiscal_year_indexes.clear()
 
 
 @frappe.whitelist()
@@ -288,11 +390,21 @@ def get_balance_on(
 		else:
 			select_field = "sum(round(debit, %s)) - sum(round(credit, %s))"
 
+		from erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup import (
+			is_account_balance_rollup_enabled,
+		)
+
+		table = "`tabGL Entry`"
+		if not (party_type and party) and is_account_balance_rollup_enabled():
+			# daily balances carry the same columns as GL Entry, only of the active entries
+			table = "`tabAccount Balance Rollup`"
+			cond.remove("is_cancelled=0")
+
 		bal = frappe.db.sql(
 			"""
 			SELECT {}
-			FROM `tabGL Entry` gle
-			WHERE {}""".format(select_field, " and ".join(cond)),
+			FROM {} gle
+			WHERE {}""".format(select_field, table, " and ".join(cond)),
 			(precision, precision),
 		)[0][0]
 		# if bal is None, return 0
@@ -466,10 +578,18 @@ def reconcile_against_document(
 
 		reconciled_entries[(row.voucher_type, row.voucher_no)].append(row)
 
+	# outstanding of an invoice is updated once, after the last of the vouchers linked to it
+	outstanding_to_update = {}
 	for key, entries in reconciled_entries.items():
 		voucher_type = key[0]
 		voucher_no = key[1]
 
+		# linking reads the outstanding of the invoices, update the ones linked to previous vouchers
+		against_vouchers = {(entry.against_voucher_type, entry.against_voucher) for entry in entries}
+		for args in [args for args in outstanding_to_update if args[:2] in against_vouchers]:
+			update_voucher_outstanding(*args)
+			del outstanding_to_update[args]
+
 		# cancel advance entry
 		doc = frappe.get_doc(voucher_type, voucher_no)
 		frappe.flags.ignore_party_validation = True
@@ -524,13 +644,15 @@ def reconcile_against_document(
 
 		# Only update outstanding for newly linked vouchers
 		for entry in entries:
-			update_voucher_outstanding(
-				entry.against_voucher_type,
-				entry.against_voucher,
-				entry.account,
-				entry.party_type,
-				entry.party,
-			)
+			outstanding_to_update[
+				(
+					entry.against_voucher_type,
+					entry.against_voucher,
+					entry.account,
+					entry.party_type,
+					entry.party,
+				)
+			] = None
 		# update advance paid in Advance Receivable/Payable doctypes
 		if update_advance_paid:
 			for t, n in update_advance_paid:
@@ -538,6 +660,9 @@ def reconcile_against_document(
 
 		frappe.flags.ignore_party_validation = False
 
+	for args in outstanding_to_update:
+		update_voucher_outstanding(*args)
+
 
 def check_if_advance_entry_modified(args):
 	"""
@@ -813,6 +938,22 @@ def update_accounting_ledgers_after_reference_removal(
 
 	# Payment Ledger
 	ple = qb.DocType("Payment Ledger Entry")
+	linked_vouchers = []
+	if is_payment_ledger_outstanding_enabled():
+		linked_vouchers_query = (
+			qb.from_(ple)
+			.select(ple.voucher_type, ple.voucher_no)
+			.distinct()
+			.where(
+				(ple.against_voucher_type == ref_type)
+				& (ple.against_voucher_no == ref_no)
+				& (ple.delinked == 0)
+			)
+		)
+		if payment_name:
+			linked_vouchers_query = linked_vouchers_query.where(ple.voucher_no == payment_name)
+		linked_vouchers = [(ref_type, ref_no), *linked_vouchers_query.run()]
+
 	ple_update_query = (
 		qb.update(ple)
 		.set(ple.against_voucher_type, ple.voucher_type)
@@ -828,6 +969,8 @@ def update_accounting_ledgers_after_reference_removal(
 		ple_update_query = ple_update_query.where(ple.voucher_no == payment_name)
 	ple_update_query.run()
 
+	refresh_payment_ledger_outstanding(linked_vouchers)
+
 
 def remove_ref_from_advance_section(ref_doc: object = None):
 	# TODO: this might need some testing
@@ -959,6 +1102,11 @@ def get_company_default(company, fieldname, ignore_validation=False):
 
 
 def fix_total_debit_credit():
+	from erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup import (
+		add_to_account_balance_rollup,
+		remove_from_account_balance_rollup,
+	)
+
 	vouchers = frappe.db.sql(
 		"""select voucher_type, voucher_no,
 		sum(debit) - sum(credit) as diff
@@ -972,6 +1120,7 @@ def fix_total_debit_credit():
 		if abs(d.diff) > 0:
 			dr_or_cr = d.voucher_type == "Sales Invoice" and "credit" or "debit"
 
+			remove_from_account_balance_rollup(d.voucher_type, d.voucher_no)
 			frappe.db.sql(
 				"""update `tabGL Entry` set {} = {} + {}
 				where voucher_type = {} and voucher_no = {} and {} > 0 limit 1""".format(
@@ -979,6 +1128,7 @@ def fix_total_debit_credit():
 				),
 				(d.diff, d.voucher_type, d.voucher_no),
 			)
+			add_to_account_balance_rollup(d.voucher_type, d.voucher_no)
 
 
 def get_currency_precision():
@@ -1308,8 +1458,14 @@ def repost_gle_for_stock_vouchers(
 	company: str | None = None,
 	warehouse_account=None,
 	repost_doc: Optional["RepostItemValuation"] = None,
+	is_sorted: bool = False,
 ):
+	"""Repost GL Entries of stock vouchers, progress is saved in `gl_reposting_index` of `repost_doc`.
+
+	For resuming from saved progress, `stock_vouchers` should be the same list on every run,
+	pass `is_sorted` if the list is already sorted by `sort_stock_vouchers_by_posting_date`."""
 	from erpnext.accounts.general_ledger import toggle_debit_credit_if_negative
+	from erpnext.stock.reposting_timer import reposting_phase
 
 	if not stock_vouchers:
 		return
@@ -1317,7 +1473,9 @@ def repost_gle_for_stock_vouchers(
 	if not warehouse_account:
 		warehouse_account = get_warehouse_account_map(company)
 
-	stock_vouchers = sort_stock_vouchers_by_posting_date(stock_vouchers)
+	if not is_sorted:
+		stock_vouchers = sort_stock_vouchers_by_posting_date(stock_vouchers)
+
 	if repost_doc and repost_doc.gl_reposting_index:
 		# Restore progress
 		stock_vouchers = stock_vouchers[cint(repost_doc.gl_reposting_index) :]
@@ -1325,22 +1483,32 @@ def repost_gle_for_stock_vouchers(
 	precision = get_field_precision(frappe.get_meta("GL Entry").get_field("debit")) or 2
 
 	for stock_vouchers_chunk in create_batch(stock_vouchers, GL_REPOSTING_CHUNK):
-		gle = get_voucherwise_gl_entries(stock_vouchers_chunk, posting_date)
+		with reposting_phase("gl_compare") as phase:
+			gle = get_voucherwise_gl_entries(stock_vouchers_chunk, posting_date)
+			phase.rows = sum(len(entries) for entries in gle.values())
 
 		for voucher_type, voucher_no in stock_vouchers_chunk:
 			existing_gle = gle.get((voucher_type, voucher_no), [])
-			voucher_obj = frappe.get_doc(voucher_type, voucher_no)
-			# Some transactions post credit as negative debit, this is handled while posting GLE
-			# but while comparing we need to make sure it's flipped so comparisons are accurate
-			expected_gle = toggle_debit_credit_if_negative(voucher_obj.get_gl_entries(warehouse_account))
+			with reposting_phase("gl_regeneration") as phase:
+				voucher_obj = frappe.get_doc(voucher_type, voucher_no)
+				# Some transactions post credit as negative debit, this is handled while posting GLE
+				# but while comparing we need to make sure it's flipped so comparisons are accurate
+				expected_gle = toggle_debit_credit_if_negative(voucher_obj.get_gl_entries(warehouse_account))
+				phase.rows = len(expected_gle)
+
 			if expected_gle:
-				if not existing_gle or not compare_existing_and_expected_gle(
-					existing_gle, expected_gle, precision
-				):
-					_delete_accounting_ledger_entries(voucher_type, voucher_no)
-					voucher_obj.make_gl_entries(gl_entries=expected_gle, from_repost=True)
+				with reposting_phase("gl_compare"):
+					is_unchanged = existing_gle and compare_existing_and_expected_gle(
+						existing_gle, expected_gle, precision
+					)
+
+				if not is_unchanged:
+					with reposting_phase("gl_write", rows=len(expected_gle)):
+						_delete_accounting_ledger_entries(voucher_type, voucher_no)
+						voucher_obj.make_gl_entries(gl_entries=expected_gle, from_repost=True)
 			else:
-				_delete_accounting_ledger_entries(voucher_type, voucher_no)
+				with reposting_phase("gl_write"):
+					_delete_accounting_ledger_entries(voucher_type, voucher_no)
 
 		if not frappe.flags.in_test:
 			frappe.db.commit()
@@ -1353,11 +1521,22 @@ def repost_gle_for_stock_vouchers(
 
 
 def _delete_pl_entries(voucher_type, voucher_no):
+	linked_vouchers = get_linked_vouchers(voucher_type, voucher_no)
+	invalidate_payment_ledger_snapshots(voucher_type, voucher_no)
+
 	ple = qb.DocType("Payment Ledger Entry")
 	qb.from_(ple).delete().where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no)).run()
 
+	refresh_payment_ledger_outstanding(linked_vouchers)
+
 
 def _delete_gl_entries(voucher_type, voucher_no):
+	from erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup import (
+		remove_from_account_balance_rollup,
+	)
+
+	remove_from_account_balance_rollup(voucher_type, voucher_no)
+
 	gle = qb.DocType("GL Entry")
 	qb.from_(gle).delete().where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no)).run()
 
@@ -1372,21 +1551,31 @@ def _delete_accounting_ledger_entries(voucher_type, voucher_no):
 
 def sort_stock_vouchers_by_posting_date(stock_vouchers: list[tuple[str, str]]) -> list[tuple[str, str]]:
 	sle = frappe.qb.DocType("Stock Ledger Entry")
-	voucher_nos = [v[1] for v in stock_vouchers]
-
-	sles = (
-		frappe.qb.from_(sle)
-		.select(sle.voucher_type, sle.voucher_no, sle.posting_date, sle.posting_time, sle.creation)
-		.where((sle.is_cancelled == 0) & (sle.voucher_no.isin(voucher_nos)))
-		.groupby(sle.voucher_type, sle.voucher_no)
-		.orderby(sle.posting_datetime)
-		.orderby(sle.creation)
-	).run(as_dict=True)
+	voucher_nos = list(dict.fromkeys(v[1] for v in stock_vouchers))
+
+	sles = []
+	# posting of vouchers is fetched in chunks to avoid huge IN clause
+	for voucher_nos_chunk in create_batch(voucher_nos, GL_REPOSTING_CHUNK):
+		sles.extend(
+			(
+				frappe.qb.from_(sle)
+				.select(
+					sle.voucher_type,
+					sle.voucher_no,
+					Min(sle.posting_datetime).as_("posting_datetime"),
+					Min(sle.creation).as_("creation"),
+				)
+				.where((sle.is_cancelled == 0) & (sle.voucher_no.isin(voucher_nos_chunk)))
+				.groupby(sle.voucher_type, sle.voucher_no)
+			).run(as_dict=True)
+		)
+
+	sles.sort(key=lambda sle: (sle.posting_datetime, sle.creation, sle.voucher_type, sle.voucher_no))
 	sorted_vouchers = [(sle.voucher_type, sle.voucher_no) for sle in sles]
 
 	unknown_vouchers = set(stock_vouchers) - set(sorted_vouchers)
 	if unknown_vouchers:
-		sorted_vouchers.extend(unknown_vouchers)
+		sorted_vouchers.extend(sorted(unknown_vouchers))
 
 	return sorted_vouchers
 
@@ -1704,6 +1893,8 @@ def create_payment_ledger_entry(
 ):
 	if gl_entries:
 		ple_map = get_payment_ledger_entries(gl_entries, cancel=cancel)
+		vouchers = []
+		against_vouchers = {}
 
 		for entry in ple_map:
 			ple = frappe.get_doc(entry)
@@ -1715,8 +1906,21 @@ def create_payment_ledger_entry(
 			ple.flags.adv_adj = adv_adj
 			ple.flags.from_repost = from_repost
 			ple.flags.update_outstanding = update_outstanding
+			ple.flags.skip_outstanding_refresh = True
 			ple.submit()
 
+			vouchers.extend(
+				[(ple.voucher_type, ple.voucher_no), (ple.against_voucher_type, ple.against_voucher_no)]
+			)
+			against_vouchers.setdefault(
+				(ple.against_voucher_type, ple.against_voucher_no, ple.account, ple.party_type, ple.party),
+				ple,
+			)
+
+		refresh_payment_ledger_outstanding(vouchers)
+		for ple in against_vouchers.values():
+			ple.update_against_voucher_outstanding()
+
 
 def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, party):
 	ple = frappe.qb.DocType("Payment Ledger Entry")
@@ -1817,6 +2021,10 @@ class QueryPaymentLedger:
 		Database query to fetch voucher amount and voucher outstanding using Common Table Expression
 		"""
 
+		if is_payment_ledger_outstanding_enabled() and not self.dimensions_filter:
+			self.query_for_stored_outstanding()
+			return
+
 		ple = self.ple
 
 		filter_on_voucher_no = []
@@ -1986,6 +2194,76 @@ class QueryPaymentLedger:
 		# execute SQL
 		self.voucher_outstandings = self.cte_query_voucher_amount_and_outstanding.run(as_dict=True)
 
+	def query_for_stored_outstanding(self):
+		"""
+		Fetch voucher amount and voucher outstanding from Payment Ledger Outstanding,
+		which is kept up to date with the Payment Ledger
+		"""
+
+		ple = self.ple
+		stored = qb.DocType("Payment Ledger Outstanding")
+
+		# filters are built on Payment Ledger Entry, columns used by them are the same in both
+		conditions = [
+			criterion.replace_table(ple, stored)
+			for criterion in self.common_filter + self.voucher_posting_date
+		]
+
+		if self.vouchers:
+			conditions.append(stored.voucher_type.isin(set([x.voucher_type for x in self.vouchers])))
+			conditions.append(stored.voucher_no.isin(set([x.voucher_no for x in self.vouchers])))
+
+		if self.voucher_no:
+			conditions.append(stored.voucher_no.like(f"%{self.voucher_no}%"))
+
+		outstanding = stored.outstanding_in_account_currency
+		if self.min_outstanding:
+			if self.min_outstanding > 0:
+				conditions.append(outstanding >= self.min_outstanding)
+			else:
+				conditions.append(outstanding <= self.min_outstanding)
+		if self.max_outstanding:
+			if self.max_outstanding > 0:
+				conditions.append(outstanding <= self.max_outstanding)
+			else:
+				conditions.append(outstanding >= self.max_outstanding)
+
+		# only fetch invoices
+		if self.get_invoices:
+			conditions.append(outstanding > 0)
+		# only fetch payments
+		elif self.get_payments:
+			conditions.append(outstanding < 0)
+
+		query = (
+			qb.from_(stored)
+			.select(
+				stored.account,
+				stored.voucher_type,
+				stored.voucher_no,
+				stored.party_type,
+				stored.party,
+				stored.posting_date,
+				stored.invoice_amount,
+				stored.invoice_amount_in_account_currency,
+				stored.outstanding,
+				stored.outstanding_in_account_currency,
+				(stored.invoice_amount - stored.outstanding).as_("paid_amount"),
+				(stored.invoice_amount_in_account_currency - stored.outstanding_in_account_currency).as_(
+					"paid_amount_in_account_currency"
+				),
+				stored.due_date,
+				stored.account_currency.as_("currency"),
+				stored.cost_center,
+			)
+			.where(Criterion.all(conditions))
+		)
+
+		if self.limit:
+			query = query.orderby(stored.posting_date, stored.voucher_no).limit(self.limit)
+
+		self.voucher_outstandings = query.run(as_dict=True)
+
 	def get_voucher_outstandings(
 		self,
 		vouchers=None,
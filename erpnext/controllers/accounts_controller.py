@@ -28,10 +28,17 @@ from frappe.utils import (
 )
 
 import erpnext
+from erpnext.accounts.doctype.account_balance_rollup.account_balance_rollup import (
+	remove_from_account_balance_rollup,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimensions,
 )
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	get_linked_vouchers,
+	refresh_payment_ledger_outstanding,
+)
 from erpnext.accounts.doctype.pricing_rule.utils import (
 	apply_pricing_rule_for_free_items,
 	apply_pricing_rule_on_transaction,
@@ -67,6 +74,7 @@ from erpnext.stock.get_item_details import (
 	get_item_details,
 	get_item_tax_map,
 	get_item_warehouse,
+	prefetch_item_details,
 )
 from erpnext.utilities.regional import temporary_flag
 from erpnext.utilities.transaction_base import TransactionBase
@@ -352,6 +360,7 @@ class AccountsController(TransactionBase):
 
 		# delete sl and gl entries on deletion of transaction
 		if frappe.db.get_single_value("Accounts Settings", "delete_linked_ledger_entries"):
+			linked_vouchers = get_linked_vouchers(self.doctype, self.name)
 			ple = frappe.qb.DocType("Payment Ledger Entry")
 			frappe.qb.from_(ple).delete().where(
 				(ple.voucher_type == self.doctype) & (ple.voucher_no == self.name)
@@ -362,6 +371,8 @@ class AccountsController(TransactionBase):
 					== 1
 				)
 			).run()
+			refresh_payment_ledger_outstanding(linked_vouchers)
+			remove_from_account_balance_rollup(self.doctype, self.name)
 			frappe.db.sql(
 				"delete from `tabGL Entry` where voucher_type=%s and voucher_no=%s", (self.doctype, self.name)
 			)
@@ -722,96 +733,110 @@ class AccountsController(TransactionBase):
 
 			self.pricing_rules = []
 
-			for item in self.get("items"):
-				if item.get("item_code"):
-					args = parent_dict.copy()
-					args.update(item.as_dict())
-
-					args["doctype"] = self.doctype
-					args["name"] = self.name
-					args["child_doctype"] = item.doctype
-					args["child_docname"] = item.name
-					args["ignore_pricing_rule"] = (
-						self.ignore_pricing_rule if hasattr(self, "ignore_pricing_rule") else 0
-					)
-
-					if not args.get("transaction_date"):
-						args["transaction_date"] = args.get("posting_date")
+			# fetch the prices, bins and pricing rules of all the items together
+			with prefetch_item_details(
+				[
+					{
+						"item_code": item.item_code,
+						"price_list": parent_dict.get("selling_price_list")
+						or parent_dict.get("buying_price_list"),
+					}
+					for item in self.get("items")
+					if item.get("item_code")
+				]
+			):
+				for item in self.get("items"):
+					if item.get("item_code"):
+						args = parent_dict.copy()
+						args.update(item.as_dict())
+
+						args["doctype"] = self.doctype
+						args["name"] = self.name
+						args["child_doctype"] = item.doctype
+						args["child_docname"] = item.name
+						args["ignore_pricing_rule"] = (
+							self.ignore_pricing_rule if hasattr(self, "ignore_pricing_rule") else 0
+						)
 
-					if self.get("is_subcontracted"):
-						args["is_subcontracted"] = self.is_subcontracted
+						if not args.get("transaction_date"):
+							args["transaction_date"] = args.get("posting_date")
 
-					ret = get_item_details(args, self, for_validate=for_validate, overwrite_warehouse=False)
-					for fieldname, value in ret.items():
-						if item.meta.get_field(fieldname) and value is not None:
-							if item.get(fieldname) is None or fieldname in force_item_fields:
-								item.set(fieldname, value)
+						if self.get("is_subcontracted"):
+							args["is_subcontracted"] = self.is_subcontracted
 
-							elif fieldname in ["cost_center", "conversion_factor"] and not item.get(
-								fieldname
-							):
-								item.set(fieldname, value)
-							elif fieldname == "item_tax_rate" and not (
-								self.get("is_return") and self.get("return_against")
-							):
-								item.set(fieldname, value)
-							elif fieldname == "serial_no":
-								# Ensure that serial numbers are matched against Stock UOM
-								item_conversion_factor = item.get("conversion_factor") or 1.0
-								item_qty = abs(item.get("qty")) * item_conversion_factor
+						ret = get_item_details(
+							args, self, for_validate=for_validate, overwrite_warehouse=False
+						)
+						for fieldname, value in ret.items():
+							if item.meta.get_field(fieldname) and value is not None:
+								if item.get(fieldname) is None or fieldname in force_item_fields:
+									item.set(fieldname, value)
 
-								if item_qty != len(get_serial_nos(item.get("serial_no"))):
+								elif fieldname in ["cost_center", "conversion_factor"] and not item.get(
+									fieldname
+								):
+									item.set(fieldname, value)
+								elif fieldname == "item_tax_rate" and not (
+									self.get("is_return") and self.get("return_against")
+								):
+									item.set(fieldname, value)
+								elif fieldname == "serial_no":
+									# Ensure that serial numbers are matched against Stock UOM
+									item_conversion_factor = item.get("conversion_factor") or 1.0
+									item_qty = abs(item.get("qty")) * item_conversion_factor
+
+									if item_qty != len(get_serial_nos(item.get("serial_no"))):
+										item.set(fieldname, value)
+
+								elif (
+									ret.get("pricing_rule_removed")
+									and value is not None
+									and fieldname
+									in [
+										"discount_percentage",
+										"discount_amount",
+										"rate",
+										"margin_rate_or_amount",
+										"margin_type",
+										"remove_free_item",
+									]
+								):
+									# reset pricing rule fields if pricing_rule_removed
 									item.set(fieldname, value)
 
-							elif (
-								ret.get("pricing_rule_removed")
-								and value is not None
-								and fieldname
-								in [
-									"discount_percentage",
-									"discount_amount",
-									"rate",
-									"margin_rate_or_amount",
-									"margin_type",
-									"remove_free_item",
-								]
-							):
-								# reset pricing rule fields if pricing_rule_removed
-								item.set(fieldname, value)
+								elif fieldname == "expense_account" and not item.get("expense_account"):
+									item.expense_account = value
 
-							elif fieldname == "expense_account" and not item.get("expense_account"):
-								item.expense_account = value
+						if self.doctype in ["Purchase Invoice", "Sales Invoice"] and item.meta.get_field(
+							"is_fixed_asset"
+						):
+							item.set("is_fixed_asset", ret.get("is_fixed_asset", 0))
 
-					if self.doctype in ["Purchase Invoice", "Sales Invoice"] and item.meta.get_field(
-						"is_fixed_asset"
-					):
-						item.set("is_fixed_asset", ret.get("is_fixed_asset", 0))
-
-					# Double check for cost center
-					# Items add via promotional scheme may not have cost center set
-					if hasattr(item, "cost_center") and not item.get("cost_center"):
-						item.set(
-							"cost_center",
-							self.get("cost_center") or erpnext.get_default_cost_center(self.company),
-						)
+						# Double check for cost center
+						# Items add via promotional scheme may not have cost center set
+						if hasattr(item, "cost_center") and not item.get("cost_center"):
+							item.set(
+								"cost_center",
+								self.get("cost_center") or erpnext.get_default_cost_center(self.company),
+							)
 
-					if ret.get("pricing_rules"):
-						self.apply_pricing_rule_on_items(item, ret)
-						self.set_pricing_rule_details(item, ret)
-				else:
-					# Transactions line item without item code
-
-					uom = item.get("uom")
-					stock_uom = item.get("stock_uom")
-					if bool(uom) != bool(stock_uom):  # xor
-						item.stock_uom = item.uom = uom or stock_uom
-
-					# UOM cannot be zero so substitute as 1
-					item.conversion_factor = (
-						get_uom_conv_factor(item.get("uom"), item.get("stock_uom"))
-						or item.get("conversion_factor")
-						or 1
-					)
+						if ret.get("pricing_rules"):
+							self.apply_pricing_rule_on_items(item, ret)
+							self.set_pricing_rule_details(item, ret)
+					else:
+						# Transactions line item without item code
+
+						uom = item.get("uom")
+						stock_uom = item.get("stock_uom")
+						if bool(uom) != bool(stock_uom):  # xor
+							item.stock_uom = item.uom = uom or stock_uom
+
+						# UOM cannot be zero so substitute as 1
+						item.conversion_factor = (
+							get_uom_conv_factor(item.get("uom"), item.get("stock_uom"))
+							or item.get("conversion_factor")
+							or 1
+						)
 
 			if self.doctype == "Purchase Invoice":
 				self.set_expense_account(for_validate)
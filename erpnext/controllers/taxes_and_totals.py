@@ -29,6 +29,9 @@ class calculate_taxes_and_totals:
 		frappe.flags.round_row_wise_tax = frappe.db.get_single_value(
 			"Accounts Settings", "round_row_wise_tax"
 		)
+		self.calculate_in_bulk = cint(
+			frappe.db.get_single_value("Accounts Settings", "calculate_taxes_in_bulk")
+		)
 
 		self._items = self.filter_rows() if self.doc.doctype == "Quotation" else self.doc.get("items")
 
@@ -259,6 +262,9 @@ class calculate_taxes_and_totals:
 		if not any(cint(tax.included_in_print_rate) for tax in self.doc.get("taxes")):
 			return
 
+		if self.can_calculate_taxes_in_bulk():
+			return self.determine_exclusive_rate_in_bulk()
+
 		for item in self._items:
 			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
 			cumulated_tax_fraction = 0
@@ -295,6 +301,93 @@ class calculate_taxes_and_totals:
 
 				self._set_in_company_currency(item, ["net_rate", "net_amount"])
 
+	def determine_exclusive_rate_in_bulk(self):
+		"""Same as `determine_exclusive_rate`, with the tax fractions computed once per item tax map"""
+		taxes = self.doc.get("taxes")
+		item_map_indexes, item_tax_maps = self.get_item_tax_maps()
+
+		tax_fractions = []
+		for item_tax_map in item_tax_maps:
+			cumulated_tax_fraction = 0
+			inclusive_tax_amounts_per_qty = []
+			for i, tax in enumerate(taxes):
+				(
+					tax.tax_fraction_for_current_item,
+					inclusive_tax_amount_per_qty,
+				) = self.get_current_tax_fraction(tax, item_tax_map)
+
+				if i == 0:
+					tax.grand_total_fraction_for_current_item = 1 + tax.tax_fraction_for_current_item
+				else:
+					tax.grand_total_fraction_for_current_item = (
+						taxes[i - 1].grand_total_fraction_for_current_item + tax.tax_fraction_for_current_item
+					)
+
+				cumulated_tax_fraction += tax.tax_fraction_for_current_item
+				inclusive_tax_amounts_per_qty.append(inclusive_tax_amount_per_qty)
+
+			tax_fractions.append(
+				(
+					cumulated_tax_fraction,
+					inclusive_tax_amounts_per_qty,
+					[
+						(tax.tax_fraction_for_current_item, tax.grand_total_fraction_for_current_item)
+						for tax in taxes
+					],
+				)
+			)
+
+		for item, map_index in zip(self._items, item_map_indexes, strict=True):
+			cumulated_tax_fraction, inclusive_tax_amounts_per_qty, _fractions = tax_fractions[map_index]
+			total_inclusive_tax_amount_per_qty = 0
+			for inclusive_tax_amount_per_qty in inclusive_tax_amounts_per_qty:
+				total_inclusive_tax_amount_per_qty += inclusive_tax_amount_per_qty * flt(item.qty)
+
+			if (
+				not self.discount_amount_applied
+				and item.qty
+				and (cumulated_tax_fraction or total_inclusive_tax_amount_per_qty)
+			):
+				amount = flt(item.amount) - total_inclusive_tax_amount_per_qty
+
+				item.net_amount = flt(amount / (1 + cumulated_tax_fraction), item.precision("net_amount"))
+				item.net_rate = flt(item.net_amount / item.qty, item.precision("net_rate"))
+				item.discount_percentage = flt(
+					item.discount_percentage, item.precision("discount_percentage")
+				)
+
+				self._set_in_company_currency(item, ["net_rate", "net_amount"])
+
+		# leave the fractions of the last item on the taxes, as computed row by row
+		for tax, fractions in zip(taxes, tax_fractions[item_map_indexes[-1]][2], strict=True):
+			tax.tax_fraction_for_current_item, tax.grand_total_fraction_for_current_item = fractions
+
+	def can_calculate_taxes_in_bulk(self):
+		"""Taxes can be computed per tax row for all the items when enabled in Accounts Settings,
+		if every tax row refers to a row before it and the Actual taxes have distinct row numbers"""
+		if not self.calculate_in_bulk:
+			return False
+
+		taxes = self.doc.get("taxes")
+		actual_tax_rows = [tax.idx for tax in taxes if tax.charge_type == "Actual"]
+		if len(actual_tax_rows) != len(set(actual_tax_rows)):
+			return False
+
+		return all(
+			0 <= cint(tax.row_id) - 1 < i
+			for i, tax in enumerate(taxes)
+			if tax.charge_type in ("On Previous Row Amount", "On Previous Row Total")
+		)
+
+	def get_item_tax_maps(self):
+		"""Returns the index of the item tax map of every item and the distinct item tax maps,
+		each `item_tax_rate` is parsed only once"""
+		item_tax_rates = {}
+		item_map_indexes = [
+			item_tax_rates.setdefault(item.item_tax_rate or "", len(item_tax_rates)) for item in self._items
+		]
+		return item_map_indexes, [self._load_item_tax_rate(d) for d in item_tax_rates]
+
 	def _load_item_tax_rate(self, item_tax_rate):
 		return json.loads(item_tax_rate) if item_tax_rate else {}
 
@@ -363,6 +456,9 @@ class calculate_taxes_and_totals:
 			self._calculate()
 
 	def calculate_taxes(self):
+		if self.can_calculate_taxes_in_bulk():
+			return self.calculate_taxes_in_bulk()
+
 		rounding_adjustment_computed = self.doc.get("is_consolidated") and self.doc.get("rounding_adjustment")
 		if not rounding_adjustment_computed:
 			self.doc.rounding_adjustment = 0
@@ -418,26 +514,142 @@ class calculate_taxes_and_totals:
 
 				# set precision in the last item iteration
 				if n == len(self._items) - 1:
-					self.round_off_totals(tax)
-					self._set_in_company_currency(tax, ["tax_amount", "tax_amount_after_discount_amount"])
+					self.set_tax_totals(i, tax, rounding_adjustment_computed)
 
-					self.round_off_base_values(tax)
-					self.set_cumulative_total(i, tax)
+	def calculate_taxes_in_bulk(self):
+		"""Same as `calculate_taxes`, with the amounts of a tax row computed for all the items
+		together, as lists in the order of the items"""
+		rounding_adjustment_computed = self.doc.get("is_consolidated") and self.doc.get("rounding_adjustment")
+		if not rounding_adjustment_computed:
+			self.doc.rounding_adjustment = 0
 
-					self._set_in_company_currency(tax, ["total"])
+		taxes = self.doc.get("taxes")
+		items = self._items
+		net_amounts = [item.net_amount for item in items]
+		apply_tds = items[0].meta.get_field("apply_tds")
+		update_tax_amount = not (self.discount_amount_applied and self.doc.apply_discount_on == "Grand Total")
+		is_purchase = self.doc.doctype in [
+			"Purchase Order",
+			"Purchase Invoice",
+			"Purchase Receipt",
+			"Supplier Quotation",
+		]
+
+		item_map_indexes, item_tax_maps = self.get_item_tax_maps()
+		tax_amounts, grand_totals = [], []
+
+		for i, tax in enumerate(taxes):
+			map_rates = [self._get_tax_rate(tax, item_tax_map) for item_tax_map in item_tax_maps]
+			tax_rates = [map_rates[map_index] for map_index in item_map_indexes]
+			precision = tax.precision("tax_amount")
+
+			if tax.charge_type == "Actual":
+				# distribute the tax amount proportionally to each item row
+				actual = flt(tax.tax_amount, precision)
+
+				if tax.get("is_tax_withholding_account") and apply_tds:
+					tax_withholding_net_total = self.doc.tax_withholding_net_total
+					amounts = [
+						item.net_amount * actual / tax_withholding_net_total
+						if item.get("apply_tds") and tax_withholding_net_total
+						else 0.0
+						for item in items
+					]
+				else:
+					net_total = self.doc.net_total
+					amounts = [
+						net_amount * actual / net_total if net_total else 0.0 for net_amount in net_amounts
+					]
+			elif tax.charge_type == "On Net Total":
+				amounts = [
+					(tax_rate / 100.0) * net_amount
+					for tax_rate, net_amount in zip(tax_rates, net_amounts, strict=True)
+				]
+			elif tax.charge_type == "On Previous Row Amount":
+				amounts = [
+					(tax_rate / 100.0) * amount
+					for tax_rate, amount in zip(tax_rates, tax_amounts[cint(tax.row_id) - 1], strict=True)
+				]
+			elif tax.charge_type == "On Previous Row Total":
+				amounts = [
+					(tax_rate / 100.0) * grand_total
+					for tax_rate, grand_total in zip(
+						tax_rates, grand_totals[cint(tax.row_id) - 1], strict=True
+					)
+				]
+			elif tax.charge_type == "On Item Quantity":
+				amounts = [tax_rate * item.qty for tax_rate, item in zip(tax_rates, items, strict=True)]
+			else:
+				amounts = [0.0] * len(items)
 
-					# adjust Discount Amount loss in last tax iteration
-					if (
-						i == (len(self.doc.get("taxes")) - 1)
-						and self.discount_amount_applied
-						and self.doc.discount_amount
-						and self.doc.apply_discount_on == "Grand Total"
-						and not rounding_adjustment_computed
-					):
-						self.doc.rounding_adjustment = flt(
-							self.doc.grand_total - flt(self.doc.discount_amount) - tax.total,
-							self.doc.precision("rounding_adjustment"),
-						)
+			if not (self.doc.get("is_consolidated") or tax.get("dont_recompute_tax")):
+				self.set_item_wise_tax_in_bulk(tax, tax_rates, amounts)
+
+			if frappe.flags.round_row_wise_tax:
+				amounts = [flt(amount, precision) for amount in amounts]
+
+			# Adjust divisional loss to the last item
+			if tax.charge_type == "Actual":
+				divisional_loss = actual
+				for amount in amounts:
+					divisional_loss -= amount
+				amounts[-1] += divisional_loss
+
+			# amounts are added up one by one, in the same order as row by row
+			if tax.charge_type != "Actual" and update_tax_amount:
+				tax_amount = tax.tax_amount
+				for amount in amounts:
+					tax_amount += amount
+				tax.tax_amount = tax_amount
+
+			tax_amount_after_discount_amount = tax.tax_amount_after_discount_amount
+			for amount in amounts:
+				tax_amount_after_discount_amount += amount
+			tax.tax_amount_after_discount_amount = tax_amount_after_discount_amount
+
+			# see get_tax_amount_if_for_valuation_or_deduction
+			amounts_in_total = amounts
+			if getattr(tax, "category", None):
+				if tax.category == "Valuation":
+					amounts_in_total = [0.0] * len(amounts)
+				if is_purchase and tax.add_deduct_tax == "Deduct":
+					amounts_in_total = [-1.0 * amount for amount in amounts_in_total]
+
+			previous_totals = net_amounts if i == 0 else grand_totals[i - 1]
+			tax_amounts.append(amounts)
+			grand_totals.append(
+				[
+					flt(previous_total + amount)
+					for previous_total, amount in zip(previous_totals, amounts_in_total, strict=True)
+				]
+			)
+
+			tax.tax_amount_for_current_item = tax_amounts[i][-1]
+			tax.grand_total_for_current_item = grand_totals[i][-1]
+
+			self.set_tax_totals(i, tax, rounding_adjustment_computed)
+
+	def set_tax_totals(self, row_idx, tax, rounding_adjustment_computed):
+		self.round_off_totals(tax)
+		self._set_in_company_currency(tax, ["tax_amount", "tax_amount_after_discount_amount"])
+
+		self.round_off_base_values(tax)
+		self.set_cumulative_total(row_idx, tax)
+
+		self._set_in_company_currency(tax, ["total"])
+
+		# adjust Discount Amount loss in last tax iteration
+		if (
+			row_idx == (len(self.doc.get("taxes")) - 1)
+			and self.discount_amount_applied
+			and self.doc.discount_amount
+			and self.doc.apply_discount_on == "Grand Total"
+			and not rounding_adjustment_computed
+		):
+			self.doc.rounding_adjustment = flt(
+				self.doc.grand_total - flt(self.doc.discount_amount) - tax.total,
+				self.doc.precision("rounding_adjustment"),
+			)
 
 	def get_tax_amount_if_for_valuation_or_deduction(self, tax_amount, tax):
 		# if just for valuation, do not add the tax amount in total
@@ -516,6 +728,26 @@ class calculate_taxes_and_totals:
 
 			tax.item_wise_tax_detail[key] = [tax_rate, flt(item_wise_tax_amount)]
 
+	def set_item_wise_tax_in_bulk(self, tax, tax_rates, amounts):
+		"""Same as `set_item_wise_tax` for each item, with the precision looked up once"""
+		conversion_rate = self.doc.conversion_rate
+		item_wise_tax_detail = tax.item_wise_tax_detail
+		precision = tax.precision("tax_amount")
+
+		for item, tax_rate, current_tax_amount in zip(self._items, tax_rates, amounts, strict=True):
+			key = item.item_code or item.item_name
+			item_wise_tax_amount = current_tax_amount * conversion_rate
+			if frappe.flags.round_row_wise_tax:
+				item_wise_tax_amount = flt(item_wise_tax_amount, precision)
+				if item_wise_tax_detail.get(key):
+					item_wise_tax_amount += flt(item_wise_tax_detail[key][1], precision)
+				item_wise_tax_detail[key] = [tax_rate, flt(item_wise_tax_amount, precision)]
+			else:
+				if item_wise_tax_detail.get(key):
+					item_wise_tax_amount += item_wise_tax_detail[key][1]
+
+				item_wise_tax_detail[key] = [tax_rate, flt(item_wise_tax_amount)]
+
 	def round_off_totals(self, tax):
 		if tax.account_head in frappe.flags.round_off_applicable_accounts:
 			tax.tax_amount = round(tax.tax_amount, 0)
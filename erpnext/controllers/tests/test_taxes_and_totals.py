@@ -0,0 +1,186 @@
+import json
+import random
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.controllers.taxes_and_totals import calculate_taxes_and_totals
+
+ITEM_CODES = [
+	"_Test Item",
+	"_Test Item 2",
+	"_Test Item Home Desktop 100",
+	"_Test Item Home Desktop 200",
+	"_Test FG Item",
+]
+
+ITEM_TAX_RATES = [
+	"",
+	json.dumps({"_Test Account VAT - _TC": 5}),
+	json.dumps({"_Test Account VAT - _TC": 12.5, "_Test Account Excise Duty - _TC": 0}),
+	json.dumps({"_Test Account Excise Duty - _TC": 7.333}),
+]
+
+CALCULATED_FIELDTYPES = ("Currency", "Float", "Percent", "Int")
+
+
+def make_items(count, seed=1):
+	"""Rows with repeated item codes and a mix of item tax rates, quantities and rates that do not
+	round evenly"""
+	rng = random.Random(seed)
+	return [
+		{
+			"item_code": rng.choice(ITEM_CODES),
+			"qty": rng.choice([1, 3, 7, 0.5, 12.75]),
+			"rate": round(rng.uniform(0.01, 999), 2),
+			"item_tax_rate": rng.choice(ITEM_TAX_RATES),
+		}
+		for _i in range(count)
+	]
+
+
+def make_tax(charge_type, account_head, **args):
+	return {
+		"charge_type": charge_type,
+		"account_head": account_head,
+		"description": account_head,
+		"cost_center": "Main - _TC",
+		**args,
+	}
+
+
+def get_calculated_values(doc):
+	def get_values(d):
+		return {
+			df.fieldname: d.get(df.fieldname)
+			for df in d.meta.fields
+			if df.fieldtype in CALCULATED_FIELDTYPES
+			or df.fieldname in ("item_wise_tax_detail", "other_charges_calculation")
+		}
+
+	return {
+		"doc": get_values(doc),
+		"items": [get_values(d) for d in doc.items],
+		"taxes": [get_values(d) for d in doc.taxes],
+	}
+
+
+class TestTaxesAndTotals(FrappeTestCase):
+	def make_invoice(self, doctype="Sales Invoice", items=200, taxes=None, **args):
+		doc = frappe.get_doc(
+			{
+				"doctype": doctype,
+				"company": "_Test Company",
+				"currency": "INR",
+				"conversion_rate": 1,
+				"party_account_currency": args.get("currency", "INR"),
+				"items": make_items(items),
+				"taxes": taxes or [],
+				**args,
+			}
+		)
+		if doctype == "Sales Invoice":
+			doc.customer = "_Test Customer"
+		else:
+			doc.supplier = "_Test Supplier"
+
+		return doc
+
+	def assertSameAsRowByRow(self, make_doc):
+		"""Compare the values calculated in bulk with the values calculated row by row"""
+		with change_settings("Accounts Settings", {"calculate_taxes_in_bulk": 0}):
+			row_by_row = get_calculated_values(calculate_taxes_and_totals(make_doc()).doc)
+
+		with change_settings("Accounts Settings", {"calculate_taxes_in_bulk": 1}):
+			calculation = calculate_taxes_and_totals(make_doc())
+			self.assertTrue(calculation.can_calculate_taxes_in_bulk())
+			in_bulk = get_calculated_values(calculation.doc)
+
+		self.assertEqual(in_bulk, row_by_row)
+
+	def test_exclusive_taxes(self):
+		taxes = [
+			make_tax("On Net Total", "_Test Account Excise Duty - _TC", rate=12),
+			make_tax("On Previous Row Amount", "_Test Account Education Cess - _TC", rate=2, row_id=1),
+			make_tax("On Previous Row Total", "_Test Account S&H Education Cess - _TC", rate=1.5, row_id=2),
+			make_tax("Actual", "_Test Account Shipping Charges - _TC", tax_amount=100.37),
+			make_tax("On Item Quantity", "_Test Account CST - _TC", rate=0.35),
+			make_tax("On Net Total", "_Test Account VAT - _TC", rate=18),
+		]
+		self.assertSameAsRowByRow(lambda: self.make_invoice(taxes=taxes))
+
+	def test_inclusive_taxes(self):
+		taxes = [
+			make_tax("On Net Total", "_Test Account Excise Duty - _TC", rate=12, included_in_print_rate=1),
+			make_tax(
+				"On Previous Row Amount",
+				"_Test Account Education Cess - _TC",
+				rate=2,
+				row_id=1,
+				included_in_print_rate=1,
+			),
+			make_tax(
+				"On Previous Row Total",
+				"_Test Account S&H Education Cess - _TC",
+				rate=1.5,
+				row_id=2,
+				included_in_print_rate=1,
+			),
+			make_tax("On Net Total", "_Test Account VAT - _TC", rate=18, included_in_print_rate=1),
+			make_tax("Actual", "_Test Account Shipping Charges - _TC", tax_amount=57.5),
+		]
+		self.assertSameAsRowByRow(lambda: self.make_invoice(taxes=taxes))
+
+	def test_discount_amount(self):
+		taxes = [
+			make_tax("On Net Total", "_Test Account VAT - _TC", rate=18),
+			make_tax("Actual", "_Test Account Shipping Charges - _TC", tax_amount=100.37),
+			make_tax("On Previous Row Total", "_Test Account CST - _TC", rate=2, row_id=2),
+		]
+		for apply_discount_on in ("Grand Total", "Net Total"):
+			self.assertSameAsRowByRow(
+				lambda apply_discount_on=apply_discount_on: self.make_invoice(
+					taxes=taxes, apply_discount_on=apply_discount_on, discount_amount=357.21
+				)
+			)
+
+	@change_settings("Accounts Settings", {"round_row_wise_tax": 1})
+	def test_row_wise_rounding_in_foreign_currency(self):
+		taxes = [
+			make_tax("On Net Total", "_Test Account Excise Duty - _TC", rate=12.345),
+			make_tax("On Previous Row Amount", "_Test Account Education Cess - _TC", rate=3, row_id=1),
+			make_tax("Actual", "_Test Account Shipping Charges - _TC", tax_amount=10.01),
+		]
+		self.assertSameAsRowByRow(
+			lambda: self.make_invoice(taxes=taxes, currency="USD", conversion_rate=83.2713)
+		)
+
+	def test_purchase_taxes(self):
+		taxes = [
+			make_tax(
+				"Actual",
+				"_Test Account Shipping Charges - _TC",
+				tax_amount=100,
+				category="Valuation and Total",
+				add_deduct_tax="Add",
+			),
+			make_tax(
+				"Actual",
+				"_Test Account Customs Duty - _TC",
+				tax_amount=150,
+				category="Valuation",
+				add_deduct_tax="Add",
+			),
+			make_tax(
+				"On Net Total", "_Test Account VAT - _TC", rate=12.5, category="Total", add_deduct_tax="Add"
+			),
+			make_tax(
+				"On Previous Row Total",
+				"_Test Account Discount - _TC",
+				rate=10,
+				row_id=3,
+				category="Total",
+				add_deduct_tax="Deduct",
+			),
+		]
+		self.assertSameAsRowByRow(lambda: self.make_invoice("Purchase Invoice", taxes=taxes))
@@ -320,6 +320,11 @@ doc_events = {
 	tuple(period_closing_doctypes): {
 		"validate": "erpnext.accounts.doctype.accounting_period.accounting_period.validate_accounting_period_on_doc_save",
 	},
+	"Item": {
+		"on_update": "erpnext.accounts.doctype.pos_search_index.pos_search_index.update_item_search_index",
+		"on_trash": "erpnext.accounts.doctype.pos_search_index.pos_search_index.delete_item_search_index",
+		"after_rename": "erpnext.accounts.doctype.pos_search_index.pos_search_index.rename_item_search_index",
+	},
 	"Stock Entry": {
 		"on_submit": "erpnext.stock.doctype.material_request.material_request.update_completed_and_requested_qty",
 		"on_cancel": "erpnext.stock.doctype.material_request.material_request.update_completed_and_requested_qty",
@@ -456,6 +461,7 @@ scheduler_events = {
 		"erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool.auto_update_latest_price_in_all_boms",
 		"erpnext.crm.utils.open_leads_opportunities_based_on_todays_event",
 		"erpnext.assets.doctype.asset.depreciation.post_depreciation_entries",
+		"erpnext.accounts.doctype.payment_ledger_snapshot.payment_ledger_snapshot.make_daily_payment_ledger_snapshots",
 	],
 	"monthly_long": [
 		"erpnext.accounts.deferred_revenue.process_deferred_accounting",
@@ -549,6 +555,7 @@ accounting_dimension_doctypes = [
 	"Payment Request",
 	"Asset Movement Item",
 	"Asset Depreciation Schedule",
+	"Account Balance Rollup",
 ]
 
 get_matching_queries = (
@@ -475,6 +475,51 @@ erpnext.TransactionController = class TransactionController extends erpnext.taxe
 		}
 	}
 
+	fetch_item_details(opts) {
+		// rows set in the same go, e.g. pasted into the grid, are fetched with a single call
+		return new Promise((resolve) => {
+			if (!this.item_details_queue) {
+				this.item_details_queue = [];
+				setTimeout(() => this.flush_item_details_queue(), 0);
+			}
+			this.item_details_queue.push({ opts, resolve });
+		});
+	}
+
+	flush_item_details_queue() {
+		let queue = this.item_details_queue;
+		this.item_details_queue = null;
+
+		return frappe.call({
+			method: "erpnext.stock.get_item_details.get_items_details",
+			args: {
+				doc: this.frm.doc,
+				args_list: queue.map((d) => d.opts.args.args),
+			},
+			callback: (r) => {
+				let std_fields = ["doctype"]
+					.concat(frappe.model.std_fields_list)
+					.concat(frappe.model.child_table_field_list);
+
+				queue.forEach((d, i) => {
+					let message = r.message[i];
+					let child = locals[d.opts.child.doctype][d.opts.child.name];
+					// the row may have been removed in the meantime
+					if (child) {
+						for (let key in message) {
+							if (!std_fields.includes(key)) child[key] = message[key];
+						}
+						this.frm.refresh_field(child.parentfield);
+						d.opts.callback({ message: message });
+					}
+
+					d.resolve({ message: message });
+				});
+			},
+			error: (r) => queue.forEach((d) => d.resolve(r)),
+		});
+	}
+
 	setup_sms() {
 		var me = this;
 		let blacklist = ['Purchase Invoice', 'BOM'];
@@ -518,8 +563,7 @@ erpnext.TransactionController = class TransactionController extends erpnext.taxe
 				this.frm.fields_dict["items"].grid.grid_rows[item.idx - 1].remove();
 			} else {
 				item.pricing_rules = ''
-				return this.frm.call({
-					method: "erpnext.stock.get_item_details.get_item_details",
+				return this.fetch_item_details({
 					child: item,
 					args: {
 						doc: me.frm.doc,
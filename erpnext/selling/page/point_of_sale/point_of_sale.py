@@ -2,16 +2,39 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import hashlib
 import json
 
 import frappe
-from frappe.utils import cint
+from frappe.query_builder.functions import Count, Max
+from frappe.utils import cint, cstr, get_datetime, now
 from frappe.utils.nestedset import get_root_of
+from werkzeug.wrappers import Response
 
-from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import (
+	get_items_stock_availability,
+	get_stock_availability,
+)
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes, get_item_groups
+from erpnext.accounts.doctype.pos_search_index.pos_search_index import (
+	can_search_from_index,
+	get_search_index_query,
+)
 from erpnext.stock.utils import scan_barcode
 
+# doctypes whose deletion changes the POS catalogue
+CATALOGUE_DOCTYPES = ["Item", "Item Price", "Product Bundle"]
+
+# fields of the Item deciding whether it is in the POS catalogue
+CATALOGUE_ITEM_FIELDS = [
+	"creation",
+	"item_group",
+	"disabled",
+	"has_variants",
+	"is_sales_item",
+	"is_fixed_asset",
+]
+
 
 def search_by_term(search_term, warehouse, price_list):
 	result = search_for_serial_or_batch_or_barcode_number(search_term) or {}
@@ -108,7 +131,17 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	if not frappe.db.exists("Item Group", item_group):
 		item_group = get_root_of("Item Group")
 
-	condition = get_conditions(search_term)
+	search_join, order_by = "", "item.name asc"
+	# serial and batch numbers are not indexed, they are resolved above by `search_by_term`
+	search_query = get_search_index_query(search_term) if can_search_from_index() else None
+	if search_query:
+		# the best matches of the indexed tokens first
+		search_join = f"INNER JOIN ({search_query}) search ON search.item_code = item.name"
+		condition = "1=1"
+		order_by = "search.score desc, item.name asc"
+	else:
+		condition = get_conditions(search_term)
+
 	condition += get_item_group_condition(pos_profile)
 
 	lft, rgt = frappe.db.get_value("Item Group", item_group, ["lft", "rgt"])
@@ -121,7 +154,7 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 		)
 
 	items_data = frappe.db.sql(
-		"""
+		f"""
 		SELECT
 			item.name AS item_code,
 			item.item_name,
@@ -130,27 +163,19 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			item.image AS item_image,
 			item.is_stock_item
 		FROM
-			`tabItem` item {bin_join_selection}
+			`tabItem` item {search_join} {bin_join_selection}
 		WHERE
 			item.disabled = 0
 			AND item.has_variants = 0
 			AND item.is_sales_item = 1
 			AND item.is_fixed_asset = 0
-			AND item.item_group in (SELECT name FROM `tabItem Group` WHERE lft >= {lft} AND rgt <= {rgt})
+			AND item.item_group in (SELECT name FROM `tabItem Group` WHERE lft >= {cint(lft)} AND rgt <= {cint(rgt)})
 			AND {condition}
 			{bin_join_condition}
 		ORDER BY
-			item.name asc
+			{order_by}
 		LIMIT
-			{page_length} offset {start}""".format(
-			start=cint(start),
-			page_length=cint(page_length),
-			lft=cint(lft),
-			rgt=cint(rgt),
-			condition=condition,
-			bin_join_selection=bin_join_selection,
-			bin_join_condition=bin_join_condition,
-		),
+			{cint(page_length)} offset {cint(start)}""",
 		{"warehouse": warehouse},
 		as_dict=1,
 	)
@@ -159,21 +184,18 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	if not items_data:
 		return result
 
+	item_codes = [item.item_code for item in items_data]
+	item_uoms = get_item_uoms(item_codes)
+	stock_availability = get_items_stock_availability(item_codes, warehouse)
+	item_prices = get_item_prices(item_codes, price_list)
+
 	for item in items_data:
-		uoms = frappe.get_doc("Item", item.item_code).get("uoms", [])
+		uoms = item_uoms.get(item.item_code, [])
 
-		item.actual_qty, _ = get_stock_availability(item.item_code, warehouse)
+		item.actual_qty, _ = stock_availability[item.item_code]
 		item.uom = item.stock_uom
 
-		item_price = frappe.get_all(
-			"Item Price",
-			fields=["price_list_rate", "currency", "uom", "batch_no"],
-			filters={
-				"price_list": price_list,
-				"item_code": item.item_code,
-				"selling": True,
-			},
-		)
+		item_price = item_prices.get(item.item_code, [])
 
 		if not item_price:
 			result.append(item)
@@ -196,6 +218,285 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	return {"items": result}
 
 
+def get_item_uoms(item_codes):
+	item_uoms = {}
+	for d in frappe.get_all(
+		"UOM Conversion Detail",
+		filters={"parent": ("in", item_codes), "parenttype": "Item"},
+		fields=["parent", "uom", "conversion_factor"],
+		order_by="idx",
+	):
+		item_uoms.setdefault(d.parent, []).append(d)
+
+	return item_uoms
+
+
+def get_item_prices(item_codes, price_list):
+	item_prices = {}
+	for d in frappe.get_all(
+		"Item Price",
+		fields=["item_code", "price_list_rate", "currency", "uom", "batch_no"],
+		filters={
+			"price_list": price_list,
+			"item_code": ("in", item_codes),
+			"selling": True,
+		},
+	):
+		item_prices.setdefault(d.item_code, []).append(d)
+
+	return item_prices
+
+
+@frappe.whitelist()
+def get_catalogue_snapshot(pos_profile, price_list=None, since=None):
+	"""Items of the POS Profile with their prices, available qty, UOMs and barcodes, for POS
+	terminals to keep a local copy of the catalogue.
+
+	Pass the `timestamp` of the previous snapshot as `since` to get only the items changed after
+	it, the items of the catalogue at `since` that are no longer in it are listed in `removed`.
+	The response has an ETag of the catalogue's version, a 304 is returned if it is unchanged."""
+	pos_profile = frappe.get_cached_doc("POS Profile", pos_profile)
+	price_list = price_list or pos_profile.selling_price_list
+	since = get_datetime(since) if since else None
+
+	# the warehouse or the item groups of the profile may have changed, send the whole catalogue
+	if since and get_datetime(pos_profile.modified) >= since:
+		since = None
+
+	# taken before reading, changes made while reading are sent again with the next delta
+	timestamp = now()
+	etag = f'"{get_catalogue_version(pos_profile, price_list, since)}"'
+
+	request = getattr(frappe.local, "request", None)
+	if request and request.headers.get("If-None-Match") == etag:
+		return Response(status=304, headers={"ETag": etag})
+
+	changed_items = get_catalogue_changes(pos_profile, price_list, since) if since else None
+	items = get_catalogue_items(pos_profile, changed_items)
+	item_codes = [item.item_code for item in items]
+
+	if item_codes:
+		item_uoms = get_item_uoms(item_codes)
+		stock_availability = get_items_stock_availability(item_codes, pos_profile.warehouse)
+		item_prices = get_item_prices(item_codes, price_list)
+
+		item_barcodes = {}
+		for d in frappe.get_all(
+			"Item Barcode", filters={"parent": ("in", item_codes)}, fields=["parent", "barcode", "uom"]
+		):
+			item_barcodes.setdefault(d.parent, []).append({"barcode": d.barcode, "uom": d.uom})
+
+		for item in items:
+			item.actual_qty = stock_availability[item.item_code][0]
+			item.uoms = [
+				{"uom": d.uom, "conversion_factor": d.conversion_factor}
+				for d in item_uoms.get(item.item_code, [])
+			]
+			item.prices = [
+				{k: d[k] for k in ("uom", "batch_no", "currency", "price_list_rate")}
+				for d in item_prices.get(item.item_code, [])
+			]
+			item.barcodes = item_barcodes.get(item.item_code, [])
+
+	snapshot = {
+		"timestamp": timestamp,
+		"is_delta": bool(since),
+		"price_list": price_list,
+		"items": items,
+		"removed": sorted(get_catalogue_items_at(pos_profile, set(changed_items) - set(item_codes), since))
+		if since
+		else [],
+	}
+
+	return Response(
+		frappe.as_json({"message": snapshot}, indent=None),
+		mimetype="application/json",
+		headers={"ETag": etag},
+	)
+
+
+def get_catalogue_items(pos_profile, item_codes=None):
+	"""Items sold from the POS Profile, of `item_codes` if given"""
+	if item_codes is not None and not item_codes:
+		return []
+
+	condition = get_item_group_condition(pos_profile.name)
+	if item_codes is not None:
+		condition += " and item.name in %(item_codes)s"
+
+	return frappe.db.sql(
+		f"""
+		SELECT
+			item.name AS item_code,
+			item.item_name,
+			item.item_group,
+			item.description,
+			item.stock_uom,
+			item.image AS item_image,
+			item.is_stock_item
+		FROM
+			`tabItem` item
+		WHERE
+			item.disabled = 0
+			AND item.has_variants = 0
+			AND item.is_sales_item = 1
+			AND item.is_fixed_asset = 0
+			{condition}
+		ORDER BY
+			item.name asc""",
+		{"item_codes": tuple(item_codes or [])},
+		as_dict=1,
+	)
+
+
+def get_catalogue_changes(pos_profile, price_list, since):
+	"""Item codes of the items, prices and stock changed since `since`"""
+	changed = set(frappe.get_all("Item", filters={"modified": (">=", since)}, pluck="name"))
+	changed.update(
+		frappe.get_all(
+			"Item Price",
+			filters={"price_list": price_list, "modified": (">=", since)},
+			pluck="item_code",
+		)
+	)
+	changed.update(
+		frappe.get_all(
+			"Bin",
+			filters={"warehouse": pos_profile.warehouse, "modified": (">=", since)},
+			pluck="item_code",
+		)
+	)
+	# qty reserved by POS Invoices submitted or cancelled since
+	changed.update(
+		frappe.get_all(
+			"POS Invoice Item",
+			filters={"warehouse": pos_profile.warehouse, "modified": (">=", since)},
+			pluck="item_code",
+		)
+	)
+
+	# a Product Bundle is named after its item
+	changed.update(frappe.get_all("Product Bundle", filters={"modified": (">=", since)}, pluck="name"))
+
+	for d in frappe.get_all(
+		"Deleted Document",
+		filters={"deleted_doctype": ("in", CATALOGUE_DOCTYPES), "creation": (">=", since)},
+		fields=["deleted_doctype", "deleted_name", "data"],
+	):
+		if d.deleted_doctype == "Item Price":
+			changed.add(json.loads(d.data).get("item_code"))
+		else:
+			changed.add(d.deleted_name)
+
+	changed.discard(None)
+
+	# the available qty of a Product Bundle is that of its components
+	if changed:
+		changed.update(
+			frappe.get_all(
+				"Product Bundle Item",
+				filters={"parenttype": "Product Bundle", "item_code": ("in", list(changed))},
+				pluck="parent",
+				distinct=True,
+			)
+		)
+
+	return list(changed)
+
+
+def get_catalogue_items_at(pos_profile, item_codes, since):
+	"""Of `item_codes`, the items that were in the catalogue of the POS Profile at `since`.
+
+	The fields of the items are rolled back to their values at `since` from their Versions."""
+	if not item_codes:
+		return set()
+
+	items = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item", filters={"name": ("in", list(item_codes))}, fields=["name", *CATALOGUE_ITEM_FIELDS]
+		)
+	}
+	for d in frappe.get_all(
+		"Deleted Document",
+		filters={
+			"deleted_doctype": "Item",
+			"deleted_name": ("in", list(item_codes)),
+			"creation": (">=", since),
+		},
+		fields=["deleted_name", "data"],
+	):
+		data = json.loads(d.data)
+		items[d.deleted_name] = frappe._dict(
+			{fieldname: data.get(fieldname) for fieldname in CATALOGUE_ITEM_FIELDS}
+		)
+
+	for version in frappe.get_all(
+		"Version",
+		filters={"ref_doctype": "Item", "docname": ("in", list(items)), "creation": (">=", since)},
+		fields=["docname", "data"],
+		order_by="creation desc",
+	):
+		item = items[version.docname]
+		for fieldname, old_value, _new_value in json.loads(version.data).get("changed", []):
+			if fieldname in CATALOGUE_ITEM_FIELDS:
+				item[fieldname] = old_value
+
+	item_groups = {
+		d.name for row in pos_profile.item_groups for d in get_child_nodes("Item Group", row.item_group)
+	}
+
+	return {
+		name
+		for name, item in items.items()
+		if get_datetime(item.creation) < since
+		and not cint(item.disabled)
+		and not cint(item.has_variants)
+		and cint(item.is_sales_item)
+		and not cint(item.is_fixed_asset)
+		and (not item_groups or item.item_group in item_groups)
+	}
+
+
+def get_catalogue_version(pos_profile, price_list, since=None):
+	"""Hash of the latest changes to the catalogue of the POS Profile"""
+	item = frappe.qb.DocType("Item")
+	item_price = frappe.qb.DocType("Item Price")
+	bin = frappe.qb.DocType("Bin")
+	pos_invoice_item = frappe.qb.DocType("POS Invoice Item")
+	product_bundle = frappe.qb.DocType("Product Bundle")
+	deleted_document = frappe.qb.DocType("Deleted Document")
+
+	versions = [
+		pos_profile.name,
+		price_list,
+		since,
+		pos_profile.modified,
+		*frappe.qb.from_(item).select(Max(item.modified)).run()[0],
+		*(
+			frappe.qb.from_(item_price)
+			.select(Max(item_price.modified), Count(item_price.name))
+			.where(item_price.price_list == price_list)
+		).run()[0],
+		*(frappe.qb.from_(bin).select(Max(bin.modified)).where(bin.warehouse == pos_profile.warehouse)).run()[
+			0
+		],
+		*(
+			frappe.qb.from_(pos_invoice_item)
+			.select(Max(pos_invoice_item.modified))
+			.where(pos_invoice_item.warehouse == pos_profile.warehouse)
+		).run()[0],
+		*frappe.qb.from_(product_bundle).select(Max(product_bundle.modified)).run()[0],
+		*(
+			frappe.qb.from_(deleted_document)
+			.select(Max(deleted_document.creation))
+			.where(deleted_document.deleted_doctype.isin(CATALOGUE_DOCTYPES))
+		).run()[0],
+	]
+
+	return hashlib.sha1("\x1f".join(cstr(d) for d in versions).encode()).hexdigest()
+
+
 @frappe.whitelist()
 def search_for_serial_or_batch_or_barcode_number(search_value: str) -> dict[str, str | None]:
 	return scan_barcode(search_value)
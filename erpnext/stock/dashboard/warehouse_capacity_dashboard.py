@@ -2,7 +2,7 @@ import frappe
 from frappe.model.db_query import DatabaseQuery
 from frappe.utils import flt, nowdate
 
-from erpnext.stock.utils import get_stock_balance
+from erpnext.stock.utils import get_stock_balances
 
 
 @frappe.whitelist()
@@ -71,8 +71,9 @@ def get_warehouse_capacity_data(filters, start):
 		limit_page_length="11",
 	)
 
+	balances = get_stock_balances([(entry.item_code, entry.warehouse) for entry in capacity_data], nowdate())
 	for entry in capacity_data:
-		balance_qty = get_stock_balance(entry.item_code, entry.warehouse, nowdate()) or 0
+		balance_qty = balances[(entry.item_code, entry.warehouse)] or 0
 		entry.update(
 			{
 				"actual_qty": balance_qty,
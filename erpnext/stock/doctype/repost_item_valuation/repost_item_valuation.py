@@ -1,6 +1,9 @@
 # Copyright (c) 2020, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import cProfile
+import marshal
+
 import frappe
 from frappe import _
 from frappe.desk.form.load import get_attachments
@@ -8,21 +11,32 @@ from frappe.exceptions import QueryDeadlockError, QueryTimeoutError
 from frappe.model.document import Document
 from frappe.query_builder import DocType, Interval
 from frappe.query_builder.functions import Max, Now
-from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, now_datetime, nowtime
+from frappe.utils.background_jobs import is_job_enqueued
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
 import erpnext
 from erpnext.accounts.general_ledger import validate_accounting_period
-from erpnext.accounts.utils import get_future_stock_vouchers, repost_gle_for_stock_vouchers
+from erpnext.accounts.utils import (
+	get_future_stock_vouchers,
+	repost_gle_for_stock_vouchers,
+	sort_stock_vouchers_by_posting_date,
+)
+from erpnext.stock.reposting_timer import start_reposting_timer, stop_reposting_timer
 from erpnext.stock.stock_ledger import (
+	create_json_gz_file,
 	get_affected_transactions,
 	get_items_to_be_repost,
+	get_reposting_data,
+	get_reposting_file_name,
 	repost_future_sle,
 )
 
 RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError)
 
+PARALLEL_REPOSTING_JOBS_KEY = "parallel_reposting_jobs"
+
 
 class RepostItemValuation(Document):
 	# begin: auto-generated types
@@ -48,6 +62,7 @@ class RepostItemValuation(Document):
 		posting_date: DF.Date
 		posting_time: DF.Time | None
 		reposting_data_file: DF.Attach | None
+		reposting_timings: DF.Code | None
 		status: DF.Literal["Queued", "In Progress", "Completed", "Skipped", "Failed"]
 		total_reposting_count: DF.Int
 		via_landed_cost_voucher: DF.Check
@@ -250,7 +265,13 @@ def on_doctype_update():
 	frappe.db.add_index("Repost Item Valuation", ["warehouse", "item_code"], "item_warehouse")
 
 
-def repost(doc):
+def repost(doc, component_index=None):
+	"""Repost the stock and GL entries of `doc`.
+
+	With parallel reposting, the independent components of the item-warehouses of a new repost are
+	reposted in separate jobs, each of which calls this with its `component_index`. The job
+	finishing the last component reposts the GL entries."""
+	profiler = None
 	try:
 		frappe.flags.through_repost_item_valuation = True
 		if not frappe.db.exists("Repost Item Valuation", doc.name):
@@ -263,7 +284,22 @@ def repost(doc):
 		if not frappe.flags.in_test:
 			frappe.db.commit()
 
-		repost_sl_entries(doc)
+		start_reposting_timer(doc.reposting_timings)
+		if frappe.db.get_single_value("Stock Reposting Settings", "profile_reposting"):
+			profiler = cProfile.Profile()
+			profiler.enable()
+
+		if component_index is not None:
+			if not repost_component(doc, component_index):
+				# other components are still being reposted
+				return
+		elif (pending_components := get_pending_components(doc)) is not None:
+			if pending_components:
+				enqueue_component_reposts(doc, pending_components)
+				return
+		else:
+			repost_sl_entries(doc)
+
 		repost_gl_entries(doc)
 
 		doc.set_status("Completed")
@@ -309,13 +345,42 @@ def repost(doc):
 			notify_error_to_stock_managers(doc, message)
 			doc.set_status("Failed")
 	finally:
+		save_reposting_timings(doc, profiler)
 		if not frappe.flags.in_test:
 			frappe.db.commit()
 
 
+def save_reposting_timings(doc, profiler=None):
+	if timer := stop_reposting_timer():
+		doc.db_set("reposting_timings", timer.as_json(), update_modified=False)
+
+	if profiler:
+		profiler.disable()
+		profiler.create_stats()
+
+		# same format as `cProfile.Profile.dump_stats`, can be loaded with `pstats.Stats`
+		timestamp = now_datetime().strftime("%Y%m%d%H%M%S")
+		frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": f"{frappe.scrub(doc.doctype)}-{frappe.scrub(doc.name)}-{timestamp}.prof",
+				"attached_to_doctype": doc.doctype,
+				"attached_to_name": doc.name,
+				"content": marshal.dumps(profiler.stats),
+				"is_private": 1,
+			}
+		).save(ignore_permissions=True)
+
+
 def remove_attached_file(docname):
 	if file_name := frappe.db.get_value(
-		"File", {"attached_to_name": docname, "attached_to_doctype": "Repost Item Valuation"}, "name"
+		"File",
+		{
+			"attached_to_name": docname,
+			"attached_to_doctype": "Repost Item Valuation",
+			"attached_to_field": "reposting_data_file",
+		},
+		"name",
 	):
 		frappe.delete_doc("File", file_name, ignore_permissions=True, delete_permanently=True)
 
@@ -347,21 +412,142 @@ def repost_sl_entries(doc):
 		)
 
 
+def get_pending_components(doc):
+	"""Indexes of the components of `doc` which are not reposted yet, None if it is not reposted in components.
+
+	A new repost is split into components if parallel reposting is enabled and its item-warehouses
+	form more than one independent component."""
+	reposting_data = frappe._dict()
+	if doc.reposting_data_file:
+		reposting_data = get_reposting_data(doc.reposting_data_file)
+
+	if reposting_data.get("components") is None:
+		if (
+			doc.based_on != "Transaction"
+			or doc.current_index
+			or doc.items_to_be_repost
+			or doc.reposting_data_file
+			or not frappe.db.get_single_value("Stock Reposting Settings", "enable_parallel_reposting")
+		):
+			return
+
+		components = get_independent_item_warehouse_components(
+			get_items_to_be_repost(voucher_type=doc.voucher_type, voucher_no=doc.voucher_no)
+		)
+		if len(components) < 2:
+			return
+
+		reposting_data = frappe._dict(components=components, reposted_components=[], affected_transactions=[])
+		doc.db_set(
+			{
+				"reposting_data_file": create_json_gz_file(reposting_data, doc),
+				"total_reposting_count": len(components),
+			}
+		)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	return [
+		idx for idx in range(len(reposting_data.components)) if idx not in reposting_data.reposted_components
+	]
+
+
+def enqueue_component_reposts(doc, component_indexes):
+	job_ids = []
+	for idx in component_indexes:
+		job_id = f"repost_item_valuation::{doc.name}::{idx}"
+		if is_job_enqueued(job_id):
+			continue
+
+		job_ids.append(job_id)
+		frappe.enqueue(
+			repost_item_warehouse_component,
+			queue="long",
+			timeout=3600 * 6,
+			job_id=job_id,
+			riv_name=doc.name,
+			component_index=idx,
+			now=frappe.flags.in_test,
+		)
+
+	# the next run waits for the components as well
+	running_job_ids = frappe.cache().get_value(PARALLEL_REPOSTING_JOBS_KEY) or []
+	frappe.cache().set_value(PARALLEL_REPOSTING_JOBS_KEY, running_job_ids + job_ids)
+
+
+def repost_item_warehouse_component(riv_name, component_index):
+	doc = frappe.get_doc("Repost Item Valuation", riv_name)
+	if doc.status in ("Queued", "In Progress"):
+		repost(doc, component_index)
+
+
+def repost_component(doc, component_index):
+	"""Repost the stock entries of a component of `doc`, returns whether all its components are reposted."""
+	reposting_data = get_reposting_data(doc.reposting_data_file)
+	affected_transactions = repost_future_sle(
+		args=[frappe._dict(row) for row in reposting_data.components[component_index]],
+		allow_negative_stock=doc.allow_negative_stock,
+		via_landed_cost_voucher=doc.via_landed_cost_voucher,
+	)
+
+	# components finishing at the same time are recorded one after another
+	frappe.db.get_value(doc.doctype, doc.name, "name", for_update=True)
+	reposting_data = get_reposting_data(doc.reposting_data_file)
+
+	reposting_data.reposted_components = sorted({*reposting_data.reposted_components, component_index})
+	reposting_data.affected_transactions = sorted(
+		{tuple(transaction) for transaction in reposting_data.affected_transactions} | affected_transactions
+	)
+	create_json_gz_file(reposting_data, doc, get_reposting_file_name(doc.doctype, doc.name))
+	doc.db_set("current_index", len(reposting_data.reposted_components))
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	return len(reposting_data.reposted_components) == len(reposting_data.components)
+
+
 def repost_gl_entries(doc):
 	if not cint(erpnext.is_perpetual_inventory_enabled(doc.company)):
 		return
 
-	# directly modified transactions
-	directly_dependent_transactions = _get_directly_dependent_vouchers(doc)
-	repost_affected_transaction = get_affected_transactions(doc)
 	repost_gle_for_stock_vouchers(
-		directly_dependent_transactions + list(repost_affected_transaction),
+		get_stock_vouchers_for_gl_reposting(doc),
 		doc.posting_date,
 		doc.company,
 		repost_doc=doc,
+		is_sorted=True,
 	)
 
 
+def get_stock_vouchers_for_gl_reposting(doc):
+	"""Get sorted stock vouchers whose GL Entries are to be reposted.
+
+	The list is saved in the reposting data file on first run, so that `gl_reposting_index`
+	points to the same voucher if the reposting is resumed, even if new transactions are made meanwhile.
+	"""
+	reposting_data = frappe._dict()
+	if doc.reposting_data_file:
+		reposting_data = get_reposting_data(doc.reposting_data_file)
+
+	if reposting_data.get("gl_reposting_vouchers") is not None:
+		return [tuple(voucher) for voucher in reposting_data.gl_reposting_vouchers]
+
+	# directly modified transactions
+	directly_dependent_transactions = _get_directly_dependent_vouchers(doc)
+	repost_affected_transaction = get_affected_transactions(doc, reposting_data=reposting_data)
+	stock_vouchers = sort_stock_vouchers_by_posting_date(
+		directly_dependent_transactions + sorted(repost_affected_transaction)
+	)
+
+	reposting_data["gl_reposting_vouchers"] = stock_vouchers
+	file_name = get_reposting_file_name(doc.doctype, doc.name) if doc.reposting_data_file else None
+	doc.db_set("reposting_data_file", create_json_gz_file(reposting_data, doc, file_name))
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	return stock_vouchers
+
+
 def _get_directly_dependent_vouchers(doc):
 	"""Get stock vouchers that are directly affected by reposting
 	i.e. any one item-warehouse is present in the stock transaction"""
@@ -431,18 +617,243 @@ def repost_entries():
 	if not in_configured_timeslot():
 		return
 
+	repost_settings = frappe.get_cached_doc("Stock Reposting Settings")
+	if repost_settings.enable_parallel_reposting and parallel_reposts_running():
+		return
+
 	riv_entries = get_repost_item_valuation_entries()
 
-	for row in riv_entries:
-		doc = frappe.get_doc("Repost Item Valuation", row.name)
+	if repost_settings.enable_parallel_reposting and len(riv_entries) > 1:
+		enqueue_parallel_reposts(riv_entries, cint(repost_settings.max_parallel_reposting_jobs) or 4)
+		return
+
+	repost_entries_in_group([row.name for row in riv_entries])
+
+
+def repost_entries_in_group(riv_names):
+	"""Repost the given 'Repost Item Valuation' entries one after another."""
+	for name in riv_names:
+		doc = frappe.get_doc("Repost Item Valuation", name)
 		if doc.status in ("Queued", "In Progress"):
 			repost(doc)
 			doc.deduplicate_similar_repost()
 
-	riv_entries = get_repost_item_valuation_entries()
-	if riv_entries:
+
+def enqueue_parallel_reposts(riv_entries, max_jobs):
+	"""Repost independent groups of 'Repost Item Valuation' entries in parallel background jobs."""
+	# groups are formed again only after all the jobs of previous run are finished,
+	# so that the same entry is never reposted by two jobs
+	if parallel_reposts_running():
 		return
 
+	groups = get_independent_reposting_groups(riv_entries, max_jobs)
+	job_ids = [f"repost_item_valuation::{riv_names[0]}" for riv_names in groups]
+
+	# set before enqueuing, the jobs add the jobs reposting the components of an entry
+	frappe.cache().set_value(PARALLEL_REPOSTING_JOBS_KEY, job_ids)
+
+	for job_id, riv_names in zip(job_ids, groups, strict=True):
+		frappe.enqueue(
+			repost_entries_in_group,
+			queue="long",
+			timeout=3600 * 6,
+			job_id=job_id,
+			riv_names=riv_names,
+			now=frappe.flags.in_test,
+		)
+
+
+def parallel_reposts_running():
+	"""Whether any of the jobs enqueued by the last parallel reposting run is still queued or running."""
+	return any(
+		is_job_enqueued(job_id) for job_id in frappe.cache().get_value(PARALLEL_REPOSTING_JOBS_KEY) or []
+	)
+
+
+def get_independent_reposting_groups(riv_entries, max_groups):
+	"""
+	Split reposting entries into groups which can be reposted in parallel.
+
+	Items which are transacted together in any voucher on or after the earliest
+	posting date (transfers, manufacturing, repacks, bundles etc) affect each
+	other's valuation and end up in the same group. Order of entries within a
+	group is the same as the queue order, the result is deterministic for the
+	same queue.
+	"""
+	names = [row.name for row in riv_entries]
+	reposts = frappe.get_all(
+		"Repost Item Valuation",
+		fields=["name", "based_on", "voucher_type", "voucher_no", "item_code", "posting_date"],
+		filters={"name": ("in", names)},
+	)
+	if not reposts:
+		return []
+
+	items_by_repost = get_items_by_repost(reposts)
+	from_date = min(getdate(row.posting_date) for row in reposts)
+
+	parent = {}
+
+	def find(item):
+		parent.setdefault(item, item)
+		while parent[item] != item:
+			parent[item] = parent[parent[item]]
+			item = parent[item]
+		return item
+
+	def union(item, other_item):
+		root, other_root = find(item), find(other_item)
+		if root != other_root:
+			# smaller item code as root, to keep grouping independent of link order
+			root, other_root = sorted([root, other_root])
+			parent[other_root] = root
+
+	for items in items_by_repost.values():
+		for item in items:
+			union(items[0], item)
+
+	# follow the links till no new item is found
+	seen_items = {item for items in items_by_repost.values() for item in items}
+	items_to_check = sorted(seen_items)
+	while items_to_check:
+		new_items = set()
+		for item, linked_item in get_items_transacted_together(items_to_check, from_date):
+			union(item, linked_item)
+			if linked_item not in seen_items:
+				new_items.add(linked_item)
+
+		seen_items.update(new_items)
+		items_to_check = sorted(new_items)
+
+	groups = {}
+	for name in names:
+		items = items_by_repost.get(name)
+		key = find(items[0]) if items else name
+		groups.setdefault(key, []).append(name)
+
+	# merge groups into at most `max_groups` buckets, largest groups first
+	position = {name: idx for idx, name in enumerate(names)}
+	buckets = [[] for _ in range(min(max_groups, len(groups)))]
+	for group in sorted(groups.values(), key=lambda group: (-len(group), position[group[0]])):
+		min(buckets, key=len).extend(group)
+
+	return [sorted(bucket, key=position.get) for bucket in buckets if bucket]
+
+
+def get_independent_item_warehouse_components(items_to_be_repost):
+	"""
+	Split the item-warehouses of a repost into components which can be reposted independently.
+
+	An item-warehouse whose rate is taken from another one in a voucher on or after the earliest
+	posting date (transfers, manufacturing, repacks, subcontracting) is in the same component as
+	it, also through the item-warehouses not reposted directly. Components and the item-warehouses
+	in them keep the order of `items_to_be_repost`.
+	"""
+	if not items_to_be_repost:
+		return []
+
+	from_date = min(getdate(row.posting_date) for row in items_to_be_repost)
+
+	parent = {}
+
+	def find(key):
+		parent.setdefault(key, key)
+		while parent[key] != key:
+			parent[key] = parent[parent[key]]
+			key = parent[key]
+		return key
+
+	def union(key, other_key):
+		root, other_root = find(key), find(other_key)
+		if root != other_root:
+			root, other_root = sorted([root, other_root])
+			parent[other_root] = root
+
+	# follow the links till no new item is found
+	checked_items = set()
+	items_to_check = sorted({row.item_code for row in items_to_be_repost})
+	while items_to_check:
+		checked_items.update(items_to_check)
+		new_items = set()
+		for item, warehouse, linked_item, linked_warehouse in get_linked_item_warehouses(
+			items_to_check, from_date
+		):
+			union((item, warehouse), (linked_item, linked_warehouse))
+			new_items.update({item, linked_item} - checked_items)
+
+		items_to_check = sorted(new_items)
+
+	components = {}
+	for row in items_to_be_repost:
+		components.setdefault(find((row.item_code, row.warehouse)), []).append(row)
+
+	return list(components.values())
+
+
+def get_linked_item_warehouses(items, from_date):
+	"""Returns (item, warehouse, linked item, linked warehouse) of the entries of the items on or after the
+	date and the entries of the same voucher their rate is taken from, or which take their rate."""
+	return frappe.db.sql(
+		"""
+		select distinct sle.item_code, sle.warehouse, dependant_sle.item_code, dependant_sle.warehouse
+		from `tabStock Ledger Entry` sle
+		inner join `tabStock Ledger Entry` dependant_sle
+			on dependant_sle.voucher_type = sle.voucher_type
+			and dependant_sle.voucher_no = sle.voucher_no
+			and dependant_sle.voucher_detail_no = sle.dependant_sle_voucher_detail_no
+			and dependant_sle.name != sle.name
+		where (sle.item_code in %(items)s or dependant_sle.item_code in %(items)s)
+			and sle.posting_date >= %(from_date)s
+			and sle.is_cancelled = 0
+			and dependant_sle.is_cancelled = 0
+		order by sle.item_code, sle.warehouse, dependant_sle.item_code, dependant_sle.warehouse
+		""",
+		{"items": items, "from_date": from_date},
+	)
+
+
+def get_items_by_repost(reposts):
+	items_by_repost = {}
+	vouchers = [row.voucher_no for row in reposts if row.based_on == "Transaction" and row.voucher_no]
+
+	voucher_items = {}
+	if vouchers:
+		for sle in frappe.get_all(
+			"Stock Ledger Entry",
+			fields=["voucher_type", "voucher_no", "item_code"],
+			filters={"voucher_no": ("in", vouchers)},
+			distinct=True,
+		):
+			voucher_items.setdefault((sle.voucher_type, sle.voucher_no), set()).add(sle.item_code)
+
+	for row in reposts:
+		if row.based_on == "Transaction":
+			items_by_repost[row.name] = sorted(voucher_items.get((row.voucher_type, row.voucher_no), []))
+		elif row.item_code:
+			items_by_repost[row.name] = [row.item_code]
+
+	return items_by_repost
+
+
+def get_items_transacted_together(items, from_date):
+	"""Returns (item, linked item) pairs of items posted in the same voucher on or after the date."""
+	return frappe.db.sql(
+		"""
+		select distinct sle.item_code, linked_sle.item_code
+		from `tabStock Ledger Entry` sle
+		inner join `tabStock Ledger Entry` linked_sle
+			on linked_sle.voucher_no = sle.voucher_no
+			and linked_sle.voucher_type = sle.voucher_type
+			and linked_sle.item_code != sle.item_code
+		where sle.item_code in %(items)s
+			and sle.posting_date >= %(from_date)s
+			and sle.is_cancelled = 0
+			and linked_sle.is_cancelled = 0
+		order by sle.item_code, linked_sle.item_code
+		""",
+		{"items": items, "from_date": from_date},
+	)
+
 
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
@@ -454,3 +454,307 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 						"name",
 					)
 				)
+
+	@change_settings("Stock Reposting Settings", {"enable_batched_reposting": 1, "reposting_batch_size": 2})
+	def test_batched_reposting(self):
+		company = "_Test Company with perpetual inventory"
+		warehouse = "Stores - TCP1"
+		items = [self.make_item(properties={"is_stock_item": 1}).name for _ in range(3)]
+
+		for item in items:
+			make_stock_entry(item=item, company=company, qty=10, rate=10, target=warehouse)
+
+		consumptions = [
+			make_stock_entry(item=item, company=company, qty=5, source=warehouse) for item in items
+		]
+
+		# backdated receipt of all items in one voucher, reposted in batches of two item-warehouses
+		# FIFO: consumption should now be valued from the backdated receipt
+		backdated_receipt = make_stock_entry(
+			item=items[0],
+			company=company,
+			qty=10,
+			rate=40,
+			target=warehouse,
+			posting_date=add_to_date(today(), days=-1),
+			do_not_submit=True,
+		)
+		for item in items[1:]:
+			backdated_receipt.append(
+				"items",
+				{
+					"item_code": item,
+					"qty": 10,
+					"basic_rate": 40,
+					"t_warehouse": warehouse,
+					"conversion_factor": 1,
+				},
+			)
+		backdated_receipt.submit()
+
+		for consumption in consumptions:
+			self.assertSLEs(
+				consumption,
+				[{"actual_qty": -5, "qty_after_transaction": 15, "stock_value_difference": -200}],
+			)
+
+	@change_settings("Stock Reposting Settings", {"sle_page_size": 2})
+	def test_paged_reposting(self):
+		company = "_Test Company with perpetual inventory"
+		warehouse = "Stores - TCP1"
+		item = self.make_item(properties={"is_stock_item": 1}).name
+
+		for _ in range(5):
+			make_stock_entry(item=item, company=company, qty=1, rate=10, target=warehouse)
+
+		# consumption falls on the last page of future entries
+		consumption = make_stock_entry(item=item, company=company, qty=5, source=warehouse)
+
+		make_stock_entry(
+			item=item,
+			company=company,
+			qty=1,
+			rate=50,
+			target=warehouse,
+			posting_date=add_to_date(today(), days=-1),
+		)
+
+		self.assertSLEs(
+			consumption,
+			[{"actual_qty": -5, "qty_after_transaction": 1, "stock_value_difference": -90}],
+		)
+
+	def test_sle_write_buffer(self):
+		from erpnext.stock.stock_ledger import SLEWriteBuffer
+
+		company = "_Test Company with perpetual inventory"
+		item = self.make_item(properties={"is_stock_item": 1}).name
+		entries = [
+			make_stock_entry(item=item, company=company, qty=1, rate=10, target="Stores - TCP1")
+			for _ in range(3)
+		]
+		sles = frappe.get_all(
+			"Stock Ledger Entry",
+			fields=["*"],
+			filters={"voucher_no": ("in", [se.name for se in entries])},
+			order_by="posting_datetime, creation",
+		)
+
+		buffer = SLEWriteBuffer(batch_size=2)
+		for idx, sle in enumerate(sles, start=1):
+			sle.valuation_rate = 100 * idx
+			buffer.add(sle)
+
+		# first two entries are written as soon as the batch is full
+		self.assertEqual(frappe.db.get_value("Stock Ledger Entry", sles[0].name, "valuation_rate"), 100)
+		self.assertEqual(frappe.db.get_value("Stock Ledger Entry", sles[2].name, "valuation_rate"), 10)
+
+		buffer.flush()
+		self.assertEqual(frappe.db.get_value("Stock Ledger Entry", sles[2].name, "valuation_rate"), 300)
+
+	def test_independent_reposting_groups(self):
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+			get_independent_reposting_groups,
+		)
+
+		company = "_Test Company with perpetual inventory"
+		warehouse = "Stores - TCP1"
+		item_a, item_b, item_c = (self.make_item(properties={"is_stock_item": 1}).name for _ in range(3))
+
+		# A and B are received together, C on its own
+		receipt = make_stock_entry(
+			item=item_a, company=company, qty=1, rate=10, target=warehouse, do_not_submit=True
+		)
+		receipt.append(
+			"items",
+			{
+				"item_code": item_b,
+				"qty": 1,
+				"basic_rate": 10,
+				"t_warehouse": warehouse,
+				"conversion_factor": 1,
+			},
+		)
+		receipt.submit()
+		make_stock_entry(item=item_c, company=company, qty=1, rate=10, target=warehouse)
+
+		riv_entries = []
+		for item in (item_a, item_c, item_b):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item,
+				warehouse=warehouse,
+				company=company,
+				posting_date=add_days(today(), -1),
+				posting_time="00:00:01",
+			)
+			riv.flags.dont_run_in_test = True
+			riv.submit()
+			riv_entries.append(frappe._dict(name=riv.name))
+
+		groups = get_independent_reposting_groups(riv_entries, max_groups=4)
+		self.assertEqual(
+			groups,
+			[[riv_entries[0].name, riv_entries[2].name], [riv_entries[1].name]],
+		)
+
+		# everything in one job if only one job is allowed, queue order is retained
+		self.assertEqual(
+			get_independent_reposting_groups(riv_entries, max_groups=1),
+			[[row.name for row in riv_entries]],
+		)
+
+	@change_settings("Stock Reposting Settings", {"enable_parallel_reposting": 1})
+	def test_reposting_independent_item_warehouse_components(self):
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+			get_independent_item_warehouse_components,
+		)
+		from erpnext.stock.stock_ledger import get_items_to_be_repost
+
+		company = "_Test Company with perpetual inventory"
+		stores, wip = "Stores - TCP1", "Work In Progress - TCP1"
+		item_a, item_b = (self.make_item(properties={"is_stock_item": 1}).name for _ in range(2))
+
+		for item in (item_a, item_b):
+			make_stock_entry(item=item, company=company, qty=10, rate=10, target=stores)
+
+		# A is transferred, so A in both the warehouses are linked, B is independent
+		transfer = make_stock_entry(item=item_a, company=company, qty=5, source=stores, target=wip)
+		consumption = make_stock_entry(item=item_b, company=company, qty=5, source=stores)
+
+		backdated_receipt = make_stock_entry(
+			item=item_a,
+			company=company,
+			qty=10,
+			rate=40,
+			target=stores,
+			posting_date=add_to_date(today(), days=-1),
+			do_not_submit=True,
+		)
+		for item, warehouse in ((item_b, stores), (item_a, wip)):
+			backdated_receipt.append(
+				"items",
+				{
+					"item_code": item,
+					"qty": 10,
+					"basic_rate": 40,
+					"t_warehouse": warehouse,
+					"conversion_factor": 1,
+				},
+			)
+		backdated_receipt.submit()
+
+		components = get_independent_item_warehouse_components(
+			get_items_to_be_repost(backdated_receipt.doctype, backdated_receipt.name)
+		)
+		self.assertEqual(
+			[[(row.item_code, row.warehouse) for row in component] for component in components],
+			[[(item_a, stores), (item_a, wip)], [(item_b, stores)]],
+		)
+
+		# components are reposted separately, the last one reposts the GL entries
+		riv = frappe.get_last_doc(
+			"Repost Item Valuation", {"voucher_type": "Stock Entry", "voucher_no": backdated_receipt.name}
+		)
+		self.assertEqual(riv.status, "Completed")
+		self.assertEqual(riv.total_reposting_count, 2)
+		self.assertFalse(riv.reposting_data_file)
+
+		self.assertSLEs(
+			transfer, [{"actual_qty": -5, "stock_value_difference": -200}], sle_filters={"warehouse": stores}
+		)
+		self.assertSLEs(
+			transfer, [{"actual_qty": 5, "stock_value_difference": 200}], sle_filters={"warehouse": wip}
+		)
+		self.assertSLEs(
+			consumption,
+			[{"actual_qty": -5, "qty_after_transaction": 15, "stock_value_difference": -200}],
+		)
+		self.assertGLEs(
+			consumption,
+			[{"credit": 200}, {"debit": 200}],
+			gle_filters={"is_cancelled": 0},
+			order_by="debit",
+		)
+
+	def test_gl_reposting_vouchers_are_saved_for_resuming(self):
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+			get_stock_vouchers_for_gl_reposting,
+		)
+
+		company = "_Test Company with perpetual inventory"
+		warehouse = "Stores - TCP1"
+		item = self.make_item(properties={"is_stock_item": 1}).name
+
+		receipt = make_stock_entry(item=item, company=company, qty=5, rate=10, target=warehouse)
+		make_stock_entry(item=item, company=company, qty=1, source=warehouse)
+
+		riv = frappe.get_doc(
+			doctype="Repost Item Valuation",
+			based_on="Transaction",
+			voucher_type=receipt.doctype,
+			voucher_no=receipt.name,
+			posting_date=receipt.posting_date,
+			posting_time=receipt.posting_time,
+			company=company,
+		)
+		riv.flags.dont_run_in_test = True
+		riv.submit()
+
+		vouchers = get_stock_vouchers_for_gl_reposting(riv)
+		self.assertIn((receipt.doctype, receipt.name), vouchers)
+
+		# a transaction made after GL reposting has started is not picked up on resuming
+		make_stock_entry(item=item, company=company, qty=1, source=warehouse)
+		riv.reload()
+		self.assertEqual(get_stock_vouchers_for_gl_reposting(riv), vouchers)
+
+	@change_settings("Stock Reposting Settings", {"profile_reposting": 1})
+	def test_reposting_timings(self):
+		import json
+
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import repost
+		from erpnext.stock.reposting_timer import REPOSTING_PHASES, reposting_phase
+
+		company = "_Test Company with perpetual inventory"
+		warehouse = "Stores - TCP1"
+		item = self.make_item(properties={"is_stock_item": 1}).name
+
+		receipt = make_stock_entry(item=item, company=company, qty=5, rate=10, target=warehouse)
+		make_stock_entry(item=item, company=company, qty=1, source=warehouse)
+
+		riv = frappe.get_doc(
+			doctype="Repost Item Valuation",
+			based_on="Transaction",
+			voucher_type=receipt.doctype,
+			voucher_no=receipt.name,
+			posting_date=receipt.posting_date,
+			posting_time=receipt.posting_time,
+			company=company,
+		)
+		riv.flags.dont_run_in_test = True
+		riv.submit()
+		repost(riv)
+		riv.reload()
+
+		timings = json.loads(riv.reposting_timings)
+		self.assertEqual(set(timings), set(REPOSTING_PHASES))
+		self.assertEqual(timings["valuation"]["rows"], 2)
+		self.assertGreater(timings["sle_fetch"]["calls"], 0)
+		self.assertGreater(timings["gl_regeneration"]["rows"], 0)
+		self.assertTrue(
+			frappe.db.exists(
+				"File",
+				{
+					"attached_to_doctype": riv.doctype,
+					"attached_to_name": riv.name,
+					"file_name": ("like", "%.prof"),
+				},
+			)
+		)
+
+		# timer is stopped after reposting
+		with reposting_phase("valuation") as phase:
+			phase.rows = 1
+		self.assertIsNone(frappe.local.reposting_timer)
@@ -0,0 +1,237 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, getdate, now
+
+from erpnext.stock.utils import get_combine_datetime
+
+
+class StockBalanceSnapshot(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		item_code: DF.Link
+		posting_date: DF.Date
+		posting_datetime: DF.Datetime | None
+		qty_after_transaction: DF.Float
+		stock_ledger_entry: DF.Link | None
+		stock_queue: DF.LongText | None
+		stock_value: DF.Float
+		valuation_rate: DF.Float
+		warehouse: DF.Link
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Stock Balance Snapshot",
+		["item_code", "warehouse", "posting_date"],
+		constraint_name="unique_item_warehouse_date",
+	)
+	frappe.db.add_index("Stock Balance Snapshot", ["item_code", "warehouse", "posting_datetime"])
+
+
+def is_stock_balance_snapshot_enabled() -> bool:
+	return bool(
+		cint(frappe.db.get_single_value("Stock Settings", "maintain_stock_balance_snapshots", cache=True))
+	)
+
+
+def get_stock_balance_snapshot(item_code, warehouse, posting_datetime):
+	"""Returns the latest snapshot whose last entry is on or before `posting_datetime`"""
+	snapshot = frappe.db.sql(
+		"""
+		select stock_ledger_entry, posting_datetime, qty_after_transaction, valuation_rate,
+			stock_value, stock_queue
+		from `tabStock Balance Snapshot`
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and posting_datetime <= %(posting_datetime)s
+		order by posting_datetime desc
+		limit 1
+		""",
+		{"item_code": item_code, "warehouse": warehouse, "posting_datetime": posting_datetime},
+		as_dict=1,
+	)
+
+	return snapshot[0] if snapshot else None
+
+
+def get_stock_balance_from_snapshot(item_code, warehouse, posting_datetime):
+	"""Returns the balance as of `posting_datetime` from the latest snapshot before it and the entries
+	posted after the snapshot, None if there is no snapshot"""
+	snapshot = get_stock_balance_snapshot(item_code, warehouse, posting_datetime)
+	if not snapshot:
+		return None
+
+	# entries posted after the last entry of the snapshot, up to `posting_datetime`
+	tail = frappe.db.sql(
+		"""
+		select qty_after_transaction, valuation_rate, stock_value, stock_queue
+		from `tabStock Ledger Entry`
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and is_cancelled = 0
+			and posting_datetime > %(snapshot_datetime)s
+			and posting_datetime <= %(posting_datetime)s
+		order by posting_datetime desc, creation desc
+		limit 1
+		""",
+		{
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"snapshot_datetime": snapshot.posting_datetime,
+			"posting_datetime": posting_datetime,
+		},
+		as_dict=1,
+	)
+
+	return tail[0] if tail else snapshot
+
+
+def update_stock_balance_snapshot(item_code, warehouse, posting_date):
+	"""Point the snapshot of the day to the last active entry of the day
+	and refresh the balances of the later snapshots"""
+	posting_date = getdate(posting_date)
+	last_sle = get_last_sle_of_the_day(item_code, warehouse, posting_date)
+	snapshot = frappe.db.get_value(
+		"Stock Balance Snapshot",
+		{"item_code": item_code, "warehouse": warehouse, "posting_date": posting_date},
+	)
+
+	if not last_sle:
+		if snapshot:
+			frappe.db.delete("Stock Balance Snapshot", snapshot)
+	elif snapshot:
+		frappe.db.set_value(
+			"Stock Balance Snapshot", snapshot, get_snapshot_values(last_sle), update_modified=False
+		)
+	else:
+		doc = frappe.new_doc("Stock Balance Snapshot")
+		doc.update(
+			{"item_code": item_code, "warehouse": warehouse, "posting_date": posting_date}
+			| get_snapshot_values(last_sle)
+		)
+		doc.db_insert()
+
+	# backdated entries shift the qty of all the future entries
+	refresh_stock_balance_snapshots(item_code, warehouse, add_days(posting_date, 1))
+
+
+def refresh_stock_balance_snapshots(item_code, warehouse, from_date):
+	"""Copy the reposted balances of the ledger entries into the snapshots from `from_date` onwards"""
+	set_values = ",\n\t\t\t".join(
+		f"""{fieldname} = (
+				select sle.{fieldname} from `tabStock Ledger Entry` sle
+				where sle.name = `tabStock Balance Snapshot`.stock_ledger_entry
+			)"""
+		for fieldname in ("qty_after_transaction", "valuation_rate", "stock_value", "stock_queue")
+	)
+	frappe.db.sql(
+		f"""
+		update `tabStock Balance Snapshot`
+		set {set_values}
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and posting_date >= %(from_date)s
+		""",
+		{"item_code": item_code, "warehouse": warehouse, "from_date": getdate(from_date)},
+	)
+
+
+def get_last_sle_of_the_day(item_code, warehouse, posting_date):
+	sle = frappe.db.sql(
+		"""
+		select name, posting_datetime, qty_after_transaction, valuation_rate, stock_value, stock_queue
+		from `tabStock Ledger Entry`
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and is_cancelled = 0
+			and posting_datetime >= %(from_datetime)s
+			and posting_datetime < %(to_datetime)s
+		order by posting_datetime desc, creation desc
+		limit 1
+		""",
+		{
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"from_datetime": get_combine_datetime(posting_date, "00:00:00"),
+			"to_datetime": get_combine_datetime(add_days(posting_date, 1), "00:00:00"),
+		},
+		as_dict=1,
+	)
+
+	return sle[0] if sle else None
+
+
+def get_snapshot_values(sle):
+	return {
+		"stock_ledger_entry": sle.name,
+		"posting_datetime": sle.posting_datetime,
+		"qty_after_transaction": sle.qty_after_transaction,
+		"valuation_rate": sle.valuation_rate,
+		"stock_value": sle.stock_value,
+		"stock_queue": sle.stock_queue,
+	}
+
+
+def rebuild_stock_balance_snapshots():
+	"""Rebuild the snapshots of all the item and warehouses from the stock ledger"""
+	frappe.db.delete("Stock Balance Snapshot")
+
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+		"item_code",
+		"warehouse",
+		"posting_date",
+		"posting_datetime",
+		"stock_ledger_entry",
+		"qty_after_transaction",
+		"valuation_rate",
+		"stock_value",
+		"stock_queue",
+	]
+
+	timestamp = now()
+	for warehouse in frappe.get_all("Warehouse", filters={"is_group": 0}, pluck="name"):
+		entries = frappe.db.sql(
+			"""
+			select item_code, warehouse, posting_date, posting_datetime, name,
+				qty_after_transaction, valuation_rate, stock_value, stock_queue
+			from (
+				select item_code, warehouse, posting_date, posting_datetime, name,
+					qty_after_transaction, valuation_rate, stock_value, stock_queue,
+					row_number() over (
+						partition by item_code, posting_date
+						order by posting_datetime desc, creation desc
+					) as row_num
+				from `tabStock Ledger Entry`
+				where warehouse = %s and is_cancelled = 0
+			) sle
+			where row_num = 1
+			""",
+			warehouse,
+		)
+
+		values = [
+			(frappe.generate_hash(length=10), timestamp, timestamp, "Administrator", "Administrator", *row)
+			for row in entries
+		]
+		if values:
+			frappe.db.bulk_insert("Stock Balance Snapshot", fields=fields, values=values)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
@@ -0,0 +1,86 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, today
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	rebuild_stock_balance_snapshots,
+)
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.stock_ledger import get_previous_sle
+from erpnext.stock.utils import get_stock_balance
+
+
+class TestStockBalanceSnapshot(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_snapshots(self, item_code, warehouse):
+		return frappe.get_all(
+			"Stock Balance Snapshot",
+			filters={"item_code": item_code, "warehouse": warehouse},
+			fields=["posting_date", "qty_after_transaction", "stock_value", "stock_ledger_entry"],
+			order_by="posting_date",
+		)
+
+	@change_settings("Stock Settings", {"maintain_stock_balance_snapshots": 1})
+	def test_snapshots_follow_the_ledger(self):
+		item_code = make_item("_Test Item Stock Balance Snapshot", {"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+		day_1, day_2, day_3 = add_days(today(), -10), add_days(today(), -5), add_days(today(), -2)
+
+		make_stock_entry(item_code=item_code, target=warehouse, qty=10, rate=100, posting_date=day_1)
+		make_stock_entry(item_code=item_code, target=warehouse, qty=5, rate=100, posting_date=day_1)
+		make_stock_entry(item_code=item_code, source=warehouse, qty=3, posting_date=day_3)
+
+		snapshots = self.get_snapshots(item_code, warehouse)
+		self.assertEqual(
+			[(str(s.posting_date), s.qty_after_transaction) for s in snapshots], [(day_1, 15), (day_3, 12)]
+		)
+
+		# backdated entry adds a snapshot and shifts the later ones
+		backdated = make_stock_entry(
+			item_code=item_code, target=warehouse, qty=4, rate=100, posting_date=day_2
+		)
+		snapshots = self.get_snapshots(item_code, warehouse)
+		self.assertEqual(
+			[(str(s.posting_date), s.qty_after_transaction, s.stock_value) for s in snapshots],
+			[(day_1, 15, 1500), (day_2, 19, 1900), (day_3, 16, 1600)],
+		)
+
+		for posting_date, qty in ((day_1, 15), (add_days(day_2, 1), 19), (today(), 16)):
+			self.assertEqual(get_stock_balance(item_code, warehouse, posting_date), qty)
+			sle = get_previous_sle(
+				{
+					"item_code": item_code,
+					"warehouse": warehouse,
+					"posting_date": posting_date,
+					"posting_time": "23:59:59",
+				}
+			)
+			self.assertEqual(sle.qty_after_transaction, qty)
+
+		# cancelling the only entry of the day drops the snapshot
+		backdated.cancel()
+		snapshots = self.get_snapshots(item_code, warehouse)
+		self.assertEqual(
+			[(str(s.posting_date), s.qty_after_transaction) for s in snapshots], [(day_1, 15), (day_3, 12)]
+		)
+		self.assertEqual(get_stock_balance(item_code, warehouse, add_days(day_2, 1)), 15)
+
+		# rebuilding from the ledger gives the same snapshots
+		rebuild_stock_balance_snapshots()
+		self.assertEqual(self.get_snapshots(item_code, warehouse), snapshots)
+
+		# balances are read from the snapshot, and from the entries after it
+		frappe.db.set_value(
+			"Stock Balance Snapshot",
+			{"item_code": item_code, "warehouse": warehouse, "posting_date": day_1},
+			"qty_after_transaction",
+			1000,
+		)
+		self.assertEqual(get_stock_balance(item_code, warehouse, add_days(day_1, 1)), 1000)
+		self.assertEqual(get_stock_balance(item_code, warehouse, today()), 12)
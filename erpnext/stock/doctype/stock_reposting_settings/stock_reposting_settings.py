@@ -17,13 +17,19 @@ class StockRepostingSettings(Document):
 		from frappe.types import DF
 
 		do_reposting_for_each_stock_transaction: DF.Check
+		enable_batched_reposting: DF.Check
+		enable_parallel_reposting: DF.Check
 		end_time: DF.Time | None
 		item_based_reposting: DF.Check
 		limit_reposting_timeslot: DF.Check
 		limits_dont_apply_on: DF.Literal[
 			"", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 		]
+		max_parallel_reposting_jobs: DF.Int
 		notify_reposting_error_to_role: DF.Link | None
+		profile_reposting: DF.Check
+		reposting_batch_size: DF.Int
+		sle_page_size: DF.Int
 		start_time: DF.Time | None
 	# end: auto-generated types
 
@@ -38,6 +38,7 @@ class StockSettings(Document):
 		auto_reserve_serial_and_batch: DF.Check
 		auto_reserve_stock_for_sales_order_on_purchase: DF.Check
 		clean_description_html: DF.Check
+		compact_stock_queue: DF.Check
 		default_warehouse: DF.Link | None
 		disable_serial_no_and_batch_selector: DF.Check
 		do_not_update_serial_batch_on_creation_of_auto_bundle: DF.Check
@@ -45,6 +46,7 @@ class StockSettings(Document):
 		enable_stock_reservation: DF.Check
 		item_group: DF.Link | None
 		item_naming_by: DF.Literal["Item Code", "Naming Series"]
+		maintain_stock_balance_snapshots: DF.Check
 		mr_qty_allowance: DF.Float
 		naming_series_prefix: DF.Data | None
 		over_delivery_receipt_allowance: DF.Float
@@ -97,6 +99,7 @@ class StockSettings(Document):
 		self.validate_warehouses()
 		self.cant_change_valuation_method()
 		self.validate_clean_description_html()
+		self.validate_stock_balance_snapshots()
 		self.validate_pending_reposts()
 		self.validate_stock_reservation()
 		self.change_precision_for_for_sales()
@@ -158,6 +161,18 @@ class StockSettings(Document):
 				enqueue_after_commit=True,
 			)
 
+	def validate_stock_balance_snapshots(self):
+		if self.has_value_changed("maintain_stock_balance_snapshots") and cint(
+			self.maintain_stock_balance_snapshots
+		):
+			# snapshots are not maintained while disabled, rebuild them from the ledger
+			frappe.enqueue(
+				"erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot.rebuild_stock_balance_snapshots",
+				queue="long",
+				now=frappe.flags.in_test,
+				enqueue_after_commit=True,
+			)
+
 	def validate_pending_reposts(self):
 		if self.stock_frozen_upto:
 			check_pending_reposting(self.stock_frozen_upto)
@@ -2,7 +2,9 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import datetime
 import json
+from contextlib import contextmanager
 
 import frappe
 from frappe import _, throw
@@ -129,6 +131,147 @@ def get_item_details(args, doc=None, for_validate=False, overwrite_warehouse=Tru
 	return out
 
 
+@frappe.whitelist()
+def get_items_details(args_list, doc=None, for_validate=False, overwrite_warehouse=True):
+	"""Returns `get_item_details` of each of the rows in `args_list`.
+
+	The Item Prices, Bins, conversion factors, barcodes and pricing rules of all the rows are
+	fetched together instead of row by row."""
+	args_list = [process_args(args) for args in process_string_args(args_list)]
+
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	with prefetch_item_details(args_list):
+		return [get_item_details(args, doc, for_validate, overwrite_warehouse) for args in args_list]
+
+
+@contextmanager
+def prefetch_item_details(args_list):
+	"""Fetch the details of the items in `args_list` with a query per table, `get_item_details`
+	looks them up from `frappe.flags.item_details_prefetch` instead of querying for each row"""
+	from erpnext.accounts.doctype.pricing_rule.utils import (
+		build_pricing_rule_index,
+		is_pricing_rule_cache_enabled,
+	)
+
+	if len(args_list) < 2:
+		yield
+		return
+
+	previous_prefetch = frappe.flags.item_details_prefetch
+	frappe.flags.item_details_prefetch = get_item_details_prefetch(args_list)
+
+	# match the rows against the pricing rules of their items at once, unless all the rules are
+	# cached already
+	build_index = not is_pricing_rule_cache_enabled() and not getattr(
+		frappe.local, "pricing_rule_index", None
+	)
+	if build_index:
+		frappe.local.pricing_rule_index = build_pricing_rule_index(
+			{args.get("item_code") for args in args_list if args.get("item_code")}
+		)
+
+	try:
+		yield
+	finally:
+		frappe.flags.item_details_prefetch = previous_prefetch
+		if build_index:
+			frappe.local.pricing_rule_index = None
+
+
+def get_item_details_prefetch(args_list):
+	item_codes = list({args.get("item_code") for args in args_list if args.get("item_code")})
+	price_lists = list(
+		{
+			args.get("price_list") or args.get("selling_price_list") or args.get("buying_price_list")
+			for args in args_list
+		}
+		- {None, ""}
+	)
+
+	prefetch = frappe._dict(
+		items={},
+		item_prices={},
+		packing_units={},
+		conversion_factors={},
+		barcodes={},
+		bins={},
+		child_warehouses={},
+	)
+
+	if not item_codes:
+		return prefetch
+
+	prefetch.items = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			filters={"name": ("in", item_codes)},
+			fields=[
+				"name",
+				"variant_of",
+				"stock_uom",
+				"default_item_manufacturer",
+				"default_manufacturer_part_no",
+			],
+		)
+	}
+	parents = list({*prefetch.items, *(d.variant_of for d in prefetch.items.values() if d.variant_of)})
+
+	for item_code in parents:
+		for price_list in price_lists:
+			prefetch.item_prices[(item_code, price_list)] = []
+
+	if price_lists:
+		for d in frappe.get_all(
+			"Item Price",
+			filters={"item_code": ("in", parents), "price_list": ("in", price_lists)},
+			fields=[
+				"name",
+				"item_code",
+				"price_list",
+				"uom",
+				"batch_no",
+				"customer",
+				"supplier",
+				"valid_from",
+				"valid_upto",
+				"price_list_rate",
+				"packing_unit",
+			],
+		):
+			prefetch.item_prices[(d.item_code, d.price_list)].append(d)
+			prefetch.packing_units[d.name] = d.packing_unit
+
+	for d in frappe.db.get_all(
+		"UOM Conversion Detail",
+		filters={"parent": ("in", parents)},
+		fields=["parent", "uom", "conversion_factor"],
+	):
+		prefetch.conversion_factors.setdefault((d.parent, d.uom), d.conversion_factor)
+
+	prefetch.barcodes = {item_code: [] for item_code in prefetch.items}
+	for d in frappe.db.get_all(
+		"Item Barcode", filters={"parent": ("in", list(prefetch.items))}, fields=["parent", "barcode"]
+	):
+		prefetch.barcodes[d.parent].append(d.barcode)
+
+	bin = frappe.qb.DocType("Bin")
+	wh = frappe.qb.DocType("Warehouse")
+	prefetch.bins = {item_code: [] for item_code in prefetch.items}
+	for d in (
+		frappe.qb.from_(bin)
+		.inner_join(wh)
+		.on(bin.warehouse == wh.name)
+		.select(bin.item_code, bin.warehouse, wh.company, bin.projected_qty, bin.actual_qty, bin.reserved_qty)
+		.where(bin.item_code.isin(list(prefetch.items)))
+	).run(as_dict=True):
+		prefetch.bins[d.item_code].append(d)
+
+	return prefetch
+
+
 def remove_standard_fields(details):
 	for key in child_table_fields + default_fields:
 		details.pop(key, None)
@@ -434,9 +577,13 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 			out["manufacturer_part_no"] = None
 			out["manufacturer"] = None
 	else:
-		data = frappe.get_value(
-			"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
-		)
+		prefetch = frappe.flags.item_details_prefetch
+		if prefetch and item.name in prefetch.items:
+			data = prefetch.items[item.name]
+		else:
+			data = frappe.get_value(
+				"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
+			)
 
 		if data:
 			out.update(
@@ -496,7 +643,11 @@ def get_item_warehouse(item, args, overwrite_warehouse, defaults=None):
 
 
 def update_barcode_value(out):
-	barcode_data = get_barcode_data([out])
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and out.item_code in prefetch.barcodes:
+		barcode_data = {out.item_code: prefetch.barcodes[out.item_code]}
+	else:
+		barcode_data = get_barcode_data([out])
 
 	# If item has one barcode then update the value of the barcode field
 	if barcode_data and len(barcode_data.get(out.item_code)) == 1:
@@ -874,6 +1025,7 @@ def insert_item_price(args):
 					"Stock Settings", "update_existing_price_list_rate"
 				):
 					frappe.db.set_value("Item Price", item_price.name, "price_list_rate", price_list_rate)
+					clear_prefetched_item_prices(args.item_code, args.price_list)
 					frappe.msgprint(
 						_("Item Price updated for {0} in Price List {1}").format(
 							args.item_code, args.price_list
@@ -892,12 +1044,21 @@ def insert_item_price(args):
 					}
 				)
 				item_price.insert()
+				clear_prefetched_item_prices(args.item_code, args.price_list)
 				frappe.msgprint(
 					_("Item Price added for {0} in Price List {1}").format(args.item_code, args.price_list),
 					alert=True,
 				)
 
 
+def clear_prefetched_item_prices(item_code, price_list):
+	"""The Item Prices of the item and price list are read from the database again after they are
+	changed by a row of the batch"""
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch:
+		prefetch.item_prices.pop((item_code, price_list), None)
+
+
 def get_item_price(args, item_code, ignore_party=False) -> list[dict]:
 	"""
 	Get name, price_list_rate from Item Price based on conditions
@@ -907,6 +1068,12 @@ def get_item_price(args, item_code, ignore_party=False) -> list[dict]:
 	:param item_code: str, Item Doctype field item_code
 	"""
 
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and (item_code, args.get("price_list")) in prefetch.item_prices:
+		return get_prefetched_item_price(
+			prefetch.item_prices[(item_code, args.get("price_list"))], args, ignore_party
+		)
+
 	ip = frappe.qb.DocType("Item Price")
 	query = (
 		frappe.qb.from_(ip)
@@ -940,6 +1107,51 @@ def get_item_price(args, item_code, ignore_party=False) -> list[dict]:
 	return query.run(as_dict=True)
 
 
+def get_prefetched_item_price(item_prices, args, ignore_party=False) -> list[dict]:
+	"""Same as `get_item_price`, from the prefetched Item Prices of the item and price list"""
+	transaction_date = getdate(args["transaction_date"]) if args.get("transaction_date") else None
+
+	def is_applicable(item_price):
+		if cstr(item_price.uom) not in ("", args.get("uom")):
+			return False
+
+		if cstr(item_price.batch_no) not in ("", args.get("batch_no")):
+			return False
+
+		if not ignore_party:
+			if args.get("customer"):
+				if item_price.customer != args.get("customer"):
+					return False
+			elif args.get("supplier"):
+				if item_price.supplier != args.get("supplier"):
+					return False
+			elif item_price.customer or item_price.supplier:
+				return False
+
+		if transaction_date:
+			return (
+				getdate(item_price.valid_from or "2000-01-01")
+				<= transaction_date
+				<= getdate(item_price.valid_upto or "2500-12-31")
+			)
+
+		return True
+
+	# ordered by valid from, batch no and uom, with nulls last
+	item_prices = sorted(
+		filter(is_applicable, item_prices),
+		key=lambda d: (
+			getdate(d.valid_from) if d.valid_from else datetime.date.min,
+			cstr(d.batch_no),
+			d.uom is not None,
+			cstr(d.uom),
+		),
+		reverse=True,
+	)
+
+	return [frappe._dict(name=d.name, price_list_rate=d.price_list_rate, uom=d.uom) for d in item_prices[:1]]
+
+
 def get_price_list_rate_for(args, item_code):
 	"""
 	:param customer: link to Customer DocType
@@ -1001,9 +1213,14 @@ def check_packing_list(price_list_rate_name, desired_qty, item_code):
 	"""
 
 	flag = True
-	item_price = frappe.get_doc("Item Price", price_list_rate_name)
-	if item_price.packing_unit:
-		packing_increment = desired_qty % item_price.packing_unit
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and price_list_rate_name in prefetch.packing_units:
+		packing_unit = prefetch.packing_units[price_list_rate_name]
+	else:
+		packing_unit = frappe.db.get_value("Item Price", price_list_rate_name, "packing_unit")
+
+	if packing_unit:
+		packing_increment = desired_qty % packing_unit
 
 		if packing_increment != 0:
 			flag = False
@@ -1138,6 +1355,17 @@ def get_pos_profile(company, pos_profile=None, user=None):
 
 @frappe.whitelist()
 def get_conversion_factor(item_code, uom):
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and item_code in prefetch.items:
+		item = prefetch.items[item_code]
+		conversion_factor = prefetch.conversion_factors.get(
+			(item_code, uom)
+		) or prefetch.conversion_factors.get((item.variant_of, uom))
+		if not conversion_factor:
+			conversion_factor = get_uom_conv_factor(uom, item.stock_uom)
+
+		return {"conversion_factor": conversion_factor or 1.0}
+
 	variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
 	filters = {"parent": item_code, "uom": uom}
 
@@ -1162,6 +1390,10 @@ def get_projected_qty(item_code, warehouse):
 
 @frappe.whitelist()
 def get_bin_details(item_code, warehouse, company=None, include_child_warehouses=False):
+	prefetch = frappe.flags.item_details_prefetch
+	if prefetch and item_code in prefetch.bins:
+		return get_prefetched_bin_details(prefetch, item_code, warehouse, company, include_child_warehouses)
+
 	bin_details = {"projected_qty": 0, "actual_qty": 0, "reserved_qty": 0}
 
 	if warehouse:
@@ -1188,6 +1420,33 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 	return bin_details
 
 
+def get_prefetched_bin_details(prefetch, item_code, warehouse, company=None, include_child_warehouses=False):
+	"""Same as `get_bin_details`, from the prefetched Bins of the item"""
+	from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
+
+	bin_details = {"projected_qty": 0, "actual_qty": 0, "reserved_qty": 0}
+	bins = prefetch.bins[item_code]
+
+	if warehouse:
+		if not include_child_warehouses:
+			warehouses = {warehouse}
+		else:
+			if warehouse not in prefetch.child_warehouses:
+				prefetch.child_warehouses[warehouse] = set(get_child_warehouses(warehouse))
+			warehouses = prefetch.child_warehouses[warehouse]
+
+		for fieldname in bin_details:
+			bin_details[fieldname] = sum(flt(d[fieldname]) for d in bins if d.warehouse in warehouses)
+
+	if company:
+		company_bins = [d for d in bins if d.company == company]
+		bin_details["company_total_stock"] = (
+			sum(flt(d.actual_qty) for d in company_bins) if company_bins else None
+		)
+
+	return bin_details
+
+
 def get_company_total_stock(item_code, company):
 	bin = frappe.qb.DocType("Bin")
 	wh = frappe.qb.DocType("Warehouse")
@@ -7,6 +7,8 @@ import frappe
 from frappe import _
 from frappe.utils import get_link_to_form, parse_json
 
+from erpnext.stock.valuation import loads_stock_queue
+
 SLE_FIELDS = (
 	"name",
 	"posting_date",
@@ -52,7 +54,8 @@ def add_invariant_check_fields(sles):
 	balance_qty = 0.0
 	balance_stock_value = 0.0
 	for idx, sle in enumerate(sles):
-		queue = json.loads(sle.stock_queue)
+		queue = loads_stock_queue(sle.stock_queue)
+		sle.stock_queue = json.dumps(queue)
 
 		fifo_qty = 0.0
 		fifo_value = 0.0
@@ -0,0 +1,98 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""Per-phase timing of Repost Item Valuation.
+
+Time of a phase excludes the phases nested in it, so the phases add up to
+the time spent in the instrumented code. Timing is recorded only while a
+timer is started for the current reposting, `reposting_phase` is a no-op otherwise.
+"""
+
+import json
+from contextlib import contextmanager
+from time import perf_counter
+
+import frappe
+
+REPOSTING_PHASES = (
+	"sle_fetch",
+	"valuation",
+	"sle_write",
+	"bin_write",
+	"dependent_vouchers",
+	"gl_regeneration",
+	"gl_compare",
+	"gl_write",
+)
+
+
+class RepostingPhase:
+	__slots__ = ("child_time", "name", "rows")
+
+	def __init__(self, name, rows=0):
+		self.name = name
+		self.rows = rows
+		self.child_time = 0.0
+
+
+class RepostingTimer:
+	def __init__(self, timings=None):
+		self.timings = {phase: {"seconds": 0.0, "rows": 0, "calls": 0} for phase in REPOSTING_PHASES}
+		self.stack = []
+
+		# add up to the timings of the previous runs of a resumed reposting
+		for phase, timing in (timings or {}).items():
+			if phase in self.timings:
+				self.timings[phase].update(timing)
+
+	@contextmanager
+	def phase(self, name, rows=0):
+		phase = RepostingPhase(name, rows)
+		self.stack.append(phase)
+		start = perf_counter()
+		try:
+			yield phase
+		finally:
+			elapsed = perf_counter() - start
+			self.stack.pop()
+			if self.stack:
+				self.stack[-1].child_time += elapsed
+
+			timing = self.timings[name]
+			timing["seconds"] += elapsed - phase.child_time
+			timing["rows"] += phase.rows
+			timing["calls"] += 1
+
+	def as_json(self):
+		timings = {
+			phase: {**timing, "seconds": round(timing["seconds"], 3)}
+			for phase, timing in self.timings.items()
+		}
+		return json.dumps(timings, indent=1)
+
+
+def start_reposting_timer(timings=None) -> RepostingTimer:
+	"""Start timing the phases of the current reposting, `timings` are the saved timings of the previous runs"""
+	if isinstance(timings, str):
+		timings = json.loads(timings)
+
+	frappe.local.reposting_timer = RepostingTimer(timings)
+	return frappe.local.reposting_timer
+
+
+def stop_reposting_timer() -> RepostingTimer | None:
+	timer = getattr(frappe.local, "reposting_timer", None)
+	frappe.local.reposting_timer = None
+	return timer
+
+
+@contextmanager
+def reposting_phase(name, rows=0):
+	"""Time the wrapped code as `name` phase, rows touched can be set on the yielded phase"""
+	timer = getattr(frappe.local, "reposting_timer", None)
+	if not timer:
+		yield RepostingPhase(name, rows)
+		return
+
+	with timer.phase(name, rows) as phase:
+		yield phase
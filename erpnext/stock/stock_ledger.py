@@ -29,10 +29,17 @@ from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_in
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_batches,
 )
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	get_stock_balance_snapshot,
+	is_stock_balance_snapshot_enabled,
+	refresh_stock_balance_snapshots,
+	update_stock_balance_snapshot,
+)
 from erpnext.stock.doctype.stock_reservation_entry.stock_reservation_entry import (
 	get_sre_reserved_batch_nos_details,
 	get_sre_reserved_serial_nos_details,
 )
+from erpnext.stock.reposting_timer import reposting_phase
 from erpnext.stock.utils import (
 	get_combine_datetime,
 	get_incoming_outgoing_rate_for_cancel,
@@ -42,7 +49,14 @@ from erpnext.stock.utils import (
 	get_stock_balance,
 	get_valuation_method,
 )
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	BinWiseValuation,
+	FIFOValuation,
+	LIFOValuation,
+	dumps_stock_queue,
+	loads_stock_queue,
+	round_off_if_near_zero,
+)
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -53,6 +67,9 @@ class SerialNoExistsInFutureTransaction(frappe.ValidationError):
 	pass
 
 
+SLE_UPDATE_BATCH_SIZE = 500
+
+
 def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_voucher=False):
 	"""Create SL entries from SL entry dicts
 
@@ -74,6 +91,7 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 
 		args = get_args_for_future_sle(sl_entries[0])
 		future_sle_exists(args, sl_entries)
+		maintain_snapshots = is_stock_balance_snapshot_enabled()
 
 		for sle in sl_entries:
 			if sle.serial_no and not via_landed_cost_voucher:
@@ -110,6 +128,9 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 				args.reserved_stock = flt(frappe.db.get_value("Bin", bin_name, "reserved_stock"))
 				repost_current_voucher(args, allow_negative_stock, via_landed_cost_voucher)
 				update_bin_qty(bin_name, args)
+
+				if maintain_snapshots:
+					update_stock_balance_snapshot(args.item_code, args.warehouse, args.posting_date)
 			else:
 				frappe.msgprint(
 					_("Item {0} ignored since it is not a stock item").format(args.get("item_code"))
@@ -256,11 +277,16 @@ def repost_future_sle(
 
 	distinct_item_warehouses = get_distinct_item_warehouse(args, doc, reposting_data=reposting_data)
 	affected_transactions = get_affected_transactions(doc, reposting_data=reposting_data)
+	prefetcher = get_future_sle_prefetcher()
 
 	i = get_current_index(doc) or 0
 	while i < len(args):
 		validate_item_warehouse(args[i])
 
+		if prefetcher:
+			with reposting_phase("sle_fetch"):
+				prefetcher.prefetch(args, i)
+
 		obj = update_entries_after(
 			{
 				"item_code": args[i].get("item_code"),
@@ -271,6 +297,7 @@ def repost_future_sle(
 				"distinct_item_warehouses": distinct_item_warehouses,
 				"items_to_be_repost": args,
 				"current_index": i,
+				"sle_prefetcher": prefetcher,
 			},
 			allow_negative_stock=allow_negative_stock,
 			via_landed_cost_voucher=via_landed_cost_voucher,
@@ -294,11 +321,167 @@ def repost_future_sle(
 				data.sle_changed = False
 		i += 1
 
-		if doc:
+		# In batched mode rows of the whole batch are locked by one query,
+		# so progress is committed only once the batch is processed.
+		if doc and (not prefetcher or prefetcher.is_batch_processed(i, args)):
 			update_args_in_repost_item_valuation(
 				doc, i, args, distinct_item_warehouses, affected_transactions
 			)
 
+	return affected_transactions
+
+
+def get_future_sle_prefetcher():
+	repost_settings = frappe.get_cached_doc("Stock Reposting Settings")
+	if not repost_settings.enable_batched_reposting:
+		return
+
+	return FutureSLEPrefetcher(cint(repost_settings.reposting_batch_size) or 100)
+
+
+class FutureSLEPrefetcher:
+	"""
+	Fetch previous and future Stock Ledger Entries of a batch of item-warehouse pairs
+	with a single query each, instead of scanning the ledger once per item-warehouse.
+
+	Prefetched entries are served only once and only for the same item-warehouse and
+	posting datetime they were fetched for, otherwise `update_entries_after` falls back
+	to querying the ledger itself.
+	"""
+
+	def __init__(self, batch_size):
+		self.batch_size = batch_size
+		self.batch_end = 0
+		self.entries = {}
+
+	def prefetch(self, items_to_be_repost, index):
+		if index < self.batch_end:
+			return
+
+		self.batch_end = index + self.batch_size
+		self.entries = {}
+
+		for row in items_to_be_repost[index : self.batch_end]:
+			if any(
+				row.get(field) in [None, ""]
+				for field in ["item_code", "warehouse", "posting_date", "posting_time"]
+			):
+				continue
+
+			key = (row.get("item_code"), row.get("warehouse"))
+			if key in self.entries:
+				# same item-warehouse repeated in the batch, let the later one query on its own
+				continue
+
+			self.entries[key] = frappe._dict(
+				{
+					"item_code": row.get("item_code"),
+					"warehouse": row.get("warehouse"),
+					"posting_datetime": get_combine_datetime(
+						row.get("posting_date"), row.get("posting_time")
+					),
+					"creation": row.get("creation"),
+				}
+			)
+
+		if not self.entries:
+			return
+
+		previous_sles = get_previous_sle_for_item_warehouses(list(self.entries.values()))
+		for key, previous_sle in previous_sles.items():
+			self.entries[key].previous_sle = previous_sle
+
+		future_sles = get_future_sle_for_item_warehouses(list(self.entries.values()))
+		for key, data in self.entries.items():
+			data.future_entries = future_sles.get(key, [])
+
+	def is_batch_processed(self, index, items_to_be_repost):
+		return index >= self.batch_end or index >= len(items_to_be_repost)
+
+	def get_entries(self, args):
+		"""Returns (previous_sle, future_entries) prefetched for the args, if any"""
+		key = (args.get("item_code"), args.get("warehouse"))
+		data = self.entries.get(key)
+		if not data or not args.get("posting_date") or not args.get("posting_time"):
+			return
+
+		posting_datetime = get_combine_datetime(args.get("posting_date"), args.get("posting_time"))
+		if data.posting_datetime != posting_datetime or cstr(data.creation) != cstr(args.get("creation")):
+			return
+
+		del self.entries[key]
+		return data.get("previous_sle") or frappe._dict(), data.future_entries
+
+
+def get_previous_sle_for_item_warehouses(item_warehouses):
+	"""Batched version of `get_previous_sle_of_current_voucher` for multiple item-warehouse pairs"""
+	conditions, values = [], []
+	for row in item_warehouses:
+		if row.creation:
+			conditions.append(
+				"(item_code = %s and warehouse = %s and posting_datetime <= %s and creation < %s)"
+			)
+			values.extend([row.item_code, row.warehouse, row.posting_datetime, row.creation])
+		else:
+			conditions.append("(item_code = %s and warehouse = %s and posting_datetime < %s)")
+			values.extend([row.item_code, row.warehouse, row.posting_datetime])
+
+	sles = frappe.db.sql(
+		"""
+		select * from (
+			select *, posting_datetime as "timestamp",
+				row_number() over (
+					partition by item_code, warehouse
+					order by posting_datetime desc, creation desc
+				) as sle_rank
+			from `tabStock Ledger Entry`
+			where is_cancelled = 0
+				and ({conditions})
+		) previous_sle
+		where sle_rank = 1""".format(conditions=" or ".join(conditions)),
+		values,
+		as_dict=1,
+	)
+
+	previous_sles = {}
+	for sle in sles:
+		sle.pop("sle_rank", None)
+		previous_sles[(sle.item_code, sle.warehouse)] = sle
+
+	return previous_sles
+
+
+def get_future_sle_for_item_warehouses(item_warehouses):
+	"""Batched version of `update_entries_after.get_future_entries_to_fix`,
+	fetches the entries of all item-warehouse pairs in posting order with one query"""
+	conditions, values = [], []
+	for row in item_warehouses:
+		previous_sle = row.get("previous_sle")
+		if previous_sle:
+			conditions.append("(item_code = %s and warehouse = %s and posting_datetime > %s and name != %s)")
+			values.extend([row.item_code, row.warehouse, previous_sle.posting_datetime, previous_sle.name])
+		else:
+			conditions.append("(item_code = %s and warehouse = %s and posting_datetime > %s)")
+			values.extend([row.item_code, row.warehouse, "1900-01-01 00:00:00"])
+
+	sles = frappe.db.sql(
+		"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where is_cancelled = 0
+			and ({conditions})
+		order by posting_datetime asc, creation asc
+		for update""".format(conditions=" or ".join(conditions)),
+		values,
+		as_dict=1,
+	)
+
+	future_sles = {}
+	for sle in sles:
+		future_sles.setdefault((sle.item_code, sle.warehouse), []).append(sle)
+
+	return future_sles
+
 
 def get_reposting_data(file_path) -> dict:
 	file_name = frappe.db.get_value(
@@ -348,7 +531,7 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 			{
 				"items_to_be_repost": args,
 				"distinct_item_and_warehouse": {str(k): v for k, v in distinct_item_warehouses.items()},
-				"affected_transactions": affected_transactions,
+				"affected_transactions": sorted(affected_transactions),
 			},
 			doc,
 			file_name,
@@ -370,7 +553,7 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 					{str(k): v for k, v in distinct_item_warehouses.items()}, default=str
 				),
 				"current_index": index,
-				"affected_transactions": frappe.as_json(affected_transactions),
+				"affected_transactions": frappe.as_json(sorted(affected_transactions)),
 			}
 		)
 
@@ -539,6 +722,9 @@ class update_entries_after:
 		self.use_moving_avg_for_batch = frappe.db.get_single_value(
 			"Stock Settings", "do_not_use_batchwise_valuation"
 		)
+		self.compact_stock_queue = cint(
+			frappe.db.get_single_value("Stock Settings", "compact_stock_queue", cache=True)
+		)
 
 		self.allow_negative_stock = allow_negative_stock or is_negative_stock_allowed(
 			item_code=self.item_code
@@ -557,6 +743,17 @@ class update_entries_after:
 		self.affected_transactions: set[tuple[str, str]] = set()
 		self.reserved_stock = flt(self.args.reserved_stock)
 
+		self.prefetched_entries = None
+		if self.args.sle_prefetcher:
+			self.prefetched_entries = self.args.sle_prefetcher.get_entries(self.args)
+
+		self.sle_page_size = cint(
+			frappe.db.get_single_value("Stock Reposting Settings", "sle_page_size", cache=True)
+		)
+
+		# recalculated values of future entries are written back in bulk while reposting
+		self.sle_write_buffer = None if self.args.sle_id else SLEWriteBuffer()
+
 		self.data = frappe._dict()
 		self.initialize_previous_data(self.args)
 		self.build()
@@ -589,7 +786,11 @@ class update_entries_after:
 		"""
 		self.data.setdefault(args.warehouse, frappe._dict())
 		warehouse_dict = self.data[args.warehouse]
-		previous_sle = get_previous_sle_of_current_voucher(args)
+		if self.prefetched_entries and args is self.args:
+			previous_sle = self.prefetched_entries[0]
+		else:
+			with reposting_phase("sle_fetch", rows=1):
+				previous_sle = get_previous_sle_of_current_voucher(args)
 		warehouse_dict.previous_sle = previous_sle
 
 		for key in ("qty_after_transaction", "valuation_rate", "stock_value"):
@@ -598,7 +799,7 @@ class update_entries_after:
 		warehouse_dict.update(
 			{
 				"prev_stock_value": previous_sle.stock_value or 0.0,
-				"stock_queue": json.loads(previous_sle.stock_queue or "[]"),
+				"stock_queue": loads_stock_queue(previous_sle.stock_queue),
 				"stock_value_difference": 0.0,
 			}
 		)
@@ -611,18 +812,32 @@ class update_entries_after:
 			if not future_sle_exists(self.args):
 				self.update_bin()
 		else:
-			entries_to_fix = self.get_future_entries_to_fix()
+			# list or generator (in paged mode) of entries
+			with reposting_phase("sle_fetch") as phase:
+				entries_to_fix = self.get_future_entries_to_fix()
+				if isinstance(entries_to_fix, list):
+					phase.rows = len(entries_to_fix)
+
+			last_sle = None
+			reposted_from_dates = {}
+			for sle in entries_to_fix:
+				with reposting_phase("valuation", rows=1):
+					self.process_sle(sle)
+				last_sle = sle
+				reposted_from_dates.setdefault((sle.item_code, sle.warehouse), sle.posting_date)
 
-			i = 0
-			while i < len(entries_to_fix):
-				sle = entries_to_fix[i]
-				i += 1
+				if sle.dependant_sle_voucher_detail_no:
+					with reposting_phase("dependent_vouchers", rows=1):
+						self.get_dependent_entries_to_fix(entries_to_fix, sle)
 
-				self.process_sle(sle)
-				self.update_bin_data(sle)
+			self.sle_write_buffer.flush()
+			if last_sle:
+				with reposting_phase("bin_write", rows=1):
+					self.update_bin_data(last_sle)
 
-				if sle.dependant_sle_voucher_detail_no:
-					entries_to_fix = self.get_dependent_entries_to_fix(entries_to_fix, sle)
+			if is_stock_balance_snapshot_enabled():
+				for (item_code, warehouse), posting_date in reposted_from_dates.items():
+					refresh_stock_balance_snapshots(item_code, warehouse, posting_date)
 
 		if self.exceptions:
 			self.raise_exceptions()
@@ -658,11 +873,17 @@ class update_entries_after:
 		)
 
 	def get_future_entries_to_fix(self):
+		if self.prefetched_entries:
+			return self.prefetched_entries[1]
+
 		# includes current entry!
 		args = self.data[self.args.warehouse].previous_sle or frappe._dict(
 			{"item_code": self.item_code, "warehouse": self.args.warehouse}
 		)
 
+		if self.sle_page_size:
+			return self.get_sle_after_datetime_in_pages(args, self.sle_page_size)
+
 		return list(self.get_sle_after_datetime(args))
 
 	def get_dependent_entries_to_fix(self, entries_to_fix, sle):
@@ -765,6 +986,10 @@ class update_entries_after:
 			)
 
 	def process_sle(self, sle):
+		if self.sle_write_buffer and not self.can_defer_sle_update(sle):
+			# processing of this entry reads back the ledger, write pending updates first
+			self.sle_write_buffer.flush()
+
 		# previous sle data for this warehouse
 		self.wh_data = self.data[sle.warehouse]
 
@@ -864,13 +1089,17 @@ class update_entries_after:
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = dumps_stock_queue(self.wh_data.stock_queue, compact=self.compact_stock_queue)
 
 		if not sle.is_adjustment_entry or not self.args.get("sle_id"):
 			sle.stock_value_difference = stock_value_difference
 
 		sle.doctype = "Stock Ledger Entry"
-		frappe.get_doc(sle).db_update()
+		if self.sle_write_buffer and self.can_defer_sle_update(sle):
+			self.sle_write_buffer.add(sle)
+		else:
+			with reposting_phase("sle_write", rows=1):
+				frappe.get_doc(sle).db_update()
 
 		if (
 			sle.serial_and_batch_bundle
@@ -886,6 +1115,17 @@ class update_entries_after:
 		):
 			self.update_outgoing_rate_on_transaction(sle)
 
+	def can_defer_sle_update(self, sle):
+		"""Entries whose processing doesn't read the ledger back can be written in bulk"""
+		return not (
+			sle.recalculate_rate
+			or sle.serial_no
+			or sle.batch_no
+			or sle.serial_and_batch_bundle
+			or sle.voucher_type == "Stock Reconciliation"
+			or (sle.voucher_type == "Stock Entry" and flt(sle.actual_qty) < 0)
+		)
+
 	def get_serialized_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import SerialNoValuation
 
@@ -1332,12 +1572,18 @@ class update_entries_after:
 			self.wh_data.qty_after_transaction + actual_qty
 		)
 
-		if self.valuation_method == "LIFO":
-			stock_queue = LIFOValuation(self.wh_data.stock_queue)
+		stock_queue = self.wh_data.stock_queue
+		if isinstance(stock_queue, BinWiseValuation):
+			# queue kept alive since the previous entry of this warehouse, it is only converted
+			# to a list when serialised in the entry
+			prev_stock_value = self.wh_data.queue_stock_value
 		else:
-			stock_queue = FIFOValuation(self.wh_data.stock_queue)
+			if self.valuation_method == "LIFO":
+				stock_queue = LIFOValuation(stock_queue)
+			else:
+				stock_queue = FIFOValuation(stock_queue)
 
-		_prev_qty, prev_stock_value = stock_queue.get_total_stock_and_value()
+			_prev_qty, prev_stock_value = stock_queue.get_total_stock_and_value()
 
 		if actual_qty > 0:
 			stock_queue.add_stock(qty=actual_qty, rate=incoming_rate)
@@ -1360,13 +1606,14 @@ class update_entries_after:
 
 		stock_value_difference = stock_value - prev_stock_value
 
-		self.wh_data.stock_queue = stock_queue.state
+		self.wh_data.stock_queue = stock_queue
+		self.wh_data.queue_stock_value = stock_value
 		self.wh_data.stock_value = round_off_if_near_zero(self.wh_data.stock_value + stock_value_difference)
 
-		if not self.wh_data.stock_queue:
-			self.wh_data.stock_queue.append(
+		if not len(stock_queue):
+			self.wh_data.stock_queue = [
 				[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]
-			)
+			]
 
 		if self.wh_data.qty_after_transaction:
 			self.wh_data.valuation_rate = self.wh_data.stock_value / self.wh_data.qty_after_transaction
@@ -1425,6 +1672,9 @@ class update_entries_after:
 	def get_fallback_rate(self, sle) -> float:
 		"""When exact incoming rate isn't available use any of other "average" rates as fallback.
 		This should only get used for negative stock."""
+		if self.sle_write_buffer:
+			self.sle_write_buffer.flush()
+
 		return get_valuation_rate(
 			sle.item_code,
 			sle.warehouse,
@@ -1445,6 +1695,22 @@ class update_entries_after:
 		"""get Stock Ledger Entries after a particular datetime, for reposting"""
 		return get_stock_ledger_entries(args, ">", "asc", for_update=True, check_serial_no=False)
 
+	def get_sle_after_datetime_in_pages(self, args, page_size):
+		"""Yields Stock Ledger Entries after a particular datetime, fetched page by page
+		using (posting_datetime, creation, name) of the last fetched entry as cursor"""
+		cursor = None
+		while True:
+			with reposting_phase("sle_fetch") as phase:
+				entries = get_stock_ledger_entries_page(args, cursor, page_size)
+				phase.rows = len(entries)
+
+			yield from entries
+
+			if len(entries) < page_size:
+				break
+
+			cursor = entries[-1]
+
 	def raise_exceptions(self):
 		msg_list = []
 		for warehouse, exceptions in self.exceptions.items():
@@ -1514,6 +1780,58 @@ class update_entries_after:
 			frappe.db.set_value("Bin", bin_name, updated_values, update_modified=True)
 
 
+class SLEWriteBuffer:
+	"""
+	Collect recalculated values of Stock Ledger Entries and write them with
+	one multi-row UPDATE for every `batch_size` entries.
+	"""
+
+	fields = (
+		"actual_qty",
+		"incoming_rate",
+		"outgoing_rate",
+		"qty_after_transaction",
+		"valuation_rate",
+		"stock_value",
+		"stock_value_difference",
+		"stock_queue",
+		"is_cancelled",
+	)
+
+	def __init__(self, batch_size=None):
+		self.batch_size = batch_size or SLE_UPDATE_BATCH_SIZE
+		self.pending = {}
+
+	def add(self, sle):
+		self.pending[sle.name] = [sle.get(field) for field in self.fields]
+		if len(self.pending) >= self.batch_size:
+			self.flush()
+
+	def flush(self):
+		if not self.pending:
+			return
+
+		names = list(self.pending)
+		set_clauses, values = [], []
+		for idx, field in enumerate(self.fields):
+			set_clauses.append(f"`{field}` = case name {' '.join(['when %s then %s'] * len(names))} end")
+			for name in names:
+				values.extend([name, self.pending[name][idx]])
+
+		values.extend(names)
+		with reposting_phase("sle_write", rows=len(names)):
+			frappe.db.sql(
+				"""update `tabStock Ledger Entry`
+				set {set_clauses}
+				where name in ({names})""".format(
+					set_clauses=", ".join(set_clauses), names=", ".join(["%s"] * len(names))
+				),
+				values,
+			)
+
+		self.pending = {}
+
+
 def get_previous_sle_of_current_voucher(args, operator="<", exclude_current_voucher=False):
 	"""get stock ledger entries filtered by specific posting datetime conditions"""
 
@@ -1573,12 +1891,47 @@ def get_previous_sle(args, for_update=False, extra_cond=None):
 	}
 	"""
 	args["name"] = args.get("sle", None) or ""
+	if (
+		not for_update
+		and not extra_cond
+		and not args.get("serial_no")
+		and args.get("warehouse")
+		and args.get("posting_date")
+		and is_stock_balance_snapshot_enabled()
+	):
+		if sle := get_previous_sle_from_snapshot(args):
+			return sle
+
 	sle = get_stock_ledger_entries(
 		args, "<=", "desc", "limit 1", for_update=for_update, extra_cond=extra_cond
 	)
 	return sle and sle[0] or {}
 
 
+def get_previous_sle_from_snapshot(args):
+	"""Returns the previous sle from the entries posted after the latest daily snapshot,
+	or else the last entry of the snapshot. Empty if there is no usable snapshot."""
+	posting_datetime = get_combine_datetime(args.get("posting_date"), args.get("posting_time") or "00:00:00")
+	snapshot = get_stock_balance_snapshot(args.get("item_code"), args.get("warehouse"), posting_datetime)
+	if not snapshot or not snapshot.stock_ledger_entry or snapshot.stock_ledger_entry == args.get("name"):
+		return {}
+
+	snapshot_cond = f" and posting_datetime > {frappe.db.escape(str(snapshot.posting_datetime))}"
+	sle = get_stock_ledger_entries(args, "<=", "desc", "limit 1", extra_cond=snapshot_cond)
+	if sle:
+		return sle[0]
+
+	sle = frappe.db.sql(
+		"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where name = %s and is_cancelled = 0""",
+		snapshot.stock_ledger_entry,
+		as_dict=1,
+	)
+	return sle and sle[0] or {}
+
+
 def get_stock_ledger_entries(
 	previous_sle,
 	operator=None,
@@ -1650,6 +2003,62 @@ def get_stock_ledger_entries(
 	)
 
 
+def get_stock_ledger_entries_page(previous_sle, cursor=None, page_size=1000):
+	"""
+	get a page of stock ledger entries of an item-warehouse after the previous sle,
+	`cursor` is the last entry of the previous page
+	"""
+	values = {
+		"item_code": previous_sle.get("item_code"),
+		"warehouse": previous_sle.get("warehouse"),
+		"page_size": page_size,
+	}
+
+	if cursor:
+		conditions = """and (
+				posting_datetime > %(cursor_datetime)s
+				or (posting_datetime = %(cursor_datetime)s and creation > %(cursor_creation)s)
+				or (
+					posting_datetime = %(cursor_datetime)s
+					and creation = %(cursor_creation)s
+					and name > %(cursor_name)s
+				)
+			)"""
+		values.update(
+			{
+				"cursor_datetime": cursor.posting_datetime,
+				"cursor_creation": cursor.creation,
+				"cursor_name": cursor.name,
+			}
+		)
+	else:
+		conditions = "and posting_datetime > %(posting_datetime)s"
+		values["posting_datetime"] = "1900-01-01 00:00:00"
+		if previous_sle.get("posting_date"):
+			values["posting_datetime"] = get_combine_datetime(
+				previous_sle.get("posting_date"), previous_sle.get("posting_time") or "00:00:00"
+			)
+
+		if previous_sle.get("name"):
+			conditions += " and name != %(name)s"
+			values["name"] = previous_sle.get("name")
+
+	return frappe.db.sql(
+		f"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and is_cancelled = 0
+			{conditions}
+		order by posting_datetime asc, creation asc, name asc
+		limit %(page_size)s
+		for update""",
+		values,
+		as_dict=1,
+	)
+
+
 def get_sle_by_voucher_detail_no(voucher_detail_no, excluded_sle=None):
 	return frappe.db.get_value(
 		"Stock Ledger Entry",
@@ -0,0 +1,84 @@
+"""Microbenchmark of FIFO valuation of a repost on a long queue.
+
+Times `update_entries_after.update_queue_values` for a run of issues from a warehouse
+whose queue has `bins` bins, with the queue kept alive across the entries and with the
+queue rebuilt from the list for every entry as before.
+
+Usage:
+        bench --site <site> execute erpnext.stock.tests.benchmark_valuation.run
+        bench --site <site> execute erpnext.stock.tests.benchmark_valuation.run --kwargs "{'bins': 50000}"
+"""
+
+import random
+import timeit
+
+import frappe
+
+from erpnext.stock.stock_ledger import update_entries_after
+from erpnext.stock.valuation import StockBin, dumps_stock_queue
+
+
+def make_queue(bins: int, seed: int = 42) -> list[StockBin]:
+	rng = random.Random(seed)
+	return [[rng.randint(1, 10), round(rng.uniform(1, 100), 2)] for _ in range(bins)]
+
+
+def repost_issues(
+	queue: list[StockBin], issues: int, qty_per_issue: float, keep_queue_alive: bool, serialise: bool
+) -> list:
+	"""Values of the warehouse after each issue, as written to its Stock Ledger Entry"""
+	sle_processor = update_entries_after.__new__(update_entries_after)
+	sle_processor.valuation_method = "FIFO"
+	sle_processor.wh_data = frappe._dict(
+		qty_after_transaction=sum(qty for qty, _rate in queue),
+		stock_value=sum(qty * rate for qty, rate in queue),
+		valuation_rate=0.0,
+		stock_queue=[list(stock_bin) for stock_bin in queue],
+	)
+	wh_data = sle_processor.wh_data
+
+	entries = []
+	for _ in range(issues):
+		if not keep_queue_alive:
+			# queue converted back to a list after every entry
+			wh_data.stock_queue = list(wh_data.stock_queue)
+
+		sle = frappe._dict(actual_qty=-qty_per_issue, incoming_rate=0.0, outgoing_rate=0.0)
+		sle_processor.update_queue_values(sle)
+
+		stock_queue = dumps_stock_queue(wh_data.stock_queue, compact=True) if serialise else None
+		entries.append((wh_data.qty_after_transaction, wh_data.stock_value, stock_queue))
+
+	return entries
+
+
+def run(
+	bins: int = 10_000,
+	issues: int = 2_000,
+	qty_per_issue: float = 3,
+	serialise: bool = False,
+	repeat: int = 3,
+) -> dict[str, float]:
+	"""Time `issues` issues from a `bins` long queue, optionally serialising the queue of every entry."""
+	queue = make_queue(bins)
+	results = {}
+	entries = {}
+
+	for keep_queue_alive in (False, True):
+		name = "live queue" if keep_queue_alive else "rebuilt queue"
+		timings = timeit.repeat(
+			lambda keep_queue_alive=keep_queue_alive: repost_issues(
+				queue, issues, qty_per_issue, keep_queue_alive, serialise
+			),
+			number=1,
+			repeat=repeat,
+		)
+		results[name] = min(timings)
+		entries[name] = repost_issues(queue, issues, qty_per_issue, keep_queue_alive, serialise=True)
+
+	assert entries["live queue"] == entries["rebuilt queue"], "live queue values differ from rebuilt queue"
+
+	for name, seconds in results.items():
+		print(f"{name}: {seconds:.4f}s for {issues} issues from {bins} bins")
+
+	return results
@@ -1,8 +1,9 @@
 import frappe
 from frappe.test_runner import make_test_records
-from frappe.tests.utils import FrappeTestCase
+from frappe.tests.utils import FrappeTestCase, change_settings
 
-from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.get_item_details import get_item_details, get_items_details
 
 test_ignore = ["BOM"]
 test_dependencies = ["Customer", "Supplier", "Item", "Price List", "Item Price"]
@@ -34,3 +35,74 @@ class TestGetItemDetail(FrappeTestCase):
 		)
 		details = get_item_details(args)
 		self.assertEqual(details.get("price_list_rate"), 100)
+
+	def test_get_items_details(self):
+		args_list = [
+			frappe._dict(
+				{
+					"item_code": item_code,
+					"company": "_Test Company",
+					"customer": "_Test Customer",
+					"currency": "INR",
+					"conversion_rate": 1.0,
+					"price_list_currency": "INR",
+					"plc_conversion_rate": 1.0,
+					"doctype": "Sales Order",
+					"name": None,
+					"transaction_date": frappe.utils.nowdate(),
+					"price_list": "_Test Price List",
+					"warehouse": "_Test Warehouse - _TC",
+					"qty": qty,
+				}
+			)
+			for item_code, qty in [("_Test Item", 1), ("_Test Item 2", 5), ("_Test Item", 10)]
+		]
+
+		details = get_items_details([args.copy() for args in args_list])
+
+		self.assertIsNone(frappe.flags.item_details_prefetch)
+		self.assertEqual(details, [get_item_details(args.copy()) for args in args_list])
+
+	@change_settings(
+		"Stock Settings",
+		{"auto_insert_price_list_rate_if_missing": 1, "update_existing_price_list_rate": 1},
+	)
+	def test_get_items_details_with_auto_inserted_item_price(self):
+		item_code = make_item("_Test Item Auto Price", {"is_stock_item": 0}).name
+		args_list = [
+			frappe._dict(
+				{
+					"item_code": item_code,
+					"company": "_Test Company",
+					"customer": "_Test Customer",
+					"currency": "INR",
+					"conversion_rate": 1.0,
+					"price_list_currency": "INR",
+					"plc_conversion_rate": 1.0,
+					"doctype": "Sales Order",
+					"name": None,
+					"transaction_date": frappe.utils.nowdate(),
+					"price_list": "_Test Price List",
+					"qty": 1,
+					"rate": rate,
+				}
+			)
+			for rate in (100, 150)
+		]
+
+		def get_details(in_batch):
+			frappe.db.delete("Item Price", {"item_code": item_code, "price_list": "_Test Price List"})
+			if in_batch:
+				return get_items_details([args.copy() for args in args_list])
+			return [get_item_details(args.copy()) for args in args_list]
+
+		# the first row inserts the Item Price, the second one reads it before updating it
+		details = get_details(in_batch=True)
+		self.assertEqual(details[1].get("price_list_rate"), 100)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Item Price", {"item_code": item_code, "price_list": "_Test Price List"}, "price_list_rate"
+			),
+			150,
+		)
+		self.assertEqual(details, get_details(in_batch=False))
@@ -1,9 +1,9 @@
-import json
-
 import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, today
 
-from erpnext.stock.utils import scan_barcode
+from erpnext.stock.utils import get_stock_balance, get_stock_balances, scan_barcode
+from erpnext.stock.valuation import loads_stock_queue
 
 
 class StockTestMixin:
@@ -32,7 +32,7 @@ class StockTestMixin:
 			for k, v in exp_sle.items():
 				act_value = act_sle[k]
 				if k == "stock_queue":
-					act_value = json.loads(act_value)
+					act_value = loads_stock_queue(act_value)
 					if act_value and act_value[0][0] == 0:
 						# ignore empty fifo bins
 						continue
@@ -81,3 +81,30 @@ class TestStockUtilities(FrappeTestCase, StockTestMixin):
 		self.assertEqual(serial_scan["serial_no"], serial.name)
 		self.assertEqual(serial_scan["has_batch_no"], 0)
 		self.assertEqual(serial_scan["has_serial_no"], 1)
+
+	def test_bulk_stock_balances(self):
+		from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+
+		item = self.make_item(properties={"is_stock_item": 1}).name
+		other_item = self.make_item(properties={"is_stock_item": 1}).name
+		warehouses = ["_Test Warehouse - _TC", "Stores - _TC"]
+		posting_date = add_days(today(), -3)
+
+		make_stock_entry(item_code=item, target=warehouses[0], qty=10, rate=100, posting_date=posting_date)
+		make_stock_entry(item_code=item, target=warehouses[0], qty=5, rate=130)
+		make_stock_entry(item_code=other_item, target=warehouses[1], qty=7, rate=50)
+
+		pairs = [(item_code, warehouse) for item_code in (item, other_item) for warehouse in warehouses]
+		for balance_date in (add_days(today(), -4), posting_date, today()):
+			balances = get_stock_balances(pairs, balance_date, "23:59:59", with_valuation_rate=True)
+			self.assertEqual(len(balances), len(pairs))
+			for item_code, warehouse in pairs:
+				self.assertEqual(
+					balances[(item_code, warehouse)],
+					get_stock_balance(
+						item_code, warehouse, balance_date, "23:59:59", with_valuation_rate=True
+					),
+				)
+
+		self.assertEqual(get_stock_balances(pairs)[(item, warehouses[0])], 15)
+		self.assertEqual(get_stock_balances([]), {})
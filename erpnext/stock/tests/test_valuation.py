@@ -8,7 +8,13 @@ from hypothesis import strategies as st
 
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	FIFOValuation,
+	LIFOValuation,
+	dumps_stock_queue,
+	loads_stock_queue,
+	round_off_if_near_zero,
+)
 
 qty_gen = st.floats(min_value=-1e6, max_value=1e6)
 value_gen = st.floats(min_value=1, max_value=1e6)
@@ -194,6 +200,19 @@ class TestFIFOValuation(unittest.TestCase):
 			self.assertTotalQty(total_qty)
 			self.assertTotalValue(total_value)
 
+	def test_long_queue_consumption(self):
+		self.queue = FIFOValuation([[1, rate] for rate in range(1, 10001)])
+
+		consumed = self.queue.remove_stock(2500.5)
+		self.assertEqual(consumed[:2], [[1, 1], [1, 2]])
+		self.assertEqual(consumed[-1], [0.5, 2501])
+		self.assertEqual(self.queue.state[:2], [[0.5, 2501], [1, 2502]])
+
+		# bins matching the outgoing rate are consumed from the middle of the queue
+		self.assertEqual(self.queue.remove_stock(1, outgoing_rate=5000), [[1, 5000]])
+		self.assertEqual(len(self.queue.state), 7499)
+		self.assertNotIn([1, 5000], self.queue.state)
+
 
 class TestLIFOValuation(unittest.TestCase):
 	def setUp(self):
@@ -317,6 +336,24 @@ class TestLIFOValuation(unittest.TestCase):
 			self.assertTotalValue(total_value)
 
 
+class TestStockQueueSerialisation(unittest.TestCase):
+	def test_legacy_json_queue(self):
+		self.assertEqual(loads_stock_queue("[[1, 10], [2.5, 11.25]]"), [[1, 10], [2.5, 11.25]])
+		self.assertEqual(loads_stock_queue(None), [])
+		self.assertEqual(loads_stock_queue(""), [])
+
+	def test_empty_queue_is_json(self):
+		self.assertEqual(dumps_stock_queue([], compact=True), "[]")
+
+	@given(st.lists(st.tuples(qty_gen, value_gen)))
+	def test_compact_queue_roundtrip(self, stock_queue):
+		stock_queue = [list(stock_bin) for stock_bin in stock_queue]
+
+		# doubles are stored as is, so values don't change due to serialisation
+		self.assertEqual(loads_stock_queue(dumps_stock_queue(stock_queue, compact=True)), stock_queue)
+		self.assertEqual(loads_stock_queue(dumps_stock_queue(stock_queue)), stock_queue)
+
+
 class TestLIFOValuationSLE(FrappeTestCase):
 	ITEM_CODE = "_Test LIFO item"
 	WAREHOUSE = "_Test Warehouse - _TC"
@@ -341,7 +378,7 @@ class TestLIFOValuationSLE(FrappeTestCase):
 		)
 		sle = frappe.get_doc("Stock Ledger Entry", sle_name)
 
-		stock_queue = json.loads(sle.stock_queue)
+		stock_queue = loads_stock_queue(sle.stock_queue)
 
 		total_qty, total_value = LIFOValuation(stock_queue).get_total_stock_and_value()
 		self.assertEqual(sle.qty_after_transaction, total_qty)
@@ -7,7 +7,16 @@ import json
 import frappe
 from frappe import _
 from frappe.query_builder.functions import CombineDatetime, IfNull, Sum
-from frappe.utils import cstr, flt, get_link_to_form, get_time, getdate, nowdate, nowtime
+from frappe.utils import (
+	create_batch,
+	cstr,
+	flt,
+	get_link_to_form,
+	get_time,
+	getdate,
+	nowdate,
+	nowtime,
+)
 
 import erpnext
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
@@ -15,10 +24,12 @@ from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle impor
 )
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 from erpnext.stock.serial_batch_bundle import BatchNoValuation, SerialNoValuation
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation
+from erpnext.stock.valuation import FIFOValuation, LIFOValuation, loads_stock_queue
 
 BarcodeScanResult = dict[str, str | None]
 
+STOCK_BALANCE_BATCH_SIZE = 500
+
 
 class InvalidWarehouseCompany(frappe.ValidationError):
 	pass
@@ -101,6 +112,10 @@ def get_stock_balance(
 
 	If `with_valuation_rate` is True, will return tuple (qty, rate)"""
 
+	from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+		get_stock_balance_from_snapshot,
+		is_stock_balance_snapshot_enabled,
+	)
 	from erpnext.stock.stock_ledger import get_previous_sle
 
 	if posting_date is None:
@@ -121,7 +136,14 @@ def get_stock_balance(
 			args[field] = value
 			extra_cond += f" and {field} = %({field})s"
 
-	last_entry = get_previous_sle(args, extra_cond=extra_cond)
+	last_entry = None
+	if not extra_cond and is_stock_balance_snapshot_enabled():
+		last_entry = get_stock_balance_from_snapshot(
+			item_code, warehouse, get_combine_datetime(posting_date, posting_time)
+		)
+
+	if last_entry is None:
+		last_entry = get_previous_sle(args, extra_cond=extra_cond)
 
 	if with_valuation_rate:
 		if with_serial_no:
@@ -152,6 +174,91 @@ def get_stock_balance(
 		return last_entry.qty_after_transaction if last_entry else 0.0
 
 
+def get_stock_balances(
+	pairs,
+	posting_date=None,
+	posting_time=None,
+	with_valuation_rate=False,
+	with_serial_no=False,
+):
+	"""Returns stock balances of many (item_code, warehouse) pairs at given posting date or current date.
+
+	The result is a dict keyed by (item_code, warehouse) with the same value `get_stock_balance`
+	returns for the pair. Serial nos are fetched only for the items having serial nos."""
+
+	if posting_date is None:
+		posting_date = nowdate()
+	if posting_time is None:
+		posting_time = nowtime()
+
+	pairs = list(dict.fromkeys((item_code, warehouse) for item_code, warehouse in pairs))
+	posting_datetime = get_combine_datetime(posting_date, posting_time)
+
+	last_entries = {}
+	for batch in create_batch(pairs, STOCK_BALANCE_BATCH_SIZE):
+		for entry in get_last_sle_for_item_warehouses(batch, posting_datetime):
+			last_entries[(entry.item_code, entry.warehouse)] = entry
+
+	balances = {}
+	for item_code, warehouse in pairs:
+		last_entry = last_entries.get((item_code, warehouse))
+		qty, valuation_rate = (
+			(last_entry.qty_after_transaction, last_entry.valuation_rate) if last_entry else (0.0, 0.0)
+		)
+
+		if not with_valuation_rate:
+			balances[(item_code, warehouse)] = qty
+		elif not with_serial_no:
+			balances[(item_code, warehouse)] = (qty, valuation_rate)
+		else:
+			serial_nos = None
+			if last_entry:
+				serial_nos = ""
+				if frappe.get_cached_value("Item", item_code, "has_serial_no"):
+					serial_no_details = get_available_serial_nos(
+						frappe._dict(
+							{
+								"item_code": item_code,
+								"warehouse": warehouse,
+								"posting_date": posting_date,
+								"posting_time": posting_time,
+								"ignore_warehouse": 1,
+							}
+						)
+					)
+					serial_nos = "\n".join(d.serial_no for d in serial_no_details)
+
+			balances[(item_code, warehouse)] = (qty, valuation_rate, serial_nos)
+
+	return balances
+
+
+def get_last_sle_for_item_warehouses(item_warehouses, posting_datetime):
+	"""Last active Stock Ledger Entry on or before `posting_datetime` for each item-warehouse"""
+	conditions = " or ".join(["(warehouse = %s and item_code = %s)"] * len(item_warehouses))
+	values = [value for item_code, warehouse in item_warehouses for value in (warehouse, item_code)]
+
+	return frappe.db.sql(
+		f"""
+		select item_code, warehouse, qty_after_transaction, valuation_rate
+		from (
+			select item_code, warehouse, qty_after_transaction, valuation_rate,
+				row_number() over (
+					partition by item_code, warehouse
+					order by posting_datetime desc, creation desc
+				) as row_num
+			from `tabStock Ledger Entry`
+			where is_cancelled = 0
+				and posting_datetime <= %s
+				and ({conditions})
+		) sle
+		where row_num = 1
+		""",
+		[posting_datetime, *values],
+		as_dict=1,
+	)
+
+
 def get_serial_nos_data(serial_nos):
 	from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
 
@@ -297,7 +404,7 @@ def get_incoming_rate(args, raise_error_if_no_rate=True):
 		previous_sle = get_previous_sle(args)
 		if valuation_method in ("FIFO", "LIFO"):
 			if previous_sle:
-				previous_stock_queue = json.loads(previous_sle.get("stock_queue", "[]") or "[]")
+				previous_stock_queue = loads_stock_queue(previous_sle.get("stock_queue"))
 				in_rate = (
 					_get_fifo_lifo_rate(previous_stock_queue, args.get("qty") or 0, valuation_method)
 					if previous_stock_queue
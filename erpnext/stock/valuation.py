@@ -1,4 +1,9 @@
+import base64
+import json
+import struct
+import zlib
 from abc import ABC, abstractmethod, abstractproperty
+from collections import deque
 from collections.abc import Callable
 from typing import NewType
 
@@ -10,6 +15,9 @@ StockBin = NewType("StockBin", list[float])  # [[qty, rate], ...]
 QTY = 0
 RATE = 1
 
+# Prefix of stock queues stored as zlib compressed, base64 encoded little-endian doubles
+COMPACT_QUEUE_PREFIX = "sq1:"
+
 
 class BinWiseValuation(ABC):
 	@abstractmethod
@@ -30,7 +38,7 @@ class BinWiseValuation(ABC):
 		total_qty = 0.0
 		total_value = 0.0
 
-		for qty, rate in self.state:
+		for qty, rate in self:
 			total_qty += flt(qty)
 			total_value += flt(qty) * flt(rate)
 
@@ -42,6 +50,9 @@ class BinWiseValuation(ABC):
 	def __iter__(self):
 		return iter(self.state)
 
+	def __len__(self):
+		return len(self.state)
+
 	def __eq__(self, other):
 		if isinstance(other, list):
 			return self.state == other
@@ -57,6 +68,7 @@ class FIFOValuation(BinWiseValuation):
 	Queue is implemented using "bins" of [qty, rate].
 
 	ref: https://en.wikipedia.org/wiki/FIFO_and_LIFO_accounting
+	Implementation detail: bins are kept in a deque, so consuming the first bin is O(1).
 	"""
 
 	# specifying the attributes to save resources
@@ -64,12 +76,18 @@ class FIFOValuation(BinWiseValuation):
 	__slots__ = ["queue"]
 
 	def __init__(self, state: list[StockBin] | None):
-		self.queue: list[StockBin] = state if state is not None else []
+		self.queue: deque[StockBin] = deque(state) if state is not None else deque()
 
 	@property
 	def state(self) -> list[StockBin]:
 		"""Get current state of queue."""
-		return self.queue
+		return list(self.queue)
+
+	def __iter__(self):
+		return iter(self.queue)
+
+	def __len__(self):
+		return len(self.queue)
 
 	def add_stock(self, qty: float, rate: float) -> None:
 		"""Update fifo queue with new stock.
@@ -133,8 +151,11 @@ class FIFOValuation(BinWiseValuation):
 			if qty >= fifo_bin[QTY]:
 				# consume current bin
 				qty = round_off_if_near_zero(qty - fifo_bin[QTY])
-				to_consume = self.queue.pop(index)
-				consumed_bins.append(list(to_consume))
+				if index == 0:
+					self.queue.popleft()
+				else:
+					del self.queue[index]
+				consumed_bins.append(list(fifo_bin))
 
 				if not self.queue and qty:
 					# stock finished, qty still remains to be withdrawn
@@ -245,6 +266,39 @@ class LIFOValuation(BinWiseValuation):
 		return consumed_bins
 
 
+def dumps_stock_queue(queue: list[StockBin] | BinWiseValuation, compact: bool = False) -> str:
+	"""Serialise stock queue for Stock Ledger Entry.
+
+	args:
+	        queue: list of [qty, rate] bins or the FIFO / LIFO valuation holding them
+	        compact: store bins as packed doubles instead of JSON. Empty queue is always "[]".
+	"""
+	if isinstance(queue, BinWiseValuation):
+		queue = queue.state
+
+	if not compact or not queue:
+		return json.dumps(queue)
+
+	values = [float(value) for stock_bin in queue for value in stock_bin]
+	packed = struct.pack(f"<{len(values)}d", *values)
+
+	return COMPACT_QUEUE_PREFIX + base64.b64encode(zlib.compress(packed)).decode()
+
+
+def loads_stock_queue(value: str | None) -> list[StockBin]:
+	"""Parse stock queue stored in Stock Ledger Entry, both JSON and compact format."""
+	if not value:
+		return []
+
+	if not value.startswith(COMPACT_QUEUE_PREFIX):
+		return json.loads(value)
+
+	packed = zlib.decompress(base64.b64decode(value[len(COMPACT_QUEUE_PREFIX) :]))
+	values = struct.unpack(f"<{len(packed) // 8}d", packed)
+
+	return [[values[idx], values[idx + 1]] for idx in range(0, len(values), 2)]
+
+
 def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 	"""Rounds off the number to zero only if number is close to zero for decimal
 	specified in precision. Precision defaults to 7.
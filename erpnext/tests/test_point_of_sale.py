@@ -1,12 +1,14 @@
 # Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
 # MIT License. See license.txt
 
+import json
 import unittest
 
 import frappe
 
 from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
-from erpnext.selling.page.point_of_sale.point_of_sale import get_items
+from erpnext.selling.doctype.product_bundle.test_product_bundle import make_product_bundle
+from erpnext.selling.page.point_of_sale.point_of_sale import get_catalogue_snapshot, get_items
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 
@@ -61,3 +63,70 @@ class TestPointOfSale(unittest.TestCase):
 
 		self.assertEqual(len(filtered_items), 1)
 		self.assertEqual(filtered_items[0]["item_code"], item2.item_code)
+
+	def test_catalogue_snapshot(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Snapshot")
+		item = make_item("Test Snapshot Stock Item", {"is_stock_item": 1})
+		make_stock_entry(item_code=item.name, qty=10, to_warehouse="_Test Warehouse - _TC", rate=500)
+		item_price = frappe.get_doc(
+			{
+				"doctype": "Item Price",
+				"price_list": "_Test Price List",
+				"item_code": item.name,
+				"price_list_rate": 700,
+			}
+		).insert()
+
+		def get_snapshot(since=None):
+			return get_catalogue(pos_profile.name, since=since)
+
+		snapshot = get_snapshot()
+		items = {d["item_code"]: d for d in snapshot["items"]}
+		self.assertFalse(snapshot["is_delta"])
+		self.assertEqual(items[item.name]["actual_qty"], 10)
+		self.assertEqual([d["price_list_rate"] for d in items[item.name]["prices"]], [700])
+
+		# nothing changed since the snapshot
+		delta = get_snapshot(since=snapshot["timestamp"])
+		self.assertTrue(delta["is_delta"])
+		self.assertNotIn(item.name, [d["item_code"] for d in delta["items"]])
+
+		item_price.price_list_rate = 750
+		item_price.save()
+		delta = get_snapshot(since=snapshot["timestamp"])
+		items = {d["item_code"]: d for d in delta["items"]}
+		self.assertEqual([d["price_list_rate"] for d in items[item.name]["prices"]], [750])
+
+		item.disabled = 1
+		item.save()
+		delta = get_snapshot(since=snapshot["timestamp"])
+		self.assertIn(item.name, delta["removed"])
+
+		# items that were never in the catalogue are not removed
+		non_sales_item = make_item("Test Snapshot Non Sales Item", {"is_sales_item": 0})
+		non_sales_item.description = "Changed"
+		non_sales_item.save()
+		delta = get_snapshot(since=snapshot["timestamp"])
+		self.assertNotIn(non_sales_item.name, delta["removed"])
+
+	def test_catalogue_snapshot_of_bundles(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Snapshot")
+		component = make_item("Test Snapshot Bundle Component", {"is_stock_item": 1})
+		bundle = make_item("Test Snapshot Bundle", {"is_stock_item": 0})
+		make_product_bundle(bundle.name, [component.name], qty=2)
+		snapshot = get_catalogue(pos_profile.name)
+
+		# stock of a component changes the available qty of its bundles
+		make_stock_entry(item_code=component.name, qty=10, to_warehouse="_Test Warehouse - _TC", rate=500)
+		delta = get_catalogue(pos_profile.name, since=snapshot["timestamp"])
+		items = {d["item_code"]: d for d in delta["items"]}
+		self.assertTrue(delta["is_delta"])
+		self.assertEqual(items[bundle.name]["actual_qty"], items[component.name]["actual_qty"] / 2)
+
+		# changes to the profile send the whole catalogue
+		pos_profile.save()
+		self.assertFalse(get_catalogue(pos_profile.name, since=snapshot["timestamp"])["is_delta"])
+
+
+def get_catalogue(pos_profile, since=None):
+	return json.loads(get_catalogue_snapshot(pos_profile, since=since).get_data())["message"]